@@ -0,0 +1,201 @@
+"""Check that the assets of STAC Items exist, with concurrent HEAD requests."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Iterator, TypeVar
+
+from stactools.hotosm.concurrency import CONTROLLER
+from stactools.hotosm.metrics import (
+    ASSET_CHECKS,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    METRICS,
+)
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_WORKERS = 16
+DEFAULT_TIMEOUT = 10.0
+
+# STAC Items waiting on checks before they are yielded, per worker
+PENDING_ITEMS_PER_WORKER = 4
+
+# Results of checks kept to avoid checking an HREF shared by STAC Items again
+DEFAULT_CACHE_SIZE = 100_000
+
+# Assets that are already read while creating STAC Items
+DEFAULT_SKIPPED_ASSETS = ("visual",)
+
+# Statuses meaning that an asset does not exist. S3 answers 403 rather than 404
+# for missing objects in buckets that cannot be listed.
+MISSING_STATUSES = frozenset({403, 404, 410})
+
+# Statuses of servers that do not support HEAD requests, which are retried as GET
+HEAD_UNSUPPORTED_STATUSES = frozenset({405, 501})
+
+
+@dataclass(frozen=True)
+class AssetCheck:
+    """Outcome of checking an asset HREF.
+
+    Attributes:
+        href: Checked HREF.
+        status: HTTP status of the response, after redirects, if any.
+        error: Error raised by the request, if it failed.
+    """
+
+    href: str
+    status: int | None = None
+    error: str | None = None
+
+    @property
+    def missing(self) -> bool:
+        """Whether the asset does not exist.
+
+        Requests that failed, e.g. timed out, are not considered missing, so that
+        an unreachable host does not fail every STAC Item.
+        """
+        return self.status in MISSING_STATUSES
+
+    def __str__(self) -> str:
+        """Summarize the outcome in one line."""
+        return f"{self.href} ({self.error or self.status})"
+
+
+class AssetChecker:
+    """Check asset HREFs with HEAD requests over a pooled HTTP session.
+
+    Checks run on a pool of `workers` threads, within the concurrency limit of
+    each asset host, and their results are cached by HREF.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        timeout: float = DEFAULT_TIMEOUT,
+        skipped_assets: Iterable[str] = DEFAULT_SKIPPED_ASSETS,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        session: requests.Session | None = None,
+    ) -> None:
+        """Create a checker with its own session and threads."""
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self.workers = workers
+        self.timeout = timeout
+        self.skipped_assets = frozenset(skipped_assets)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, Future[AssetCheck]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hotosm-asset-check"
+        )
+
+    def hrefs(self, item: dict) -> list[str]:
+        """HREFs of the assets of a STAC Item dictionary that are checked."""
+        return [
+            asset["href"]
+            for key, asset in item.get("assets", {}).items()
+            if key not in self.skipped_assets
+            and asset.get("href", "").startswith(("http://", "https://"))
+        ]
+
+    def submit(self, href: str) -> Future[AssetCheck]:
+        """Start checking an HREF, unless it is cached or already being checked."""
+        with self._lock:
+            if (future := self._cache.get(href)) is not None:
+                self._cache.move_to_end(href)
+                METRICS.inc(ASSET_CHECKS, outcome="cached")
+                return future
+            future = self._executor.submit(self.check, href)
+            self._cache[href] = future
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return future
+
+    def check(self, href: str) -> AssetCheck:
+        """Check an HREF with a HEAD request, falling back to GET if unsupported."""
+        start = time.perf_counter()
+        try:
+            with CONTROLLER.request(href) as request:
+                resp = self.session.head(
+                    href, timeout=self.timeout, allow_redirects=True
+                )
+                if resp.status_code in HEAD_UNSUPPORTED_STATUSES:
+                    with self.session.get(
+                        href, timeout=self.timeout, stream=True
+                    ) as resp:
+                        pass
+                request.record_status(resp.status_code)
+        except Exception as e:
+            METRICS.inc(HTTP_REQUESTS, client="assets", status=type(e).__name__)
+            METRICS.inc(ASSET_CHECKS, outcome="error")
+            logger.warning(f"Could not check asset {href}: {e}")
+            return AssetCheck(href, error=f"{type(e).__name__}: {e}")
+        METRICS.observe(
+            HTTP_REQUEST_DURATION, time.perf_counter() - start, client="assets"
+        )
+        METRICS.inc(HTTP_REQUESTS, client="assets", status=str(resp.status_code))
+        result = AssetCheck(href, status=resp.status_code)
+        METRICS.inc(ASSET_CHECKS, outcome="missing" if result.missing else "ok")
+        return result
+
+    def check_items(
+        self, items: Iterable[tuple[T, dict]]
+    ) -> Iterator[tuple[T, dict, list[AssetCheck]]]:
+        """Check the assets of STAC Items while more STAC Items are being created.
+
+        Checks of the assets of each STAC Item are started as soon as it is
+        created, and the STAC Item is yielded, in order, once they complete, along
+        with the checks of its missing assets. Up to `PENDING_ITEMS_PER_WORKER`
+        STAC Items per worker wait on their checks, so the checks overlap with the
+        creation of the following STAC Items rather than adding round trips.
+
+        Args:
+            items: Pairs of a tag, e.g. the upstream record, and a STAC Item
+                dictionary.
+        """
+        pending: deque[tuple[T, dict, list[Future[AssetCheck]]]] = deque()
+        window = self.workers * PENDING_ITEMS_PER_WORKER
+
+        def ready() -> bool:
+            if len(pending) > window:
+                return True
+            return all(future.done() for future in pending[0][2])
+
+        for tag, item in items:
+            futures = [self.submit(href) for href in self.hrefs(item)]
+            pending.append((tag, item, futures))
+            while pending and ready():
+                yield self._resolve(*pending.popleft())
+        while pending:
+            yield self._resolve(*pending.popleft())
+
+    @staticmethod
+    def _resolve(
+        tag: T, item: dict, futures: list[Future[AssetCheck]]
+    ) -> tuple[T, dict, list[AssetCheck]]:
+        checks = [future.result() for future in futures]
+        return tag, item, [check for check in checks if check.missing]
+
+    def close(self) -> None:
+        """Stop the threads and close the session."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
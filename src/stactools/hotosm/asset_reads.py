@@ -0,0 +1,323 @@
+"""Read imagery assets with deadlines, retries and hedged requests."""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import math
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING, Callable, Iterator, TypeVar
+
+from stactools.hotosm.concurrency import CONTROLLER
+from stactools.hotosm.exceptions import AssetTimeoutError
+from stactools.hotosm.metrics import ASSET_READS, GDAL_OPENS, GDAL_REQUESTS, METRICS
+
+# NOTE: rasterio is imported where it is used so that the CLI can configure reads
+# without importing GDAL at startup.
+if TYPE_CHECKING:
+    from rasterio.io import DatasetReader
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Threads reading assets for deadlines and hedged requests, shared by all readers
+MAX_READ_THREADS = 32
+
+# Extensions of the imagery assets that are opened
+DEFAULT_ALLOWED_EXTENSIONS = (".tif", ".tiff")
+
+# Bytes of each open file cached by GDAL, plenty for the header of a COG
+DEFAULT_VSI_CACHE_SIZE = 5 * 1024 * 1024
+
+# Debug messages of GDAL for each HTTP request: HEAD, directory listing and range
+_REQUEST_MESSAGES = (
+    "VSICURL: GetFileSize(",
+    "VSICURL: GetFileList(",
+    "VSICURL: Downloading ",
+)
+
+
+@dataclass(frozen=True)
+class GdalEnvOptions:
+    """GDAL configuration for opening remote COGs with few HTTP requests.
+
+    By default GDAL lists the directory of a remote file and probes for sidecar
+    files (`.aux.xml`, `.ovr`, ...) when opening it, which can take ten requests
+    to read the header of a COG that needs two.
+
+    Attributes:
+        disable_readdir: Open files without listing their directory.
+        allowed_extensions: Only open remote files with these extensions, so that
+            GDAL does not probe for sidecar files. Any file is opened if empty.
+        merge_consecutive_ranges: Merge requests for consecutive byte ranges.
+        http_multiplex: Multiplex requests to a host over HTTP/2 connections,
+            kept alive between opens.
+        vsi_cache_size: Bytes of each open file cached in memory, without cache
+            if 0.
+        count_requests: Count the HTTP requests of each open in the
+            `hotosm_gdal_http_requests_total` metric, from GDAL debug messages.
+            This enables GDAL debug messages, which slows down every open, so it
+            is meant for diagnosing slow reads.
+    """
+
+    disable_readdir: bool = True
+    allowed_extensions: tuple[str, ...] = DEFAULT_ALLOWED_EXTENSIONS
+    merge_consecutive_ranges: bool = True
+    http_multiplex: bool = True
+    vsi_cache_size: int = DEFAULT_VSI_CACHE_SIZE
+    count_requests: bool = False
+
+    def gdal_config(self) -> dict[str, str]:
+        """GDAL configuration options of the environment."""
+        config = {}
+        if self.disable_readdir:
+            config["GDAL_DISABLE_READDIR_ON_OPEN"] = "EMPTY_DIR"
+        if self.allowed_extensions:
+            config["CPL_VSIL_CURL_ALLOWED_EXTENSIONS"] = ",".join(
+                self.allowed_extensions
+            )
+        if self.merge_consecutive_ranges:
+            config["GDAL_HTTP_MERGE_CONSECUTIVE_RANGES"] = "YES"
+        if self.http_multiplex:
+            config["GDAL_HTTP_VERSION"] = "2TLS"
+            config["GDAL_HTTP_MULTIPLEX"] = "YES"
+            config["GDAL_HTTP_TCP_KEEPALIVE"] = "YES"
+        if self.vsi_cache_size:
+            config["VSI_CACHE"] = "TRUE"
+            config["VSI_CACHE_SIZE"] = str(self.vsi_cache_size)
+        if self.count_requests:
+            config["CPL_DEBUG"] = "ON"
+        return config
+
+
+@dataclass(frozen=True)
+class AssetReadOptions:
+    """Limits on the time spent reading an imagery asset.
+
+    Attributes:
+        connect_timeout: Seconds to wait for a connection to the asset host.
+        read_timeout: Seconds to wait for each HTTP response from the asset host.
+        deadline: Seconds allowed for reading an asset, including retries and
+            hedged requests.
+        retries: Number of times a failed read is retried. Assets that do not
+            exist are not retried.
+        backoff: Seconds to wait before the first retry, doubling for each retry.
+        hedge_after: Seconds after which a second, concurrent read of the same
+            asset is started if the first has not completed. The first read to
+            complete wins.
+        env: Tuned GDAL configuration applied to every read, if provided. GDAL
+            defaults are used otherwise.
+    """
+
+    connect_timeout: float | None = None
+    read_timeout: float | None = None
+    deadline: float | None = None
+    retries: int = 0
+    backoff: float = 1.0
+    hedge_after: float | None = None
+    env: GdalEnvOptions | None = None
+
+    def gdal_config(self) -> dict[str, str]:
+        """GDAL configuration options enforcing the timeouts, and of `env`."""
+        # GDAL only accepts whole seconds
+        config = {} if self.env is None else self.env.gdal_config()
+        if self.connect_timeout is not None:
+            config["GDAL_HTTP_CONNECTTIMEOUT"] = str(math.ceil(self.connect_timeout))
+        if self.read_timeout is not None:
+            config["GDAL_HTTP_TIMEOUT"] = str(math.ceil(self.read_timeout))
+        return config
+
+
+DEFAULT_ASSET_READ_OPTIONS = AssetReadOptions()
+
+
+@contextlib.contextmanager
+def gdal_env(options: AssetReadOptions = DEFAULT_ASSET_READ_OPTIONS) -> Iterator[None]:
+    """Keep a GDAL environment configured for reading assets open for a whole run.
+
+    GDAL configuration is thread local, so the environment applies to reads on the
+    calling thread. Each read also applies the configuration around its open, so
+    that reads on other threads, e.g. with a deadline, are configured the same.
+    """
+    import rasterio
+
+    with rasterio.Env(**options.gdal_config()):
+        yield
+
+
+def read_asset(
+    href: str,
+    read: Callable[[DatasetReader], T],
+    options: AssetReadOptions = DEFAULT_ASSET_READ_OPTIONS,
+) -> T:
+    """Open an asset with rasterio and read from it within the configured limits.
+
+    Without a deadline or hedging the asset is read in the calling thread.
+    Otherwise reads run in a shared thread pool so that the caller can stop waiting
+    for a hung host. A read abandoned after the deadline keeps its thread until the
+    connect or read timeout ends it, so a deadline should be used with timeouts.
+
+    Raises:
+        AssetTimeoutError: If the deadline is exceeded.
+        RasterioIOError: If the asset could not be read after all retries.
+    """
+    from rasterio.errors import RasterioIOError
+
+    start = time.monotonic()
+    deadline = None if options.deadline is None else start + options.deadline
+    for attempt in range(options.retries + 1):
+        if attempt:
+            delay = options.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+            METRICS.inc(ASSET_READS, outcome="retry")
+        try:
+            result = _hedged_read(href, read, options, deadline)
+        except AssetTimeoutError:
+            METRICS.inc(ASSET_READS, outcome="timeout")
+            raise
+        except RasterioIOError as e:
+            if attempt == options.retries or _is_not_found(e):
+                METRICS.inc(ASSET_READS, outcome="failed")
+                raise
+            logger.warning(f"Retrying read of {href} after error: {e}")
+            continue
+        METRICS.inc(ASSET_READS, outcome="ok")
+        return result
+
+    METRICS.inc(ASSET_READS, outcome="timeout")
+    raise AssetTimeoutError(
+        f"Reading asset at {href} exceeded the deadline of {options.deadline}s"
+    )
+
+
+def _is_not_found(error: Exception) -> bool:
+    message = str(error)
+    return "No such file or directory" in message or "404" in message
+
+
+def _read(
+    href: str, read: Callable[[DatasetReader], T], options: AssetReadOptions
+) -> T:
+    import rasterio
+    from rasterio.errors import RasterioIOError
+
+    config = options.gdal_config()
+    env = rasterio.Env(**config) if config else contextlib.nullcontext()
+    counting = options.env is not None and options.env.count_requests
+    with CONTROLLER.request(href) as request, _count_requests(counting) as requests:
+        try:
+            with env, rasterio.open(href) as src:
+                return read(src)
+        except RasterioIOError as e:
+            if _is_not_found(e):
+                request.record_status(404)
+            raise
+        finally:
+            METRICS.inc(GDAL_OPENS)
+            if counting:
+                METRICS.inc(GDAL_REQUESTS, requests[0])
+
+
+class _RequestCounter(logging.Filter):
+    """Count the HTTP requests of GDAL from its debug messages, per thread.
+
+    Rasterio logs GDAL messages on the thread that emitted them, which is the
+    thread that opened the file. Debug messages are dropped unless debug logging
+    was enabled for rasterio before counting started.
+    """
+
+    def __init__(self, keep_debug: bool) -> None:
+        """Create a counter, keeping debug messages if `keep_debug`."""
+        super().__init__()
+        self.keep_debug = keep_debug
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def count(self) -> Iterator[list[int]]:
+        """Count the requests of the calling thread in the yielded list."""
+        previous = getattr(self._local, "requests", None)
+        self._local.requests = requests = [0]
+        try:
+            yield requests
+        finally:
+            self._local.requests = previous
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Count requests in debug messages, and drop them unless kept."""
+        if record.levelno > logging.DEBUG:
+            return True
+        requests = getattr(self._local, "requests", None)
+        if requests is not None:
+            message = record.getMessage()
+            if any(prefix in message for prefix in _REQUEST_MESSAGES):
+                requests[0] += 1
+        return self.keep_debug
+
+
+@cache
+def _request_counter() -> _RequestCounter:
+    gdal_logger = logging.getLogger("rasterio._env")
+    counter = _RequestCounter(keep_debug=gdal_logger.isEnabledFor(logging.DEBUG))
+    gdal_logger.addFilter(counter)
+    gdal_logger.setLevel(logging.DEBUG)
+    return counter
+
+
+def _count_requests(enabled: bool) -> contextlib.AbstractContextManager[list[int]]:
+    if not enabled:
+        return contextlib.nullcontext([0])
+    return _request_counter().count()
+
+
+@cache
+def _executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=MAX_READ_THREADS, thread_name_prefix="hotosm-asset-read"
+    )
+
+
+def _hedged_read(
+    href: str,
+    read: Callable[[DatasetReader], T],
+    options: AssetReadOptions,
+    deadline: float | None,
+) -> T:
+    if deadline is None and options.hedge_after is None:
+        return _read(href, read, options)
+
+    pending: set[Future[T]] = {_executor().submit(_read, href, read, options)}
+    hedge: Future[T] | None = None
+    hedge_at = (
+        None if options.hedge_after is None else time.monotonic() + options.hedge_after
+    )
+    while True:
+        wake = min((t for t in (deadline, hedge_at) if t is not None), default=None)
+        timeout = None if wake is None else max(0.0, wake - time.monotonic())
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    METRICS.inc(ASSET_READS, outcome="hedge_won")
+                return future.result()
+        if done and not pending:
+            # Every read started so far failed, so let the caller retry
+            raise done.pop().exception()  # type: ignore[misc]
+
+        now = time.monotonic()
+        if deadline is not None and now >= deadline:
+            raise AssetTimeoutError(
+                f"Reading asset at {href} exceeded the deadline of {options.deadline}s"
+            )
+        if hedge_at is not None and now >= hedge_at:
+            METRICS.inc(ASSET_READS, outcome="hedged")
+            hedge = _executor().submit(_read, href, read, options)
+            pending.add(hedge)
+            hedge_at = None
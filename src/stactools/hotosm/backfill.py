@@ -0,0 +1,241 @@
+"""Split backfills across independent nodes, and check that their dumps are complete."""
+
+from __future__ import annotations
+
+import datetime as dt
+import itertools
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from stactools.hotosm.dump_index import id_hash
+from stactools.hotosm.reconcile import DEFAULT_SORT_BUFFER, reconcile, sorted_ids
+
+# Number of OAM metadata records per page when paging through a slice of the catalog
+OAM_PAGE_SIZE = 500
+
+
+@dataclass(frozen=True)
+class BackfillShard:
+    """Slice `index` of `count` disjoint slices of a catalog, counting from 0.
+
+    Slices are derived from the catalog alone, so that nodes processing different
+    slices of the same backfill need no coordination: OAM is split into contiguous
+    ranges of pages and Maxar into events, by hash of their directory.
+    """
+
+    index: int
+    count: int
+
+    def __post_init__(self) -> None:
+        """Check that the slice exists."""
+        if self.count < 1 or not 0 <= self.index < self.count:
+            raise ValueError(f"Expected 0 <= I < N in I/N, got {self}")
+
+    @classmethod
+    def parse(cls, value: str) -> BackfillShard:
+        """Parse a slice written as `I/N`, e.g. `0/4`.
+
+        Raises:
+            ValueError: If the value is not a valid slice.
+        """
+        index, sep, count = value.partition("/")
+        if not sep or not index.isdigit() or not count.isdigit():
+            raise ValueError(f"Expected I/N, e.g. 0/4, got {value!r}")
+        return cls(int(index), int(count))
+
+    def __str__(self) -> str:
+        """Format as `I/N`."""
+        return f"{self.index}/{self.count}"
+
+    def page_range(self, pages: int) -> tuple[int, int | None]:
+        """First and last page of this slice of `pages` pages, counting from 1.
+
+        Pages are split into contiguous blocks of about the same size. The last
+        slice has no last page, so that records added since the pages were counted
+        are not left out. The range is empty, i.e. the last page is before the
+        first, if there are fewer pages than slices.
+        """
+        first = pages * self.index // self.count + 1
+        if self.index == self.count - 1:
+            return first, None
+        return first, pages * (self.index + 1) // self.count
+
+    def owns(self, key: str) -> bool:
+        """Whether a record, e.g. a Maxar event directory, belongs to this slice."""
+        return id_hash(key) % self.count == self.index
+
+
+def backfill_record_path(path: Path) -> Path:
+    """Path of the record written next to a dump of one slice of a backfill.
+
+    For example, the record of `items-0.ndjson.gz` is `items-0.ndjson.gz.backfill.json`.
+    """
+    return path.with_name(f"{path.name}.backfill.json")
+
+
+@dataclass
+class BackfillRecord:
+    """Record of the dump of one slice of a backfill.
+
+    Attributes:
+        catalog: Name of the dataset catalog, as used for `--catalog`.
+        shard: Slice of the catalog that was dumped.
+        uploaded_after: Only records added after this datetime were dumped.
+        listed_at: The catalog was listed from this datetime, so records added
+            since may be missing from the dump.
+        dump: Dump file, or manifest of a sharded dump, in the same directory as
+            the record.
+        count: Number of STAC Items in the dump.
+    """
+
+    catalog: str
+    shard: BackfillShard
+    uploaded_after: dt.datetime
+    listed_at: dt.datetime
+    dump: Path
+    count: int
+
+    def to_dict(self) -> dict:
+        """Serialize as a dictionary."""
+        return {
+            "catalog": self.catalog,
+            "shard": str(self.shard),
+            "uploaded_after": self.uploaded_after.isoformat(),
+            "listed_at": self.listed_at.isoformat(),
+            "dump": self.dump.name,
+            "count": self.count,
+        }
+
+    @classmethod
+    def read(cls, path: Path) -> BackfillRecord:
+        """Read a record file, resolving the dump relative to it."""
+        d = json.loads(path.read_text())
+        return cls(
+            catalog=d["catalog"],
+            shard=BackfillShard.parse(d["shard"]),
+            uploaded_after=dt.datetime.fromisoformat(d["uploaded_after"]),
+            listed_at=dt.datetime.fromisoformat(d["listed_at"]),
+            dump=path.parent / d["dump"],
+            count=d["count"],
+        )
+
+    def write(self, path: Path) -> None:
+        """Write the record file."""
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+
+def check_records(records: list[BackfillRecord]) -> None:
+    """Check that the records of a backfill cover each of its slices exactly once.
+
+    Raises:
+        ValueError: If the records are from different backfills, or slices are
+            missing or were dumped more than once.
+    """
+    if not records:
+        raise ValueError("No backfill records")
+    first = records[0]
+    for record in records[1:]:
+        if (record.catalog, record.shard.count, record.uploaded_after) != (
+            first.catalog,
+            first.shard.count,
+            first.uploaded_after,
+        ):
+            raise ValueError(
+                f"{record.dump} is from a different backfill than {first.dump}: "
+                f"{record.catalog} {record.shard} after {record.uploaded_after} vs "
+                f"{first.catalog} {first.shard} after {first.uploaded_after}"
+            )
+    indexes = sorted(record.shard.index for record in records)
+    duplicated = sorted({index for index in indexes if indexes.count(index) > 1})
+    absent = sorted(set(range(first.shard.count)) - set(indexes))
+    if duplicated or absent:
+        problems = []
+        if absent:
+            problems.append(f"missing {_slices(absent, first.shard.count)}")
+        if duplicated:
+            problems.append(f"duplicated {_slices(duplicated, first.shard.count)}")
+        raise ValueError(f"Incomplete backfill: {' and '.join(problems)}")
+
+
+def listed_before(records: list[BackfillRecord]) -> dt.datetime:
+    """Datetime from which the first slice of a backfill listed the catalog.
+
+    Records added upstream since may be missing from the dumps without anything
+    being wrong, so they are not checked.
+    """
+    return min(record.listed_at for record in records)
+
+
+def _slices(indexes: list[int], count: int) -> str:
+    return ", ".join(str(BackfillShard(index, count)) for index in indexes)
+
+
+@dataclass
+class BackfillResult:
+    """Differences between the upstream catalog and the dumps of a backfill.
+
+    Attributes:
+        upstream: Number of unique IDs in the upstream catalog.
+        dumped: Number of STAC Items in the dumps, including duplicates.
+        duplicates: IDs of STAC Items dumped more than once, e.g. because records
+            moved between the pages of two slices while they were dumped.
+        missing: Number of upstream records that were not dumped.
+        unexpected: Number of dumped STAC Items that are not upstream, e.g.
+            because they were removed upstream since they were dumped.
+    """
+
+    upstream: int = 0
+    dumped: int = 0
+    duplicates: set[str] = field(default_factory=set)
+    missing: int = 0
+    unexpected: int = 0
+
+
+def verify_backfill(
+    upstream: Iterable[str],
+    dumped: Iterable[str],
+    missing_file: Path | None = None,
+    buffer_ids: int = DEFAULT_SORT_BUFFER,
+    spill_dir: Path | None = None,
+) -> BackfillResult:
+    """Diff upstream IDs against the IDs of dumped STAC Items, both in any order.
+
+    Both streams are sorted with `stactools.hotosm.reconcile.sorted_ids`, so memory
+    use does not grow with the size of the catalog. IDs missing from the dumps are
+    written to `missing_file`, if provided.
+    """
+    result = BackfillResult()
+
+    def counted_dumped() -> Iterator[str]:
+        ids = sorted_ids(dumped, buffer_ids, spill_dir, unique=False)
+        for id_, copies in itertools.groupby(ids):
+            n = sum(1 for _ in copies)
+            result.dumped += n
+            if n > 1:
+                result.duplicates.add(id_)
+            yield id_
+
+    reconciled = reconcile(
+        upstream,
+        counted_dumped(),
+        missing_file=missing_file,
+        buffer_ids=buffer_ids,
+        spill_dir=spill_dir,
+    )
+    result.upstream = reconciled.upstream
+    result.missing = reconciled.missing
+    result.unexpected = reconciled.orphans
+    return result
+
+
+def unique_items(items: Iterable[dict], duplicates: set[str]) -> Iterator[dict]:
+    """Yield STAC Items, skipping all but the first copy of the duplicated IDs."""
+    seen: set[str] = set()
+    for item in items:
+        if item["id"] in duplicates:
+            if item["id"] in seen:
+                continue
+            seen.add(item["id"])
+        yield item
@@ -1,35 +1,118 @@
 """Command line interface for OAM STAC creation and syncing."""
 
+from __future__ import annotations
+
 import datetime as dt
-import json
+import importlib.util
+import math
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
 from functools import partial
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from typing import Any, Callable, Iterator, Literal, TypeVar
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Literal, TypeVar
 from urllib.parse import urljoin
 
 import click
-import pystac
-import requests
-from pypgstac.db import PgstacDB
-from pypgstac.load import Loader, Methods
 
-from stactools.hotosm.constants import COLLECTION_ID as OAM_COLLECTION_ID
-from stactools.hotosm.maxar.stac import (
-    COLLECTION_ID as MAXAR_COLLECTION_ID,
-    create_collection as create_maxar_collection,
-    create_item as create_maxar_item,
+from stactools.hotosm.asset_checks import (
+    DEFAULT_WORKERS as DEFAULT_CHECK_WORKERS,
+    AssetCheck,
+    AssetChecker,
+)
+from stactools.hotosm.asset_reads import (
+    DEFAULT_ALLOWED_EXTENSIONS,
+    DEFAULT_VSI_CACHE_SIZE,
+    AssetReadOptions,
+    GdalEnvOptions,
+    gdal_env,
+)
+from stactools.hotosm.backfill import (
+    OAM_PAGE_SIZE,
+    BackfillRecord,
+    BackfillShard,
+    backfill_record_path,
+    check_records,
+    listed_before,
+    unique_items,
+    verify_backfill,
+)
+from stactools.hotosm.constants import (
+    COLLECTION_ID as OAM_COLLECTION_ID,
+    MAXAR_COLLECTION_ID,
 )
-from stactools.hotosm.maxar.sync import (
-    MAXAR_ROOT,
-    new_stac_items as new_maxar_stac_items,
+from stactools.hotosm.deadletter import (
+    DEFAULT_MAX_REPORTED,
+    DeadLetter,
+    DeadLetters,
+    group_by_collection,
+    read_dead_letters,
+    retry_dead_letters,
 )
+from stactools.hotosm.dump import (
+    DEFAULT_ROW_GROUP_SIZE,
+    DUMP_FORMATS,
+    DumpFormat,
+    compression_from_path,
+    dump_items,
+    manifest_path,
+)
+from stactools.hotosm.dump_index import IndexedDump, build_index
+from stactools.hotosm.events import (
+    DEFAULT_LEASE_SECONDS,
+    EventQueue,
+    MemoryQueue,
+    SqliteQueue,
+    WebhookReceiver,
+    run_consumer,
+)
+from stactools.hotosm.exceptions import AssetNotFoundError
+from stactools.hotosm.existing import DEFAULT_MAX_AGE_SECONDS, ExistingIds
+from stactools.hotosm.extent import ExtentAggregator
+from stactools.hotosm.geometry import GeometryOptions, geometry_savings
+from stactools.hotosm.load import (
+    DEFAULT_CHUNK_BYTES,
+    LoadState,
+    LoadTask,
+    load_tasks,
+    plan_tasks,
+)
+from stactools.hotosm.metrics import ITEMS, ITEMS_PER_SECOND, METRICS
 from stactools.hotosm.oam_metadata import OamMetadata
-from stactools.hotosm.oam_metadata_client import OamMetadataClient
-from stactools.hotosm.stac import (
-    create_collection as create_oam_collection,
-    create_item as create_oam_item,
+from stactools.hotosm.partition import DEFAULT_PARTITION_BUFFER, order_by_partition
+from stactools.hotosm.plan import Plan, plan_maxar, plan_oam
+from stactools.hotosm.profiling import SLOW_ITEMS, RunProfiler, timed_iter, trace_item
+from stactools.hotosm.reconcile import (
+    DEFAULT_BATCH_SIZE as DEFAULT_RECONCILE_BATCH_SIZE,
+    DEFAULT_SORT_BUFFER,
+    delete_items,
+    iter_pgstac_ids,
+    read_ids,
+    reconcile as reconcile_ids,
+)
+from stactools.hotosm.scheduler import ProducerError, merge_producers
+from stactools.hotosm.serialize import (
+    SERIALIZER_ENV,
+    available_serializers,
+    dumps_str,
+    use_serializer,
 )
+from stactools.hotosm.validate import validate_tasks
+from stactools.hotosm.watch import Watermark, install_signal_handlers, run_watch
+
+# NOTE: Heavy dependencies (GDAL via rasterio, psycopg via pypgstac, pystac and
+# requests) are imported inside the commands that need them to keep CLI startup
+# fast, e.g. for `hotosm --help` or short lived scheduled jobs.
+if TYPE_CHECKING:
+    import pystac
+    import requests
+    from pypgstac.db import PgstacDB
+    from pypgstac.load import Loader
+
+    from stactools.hotosm.oam_metadata_client import OamMetadataClient
 
 # ===== Common CLI options and argument parsing
 uploaded_since_sec = click.option(
@@ -79,6 +162,8 @@ def create_pgstac_from_ctx(
     value: Any,
 ) -> PgstacDB:
     """Create PgSTAC connection."""
+    from pypgstac.db import PgstacDB
+
     dsn = "postgresql://{user}:{password}@{host}:{port}/{database}".format(
         user=ctx.params["pguser"],
         password=ctx.params["pgpassword"],
@@ -132,7 +217,144 @@ dump_to_path = click.option(
     help="Dump STAC Items to this file.",
     required=True,
 )
+dump_format = click.option(
+    "--format",
+    type=click.Choice(DUMP_FORMATS),
+    default="ndjson",
+    show_default=True,
+    help=(
+        "Format of the dumped STAC Items. NDJSON is compressed if --file ends with "
+        "`.gz` or `.zst`. STAC-GeoParquet requires the `geoparquet` extra."
+    ),
+)
+dump_row_group_size = click.option(
+    "--row-group-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_ROW_GROUP_SIZE,
+    show_default=True,
+    help="Number of STAC Items in each STAC-GeoParquet row group.",
+)
+dump_shard_items = click.option(
+    "--shard-items",
+    type=click.IntRange(min=1),
+    help=(
+        "Split NDJSON dumps into shards of at most this many STAC Items, "
+        "listed in a manifest file."
+    ),
+)
+dump_shard_bytes = click.option(
+    "--shard-bytes",
+    type=click.IntRange(min=1),
+    help=(
+        "Split NDJSON dumps into shards of about this many uncompressed bytes, "
+        "listed in a manifest file."
+    ),
+)
+dump_index = click.option(
+    "--index",
+    is_flag=True,
+    help=(
+        "Write a sidecar index of the byte offset and ID of each STAC Item in "
+        "uncompressed NDJSON dumps, for random access and balanced splits."
+    ),
+)
+
+partition_buffer_option = click.option(
+    "--partition-buffer",
+    type=click.IntRange(min=1),
+    is_flag=False,
+    flag_value=DEFAULT_PARTITION_BUFFER,
+    help=(
+        "Group STAC Items by PgSTAC partition before loading, sorting up to this "
+        f"many in memory (default {DEFAULT_PARTITION_BUFFER} if no value is given) "
+        "and spilling sorted runs to temporary files beyond that."
+    ),
+)
+
+extent_file_option = click.option(
+    "--extent-file",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help=(
+        "Aggregate the spatial and temporal extent of STAC Items into this file, "
+        "adding to any extent already in it, for `sync-collection --extent-file`."
+    ),
+)
+collection_extent_file_option = click.option(
+    "--extent-file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Set the STAC Collection extent from a file aggregated while syncing Items.",
+)
+dead_letter_option = click.option(
+    "--dead-letter",
+    "dead_letter_file",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help=(
+        "Append records that could not be turned into STAC Items to this NDJSON "
+        "file, to reprocess them with `hotosm retry`."
+    ),
+)
+
+
+skip_existing_option = click.option(
+    "--skip-existing",
+    is_flag=True,
+    envvar="HOTOSM_SKIP_EXISTING",
+    help=(
+        "Skip creating STAC Items that are already in PgSTAC, checking their IDs "
+        "against a compact set loaded once per run."
+    ),
+)
+force_option = click.option(
+    "--force",
+    is_flag=True,
+    help=(
+        "Create STAC Items even if they are already in PgSTAC, overriding "
+        "--skip-existing."
+    ),
+)
+existing_ids_file_option = click.option(
+    "--existing-ids-file",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help=(
+        "Cache the IDs of STAC Items in PgSTAC for --skip-existing in this file, "
+        f"refreshed from PgSTAC once older than {DEFAULT_MAX_AGE_SECONDS // 3600} "
+        "hours."
+    ),
+)
+
+
+def parse_backfill_shard(
+    _ctx: click.Context, _param: click.Parameter, value: str | None
+) -> BackfillShard | None:
+    """Parse the slice of a catalog processed by this node of a backfill."""
+    if value is None:
+        return None
+    try:
+        return BackfillShard.parse(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+backfill_shard_option = click.option(
+    "--shard",
+    "backfill_shard",
+    metavar="I/N",
+    callback=parse_backfill_shard,
+    help=(
+        "Only process slice I of N disjoint slices of the catalog, counting from 0, "
+        "to split a backfill across nodes. See `hotosm merge-backfill`."
+    ),
+)
 
+plan_option = click.option(
+    "--plan",
+    is_flag=True,
+    help=(
+        "Only estimate the work of the run, from listing-level requests: the "
+        "number of new records, how many are already in PgSTAC, the size of their "
+        "imagery and the requests needed to create their STAC Items."
+    ),
+)
 
 catalog_option = click.option(
     "--catalog",
@@ -144,16 +366,230 @@ catalog_option = click.option(
 
 # ===== CLI commands
 @click.group
-def main():
+@click.option(
+    "--metrics-prometheus",
+    type=click.Path(writable=True, path_type=Path),
+    help="Write run metrics to this file in the Prometheus textfile format.",
+)
+@click.option(
+    "--metrics-json",
+    type=click.Path(writable=True, path_type=Path),
+    help="Write a JSON summary of run metrics to this file.",
+)
+@click.option(
+    "--profile",
+    type=click.Path(file_okay=False, writable=True, path_type=Path),
+    help=(
+        "Profile the run with cProfile and report the slowest STAC Items, "
+        "writing results to this directory."
+    ),
+)
+@click.option(
+    "--profile-top-n",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Number of slowest STAC Items to report when profiling.",
+)
+@click.option(
+    "--json-serializer",
+    type=click.Choice(list(available_serializers())),
+    envvar=SERIALIZER_ENV,
+    help="Serialize STAC Items to JSON with this library. Defaults to the fastest.",
+)
+@click.option(
+    "--coordinate-precision",
+    type=click.IntRange(min=0, max=15),
+    help=(
+        "Round STAC Item geometry coordinates to this many decimal places, keeping "
+        "geometries valid. Requires the `geometry` extra."
+    ),
+)
+@click.option(
+    "--simplify-tolerance",
+    type=click.FloatRange(min=0, min_open=True),
+    help=(
+        "Simplify STAC Item geometries, preserving topology, so that no point moves "
+        "more than this many degrees. Requires the `geometry` extra."
+    ),
+)
+@click.option(
+    "--asset-connect-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=10.0,
+    show_default=True,
+    help="Seconds to wait for a connection when reading an imagery asset.",
+)
+@click.option(
+    "--asset-read-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=30.0,
+    show_default=True,
+    help="Seconds to wait for each response when reading an imagery asset.",
+)
+@click.option(
+    "--asset-deadline",
+    type=click.FloatRange(min=0, min_open=True),
+    help=(
+        "Fail STAC Items whose imagery asset takes longer than this many seconds to "
+        "read, including retries."
+    ),
+)
+@click.option(
+    "--asset-retries",
+    type=click.IntRange(min=0),
+    default=2,
+    show_default=True,
+    help="Retry failed reads of an imagery asset this many times, with backoff.",
+)
+@click.option(
+    "--asset-hedge-after",
+    type=click.FloatRange(min=0, min_open=True),
+    help=(
+        "Start a second read of an imagery asset if the first has not completed "
+        "after this many seconds, using whichever completes first."
+    ),
+)
+@click.option(
+    "--gdal-readdir/--no-gdal-readdir",
+    default=False,
+    show_default=True,
+    help="List the directory of imagery assets when opening them with GDAL.",
+)
+@click.option(
+    "--gdal-allowed-extensions",
+    default=",".join(DEFAULT_ALLOWED_EXTENSIONS),
+    show_default=True,
+    help=(
+        "Comma separated extensions of the remote files GDAL may open, so that it "
+        "does not probe for sidecar files. Any file is opened if empty."
+    ),
+)
+@click.option(
+    "--gdal-merge-ranges/--no-gdal-merge-ranges",
+    default=True,
+    show_default=True,
+    help="Merge GDAL requests for consecutive byte ranges of imagery assets.",
+)
+@click.option(
+    "--gdal-http-multiplex/--no-gdal-http-multiplex",
+    default=True,
+    show_default=True,
+    help="Multiplex GDAL requests over kept-alive HTTP/2 connections.",
+)
+@click.option(
+    "--gdal-vsi-cache-size",
+    type=click.IntRange(min=0),
+    default=DEFAULT_VSI_CACHE_SIZE,
+    show_default=True,
+    help="Bytes of each open imagery asset cached by GDAL, without cache if 0.",
+)
+@click.option(
+    "--gdal-request-metrics/--no-gdal-request-metrics",
+    default=False,
+    show_default=True,
+    help=(
+        "Count the HTTP requests of GDAL for each imagery asset opened, from its "
+        "debug messages. Slows down opens, to diagnose slow reads."
+    ),
+)
+@click.option(
+    "--check-assets",
+    is_flag=True,
+    help=(
+        "Check that the assets of STAC Items exist with HEAD requests, failing "
+        "STAC Items with missing assets."
+    ),
+)
+@click.option(
+    "--asset-check-workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CHECK_WORKERS,
+    show_default=True,
+    help="Concurrent HEAD requests checking assets for --check-assets.",
+)
+@click.pass_context
+def main(
+    ctx: click.Context,
+    metrics_prometheus: Path | None,
+    metrics_json: Path | None,
+    profile: Path | None,
+    profile_top_n: int,
+    json_serializer: str | None,
+    coordinate_precision: int | None,
+    simplify_tolerance: float | None,
+    asset_connect_timeout: float,
+    asset_read_timeout: float,
+    asset_deadline: float | None,
+    asset_retries: int,
+    asset_hedge_after: float | None,
+    gdal_readdir: bool,
+    gdal_allowed_extensions: str,
+    gdal_merge_ranges: bool,
+    gdal_http_multiplex: bool,
+    gdal_vsi_cache_size: int,
+    gdal_request_metrics: bool,
+    check_assets: bool,
+    asset_check_workers: int,
+):
     """STAC for Humanitarian OpenStreetMap Team OpenAerialMap."""
+    use_serializer(json_serializer)
+    geometry_options = GeometryOptions(
+        precision=coordinate_precision, simplify_tolerance=simplify_tolerance
+    )
+    if geometry_options.enabled and importlib.util.find_spec("shapely") is None:
+        raise click.UsageError(
+            "Optimizing geometries requires the `geometry` extra, "
+            "e.g., `pip install stactools-hotosm[geometry]`"
+        )
+    export_metrics = partial(METRICS.export, metrics_prometheus, metrics_json)
+    ctx.obj = {
+        "export_metrics": export_metrics,
+        "geometry_options": geometry_options,
+        "read_options": AssetReadOptions(
+            connect_timeout=asset_connect_timeout,
+            read_timeout=asset_read_timeout,
+            deadline=asset_deadline,
+            retries=asset_retries,
+            hedge_after=asset_hedge_after,
+            env=GdalEnvOptions(
+                disable_readdir=not gdal_readdir,
+                allowed_extensions=tuple(
+                    extension.strip()
+                    for extension in gdal_allowed_extensions.split(",")
+                    if extension.strip()
+                ),
+                merge_consecutive_ranges=gdal_merge_ranges,
+                http_multiplex=gdal_http_multiplex,
+                vsi_cache_size=gdal_vsi_cache_size,
+                count_requests=gdal_request_metrics,
+            ),
+        ),
+        "asset_checker": None,
+    }
+    ctx.call_on_close(export_metrics)
+    if check_assets:
+        asset_checker = AssetChecker(
+            workers=asset_check_workers, timeout=asset_read_timeout
+        )
+        ctx.obj["asset_checker"] = asset_checker
+        ctx.call_on_close(asset_checker.close)
+
+    if profile is not None:
+        SLOW_ITEMS.top_n = profile_top_n
+        profiler = RunProfiler(profile, SLOW_ITEMS)
+        profiler.start()
+        ctx.call_on_close(profiler.stop)
 
 
 @main.command()
 @dump_to_path
 @catalog_option
+@collection_extent_file_option
 def dump_collection(
     file: Path,
     catalog: str,
+    extent_file: Path | None,
     **_pgstac_options: Any,
 ) -> None:
     """Dump Collection definition to JSON.
@@ -161,12 +597,13 @@ def dump_collection(
     The output of this CLI program can be used with the `pypgstac load collections` CLI
     command to bulk load STAC Items into PgSTAC.
     """
-    create_and_save_collection(catalog, file)
+    create_and_save_collection(catalog, file, extent_file)
     click.echo(f"Saved the STAC Collection definition for {catalog} to {file}.")
 
 
 @main.command()
 @catalog_option
+@collection_extent_file_option
 @pgstac_username
 @pgstac_password
 @pgstac_host
@@ -176,14 +613,17 @@ def dump_collection(
 def sync_collection(
     ctx: click.Context,
     catalog: str,
+    extent_file: Path | None,
     **_pgstac_options: Any,
 ) -> None:
     """Sync Collection definition to PgSTAC."""
+    from pypgstac.load import Loader, Methods
+
     loader = Loader(ctx.obj["pgstac"])
 
     with TemporaryDirectory() as tmp_dir:
         destination = Path(tmp_dir).joinpath("collections.json")
-        create_and_save_collection(catalog, destination)
+        create_and_save_collection(catalog, destination, extent_file)
         loader.load_collections(destination, Methods.upsert)
 
     click.echo(f"Synchronized the STAC Collection definition for {catalog} to PgSTAC.")
@@ -191,71 +631,185 @@ def sync_collection(
 
 @main.command()
 @dump_to_path
+@dump_format
+@dump_row_group_size
+@dump_shard_items
+@dump_shard_bytes
+@dump_index
 @uploaded_since_sec
 @uploaded_after_dt
 @handle_exceptions
+@extent_file_option
+@dead_letter_option
+@backfill_shard_option
+@plan_option
+@click.pass_context
 def dump_oam(
+    ctx: click.Context,
     file: Path,
+    format: DumpFormat,
+    row_group_size: int,
+    shard_items: int | None,
+    shard_bytes: int | None,
+    index: bool,
     uploaded_since: float | None,
     uploaded_after: dt.datetime | None,
     handle_exceptions: HandleExceptionsType,
+    extent_file: Path | None,
+    dead_letter_file: Path | None,
+    backfill_shard: BackfillShard | None,
+    plan: bool,
     **_pgstac_options: Any,
 ):
-    """Dump new STAC Items from OAM metadata API to NDJSON.
+    """Dump new STAC Items from OAM metadata API to NDJSON or STAC-GeoParquet.
 
-    The output of this CLI program can be used with the `pypgstac load items` CLI
-    command to bulk load STAC Items into PgSTAC.
+    The NDJSON output of this CLI program can be used with the `pypgstac load items`
+    CLI command to bulk load STAC Items into PgSTAC.
     """
+    create_oam_item = new_oam_stac_item_creator(
+        ctx.obj["geometry_options"], ctx.obj["read_options"]
+    )
+
     uploaded_after = parse_uploaded_since(uploaded_since, uploaded_after)
-    client = OamMetadataClient.new()
+    if backfill_shard is not None and format != "ndjson":
+        raise click.UsageError("--shard is only supported for NDJSON dumps")
+    if plan:
+        report_plan(ctx, "OAM", uploaded_after, backfill_shard, None)
+        return
+    ctx.with_resource(gdal_env(ctx.obj["read_options"]))
 
     click.echo(f"Looking for OAM metadata entities added since {uploaded_after}")
-    items, errors = sync_handler(
+    dead_letters = DeadLetters(dead_letter_file)
+    ctx.call_on_close(dead_letters.close)
+    extent = ExtentAggregator.load(extent_file)
+    listed_at = dt.datetime.now(dt.UTC)
+    items = iter_stac_items(
         collection_id=OAM_COLLECTION_ID,
-        raw_metadata_creator=partial(get_oam_items_after, client),
+        raw_metadata_creator=new_oam_items_creator(backfill_shard),
         stac_item_creator=create_oam_item,
         uploaded_after=uploaded_after,
         handle_exceptions=handle_exceptions,
+        dead_letters=dead_letters,
+        extent=extent,
+        asset_checker=ctx.obj["asset_checker"],
     )
-    dump_to_ndjson(file, items)
-    report_errors(errors)
+    count = dump_to_file(
+        file,
+        items,
+        format,
+        row_group_size=row_group_size,
+        shard_items=shard_items,
+        shard_bytes=shard_bytes,
+        index=index,
+    )
+    if backfill_shard is not None:
+        dump = manifest_path(file) if shard_items or shard_bytes else file
+        write_backfill_record(
+            BackfillRecord(
+                "OAM", backfill_shard, uploaded_after, listed_at, dump, count
+            ),
+            file,
+        )
+    extent.save()
+    report_geometry_savings(ctx.obj["geometry_options"])
+    report_errors(dead_letters)
 
 
 @main.command()
 @dump_to_path
+@dump_format
+@dump_row_group_size
+@dump_shard_items
+@dump_shard_bytes
+@dump_index
 @uploaded_since_sec
 @uploaded_after_dt
 @handle_exceptions
+@extent_file_option
+@dead_letter_option
+@backfill_shard_option
+@plan_option
+@click.pass_context
 def dump_maxar(
+    ctx: click.Context,
     file: Path,
+    format: DumpFormat,
+    row_group_size: int,
+    shard_items: int | None,
+    shard_bytes: int | None,
+    index: bool,
     uploaded_since: float | None,
     uploaded_after: dt.datetime | None,
     handle_exceptions: HandleExceptionsType,
+    extent_file: Path | None,
+    dead_letter_file: Path | None,
+    backfill_shard: BackfillShard | None,
+    plan: bool,
     **_pgstac_options: Any,
 ) -> None:
-    """Dump new Maxar Items from the open data bucket to NDJSON.
+    """Dump new Maxar Items from the open data bucket to NDJSON or STAC-GeoParquet.
 
-    The output of this CLI program can be used with the `pypgstac load items` CLI
-    command to bulk load STAC Items into PgSTAC.
+    The NDJSON output of this CLI program can be used with the `pypgstac load items`
+    CLI command to bulk load STAC Items into PgSTAC.
     """
+    create_maxar_item = new_maxar_stac_item_creator(ctx.obj["geometry_options"])
+
     uploaded_after = parse_uploaded_since(uploaded_since, uploaded_after)
+    if backfill_shard is not None and format != "ndjson":
+        raise click.UsageError("--shard is only supported for NDJSON dumps")
+    if plan:
+        report_plan(ctx, "Maxar", uploaded_after, backfill_shard, None)
+        return
 
     click.echo(f"Looking for STAC Items added since {uploaded_after}")
-    items, errors = sync_handler(
+    dead_letters = DeadLetters(dead_letter_file)
+    ctx.call_on_close(dead_letters.close)
+    extent = ExtentAggregator.load(extent_file)
+    listed_at = dt.datetime.now(dt.UTC)
+    items = iter_stac_items(
         collection_id=MAXAR_COLLECTION_ID,
-        raw_metadata_creator=get_maxar_items_after,
+        raw_metadata_creator=new_maxar_items_creator(backfill_shard),
         stac_item_creator=create_maxar_item,
         uploaded_after=uploaded_after,
         handle_exceptions=handle_exceptions,
+        dead_letters=dead_letters,
+        extent=extent,
+        asset_checker=ctx.obj["asset_checker"],
     )
-    dump_to_ndjson(file, items)
-    report_errors(errors)
+    count = dump_to_file(
+        file,
+        items,
+        format,
+        row_group_size=row_group_size,
+        shard_items=shard_items,
+        shard_bytes=shard_bytes,
+        index=index,
+    )
+    if backfill_shard is not None:
+        dump = manifest_path(file) if shard_items or shard_bytes else file
+        write_backfill_record(
+            BackfillRecord(
+                "Maxar", backfill_shard, uploaded_after, listed_at, dump, count
+            ),
+            file,
+        )
+    extent.save()
+    report_geometry_savings(ctx.obj["geometry_options"])
+    report_errors(dead_letters)
 
 
 @main.command()
 @uploaded_since_sec
 @uploaded_after_dt
 @handle_exceptions
+@partition_buffer_option
+@extent_file_option
+@dead_letter_option
+@skip_existing_option
+@force_option
+@existing_ids_file_option
+@backfill_shard_option
+@plan_option
 @pgstac_username
 @pgstac_password
 @pgstac_host
@@ -267,30 +821,72 @@ def sync_oam(
     uploaded_since: float | None,
     uploaded_after: dt.datetime | None,
     handle_exceptions: HandleExceptionsType,
+    partition_buffer: int | None,
+    extent_file: Path | None,
+    dead_letter_file: Path | None,
+    skip_existing: bool,
+    force: bool,
+    existing_ids_file: Path | None,
+    backfill_shard: BackfillShard | None,
+    plan: bool,
     **_pgstac_options: Any,
 ):
     """Sync new STAC Items from OAM metadata API to PgSTAC."""
+    from pypgstac.load import Loader
+
+    create_oam_item = new_oam_stac_item_creator(
+        ctx.obj["geometry_options"], ctx.obj["read_options"]
+    )
+
     uploaded_after = parse_uploaded_since(uploaded_since, uploaded_after)
+    if plan:
+        existing = load_existing_ids(ctx, OAM_COLLECTION_ID, True, existing_ids_file)
+        report_plan(ctx, "OAM", uploaded_after, backfill_shard, existing)
+        return
+    ctx.with_resource(gdal_env(ctx.obj["read_options"]))
     loader = Loader(ctx.obj["pgstac"])
-    client = OamMetadataClient.new()
+    existing = load_existing_ids(
+        ctx, OAM_COLLECTION_ID, skip_existing and not force, existing_ids_file
+    )
 
     click.echo(f"Looking for OAM metadata entities added since {uploaded_after}")
-    items, errors = sync_handler(
+    dead_letters = DeadLetters(dead_letter_file)
+    ctx.call_on_close(dead_letters.close)
+    extent = ExtentAggregator.load(extent_file)
+    items = iter_stac_items(
         collection_id=OAM_COLLECTION_ID,
-        raw_metadata_creator=partial(get_oam_items_after, client),
+        raw_metadata_creator=new_oam_items_creator(backfill_shard),
         stac_item_creator=create_oam_item,
         uploaded_after=uploaded_after,
         handle_exceptions=handle_exceptions,
+        dead_letters=dead_letters,
+        extent=extent,
+        existing=existing,
+        asset_checker=ctx.obj["asset_checker"],
     )
-    loader.load_items(iter(items), insert_mode=Methods.upsert)
-    click.echo(f"Completed ingesting {len(items)} STAC Items")
-    report_errors(errors)
+    if partition_buffer is not None:
+        items = order_by_partition(items, partition_buffer)
+    count = load_items(loader, items, OAM_COLLECTION_ID, existing)
+    click.echo(f"Completed ingesting {count} STAC Items")
+    extent.save()
+    if existing is not None:
+        existing.save()
+    report_geometry_savings(ctx.obj["geometry_options"])
+    report_errors(dead_letters)
 
 
 @main.command()
 @uploaded_since_sec
 @uploaded_after_dt
 @handle_exceptions
+@partition_buffer_option
+@extent_file_option
+@dead_letter_option
+@skip_existing_option
+@force_option
+@existing_ids_file_option
+@backfill_shard_option
+@plan_option
 @pgstac_username
 @pgstac_password
 @pgstac_host
@@ -302,102 +898,1560 @@ def sync_maxar(
     uploaded_since: float | None,
     uploaded_after: dt.datetime | None,
     handle_exceptions: HandleExceptionsType,
+    partition_buffer: int | None,
+    extent_file: Path | None,
+    dead_letter_file: Path | None,
+    skip_existing: bool,
+    force: bool,
+    existing_ids_file: Path | None,
+    backfill_shard: BackfillShard | None,
+    plan: bool,
     **_pgstac_options: Any,
 ) -> None:
     """Sync new Maxar Items from the open data bucket to PgSTAC."""
+    from pypgstac.load import Loader
+
+    create_maxar_item = new_maxar_stac_item_creator(ctx.obj["geometry_options"])
+
     uploaded_after = parse_uploaded_since(uploaded_since, uploaded_after)
+    if plan:
+        # The IDs of Maxar STAC Items are only known once they are read
+        report_plan(ctx, "Maxar", uploaded_after, backfill_shard, None)
+        return
     loader = Loader(ctx.obj["pgstac"])
+    existing = load_existing_ids(
+        ctx, MAXAR_COLLECTION_ID, skip_existing and not force, existing_ids_file
+    )
 
     click.echo(f"Looking for STAC Items added since {uploaded_after}")
-    items, errors = sync_handler(
+    dead_letters = DeadLetters(dead_letter_file)
+    ctx.call_on_close(dead_letters.close)
+    extent = ExtentAggregator.load(extent_file)
+    items = iter_stac_items(
         collection_id=MAXAR_COLLECTION_ID,
-        raw_metadata_creator=get_maxar_items_after,
+        raw_metadata_creator=new_maxar_items_creator(backfill_shard),
         stac_item_creator=create_maxar_item,
         uploaded_after=uploaded_after,
         handle_exceptions=handle_exceptions,
+        dead_letters=dead_letters,
+        extent=extent,
+        existing=existing,
+        asset_checker=ctx.obj["asset_checker"],
     )
-    loader.load_items(iter(items), insert_mode=Methods.upsert)
-    click.echo(f"Completed ingesting {len(items)} STAC Items")
-    report_errors(errors)
+    if partition_buffer is not None:
+        items = order_by_partition(items, partition_buffer)
+    count = load_items(loader, items, MAXAR_COLLECTION_ID, existing)
+    click.echo(f"Completed ingesting {count} STAC Items")
+    extent.save()
+    if existing is not None:
+        existing.save()
+    report_geometry_savings(ctx.obj["geometry_options"])
+    report_errors(dead_letters)
 
 
-# ===== Helper functions
-def create_and_save_collection(catalog: str, destination: Path) -> None:
-    """Create a STAC Collection and write to JSON."""
-    if catalog == "OAM":
-        collection = create_oam_collection()
-    elif catalog == "Maxar":
-        maxar_catalog = pystac.read_file(urljoin(MAXAR_ROOT, "catalog.json"))
-        assert isinstance(maxar_catalog, pystac.Catalog)
-        collection = create_maxar_collection(maxar_catalog)
-    else:
-        raise click.BadParameter("Unknown collection ID {collection}")
+@main.command()
+@click.option(
+    "--catalog",
+    "catalogs",
+    type=click.Choice(["OAM", "Maxar"]),
+    multiple=True,
+    required=True,
+    help="Sync new STAC Items from this dataset catalog. Repeat for more catalogs.",
+)
+@uploaded_since_sec
+@uploaded_after_dt
+@handle_exceptions
+@partition_buffer_option
+@extent_file_option
+@dead_letter_option
+@skip_existing_option
+@force_option
+@existing_ids_file_option
+@backfill_shard_option
+@plan_option
+@pgstac_username
+@pgstac_password
+@pgstac_host
+@pgstac_port
+@pgstac_database
+@click.pass_context
+def sync(
+    ctx: click.Context,
+    catalogs: tuple[str, ...],
+    uploaded_since: float | None,
+    uploaded_after: dt.datetime | None,
+    handle_exceptions: HandleExceptionsType,
+    partition_buffer: int | None,
+    extent_file: Path | None,
+    dead_letter_file: Path | None,
+    skip_existing: bool,
+    force: bool,
+    existing_ids_file: Path | None,
+    backfill_shard: BackfillShard | None,
+    plan: bool,
+    **_pgstac_options: Any,
+) -> None:
+    """Sync new STAC Items from several catalogs to PgSTAC concurrently.
 
-    with destination.open("w") as dst:
-        dst.write(json.dumps(collection.to_dict()))
+    Each catalog is fetched, and its STAC Items created, on its own thread, while a
+    single loader upserts the STAC Items of all catalogs as they are created over
+    one PgSTAC connection. A sync takes about as long as its slowest catalog.
 
+    Extents and cached IDs are kept in one file per catalog, named after the
+    --extent-file and --existing-ids-file given, e.g. `extent-oam.json` and
+    `extent-maxar.json` for `--extent-file extent.json`.
+    """
+    from pypgstac.load import Loader
 
-def get_oam_items_after(
-    client: OamMetadataClient, uploaded_after: dt.datetime
-) -> Iterator[OamMetadata]:
-    """Helper function to yield sanitizied OamMetadata entities."""
-    for oam_metadata in client.get_all_items(uploaded_after):
-        yield oam_metadata.sanitize()
+    uploaded_after = parse_uploaded_since(uploaded_since, uploaded_after)
+    if plan:
+        for catalog in dict.fromkeys(catalogs):
+            collection_id = SOURCES[catalog].collection_id
+            existing = load_existing_ids(
+                ctx,
+                collection_id,
+                catalog == "OAM",
+                catalog_path(existing_ids_file, catalog),
+            )
+            report_plan(ctx, catalog, uploaded_after, backfill_shard, existing)
+        return
+    loader = Loader(ctx.obj["pgstac"])
+    dead_letters = DeadLetters(dead_letter_file)
+    ctx.call_on_close(dead_letters.close)
 
+    producers: dict[str, Callable[[], Iterator[dict]]] = {}
+    extents: list[ExtentAggregator] = []
+    existing_ids: dict[str, ExistingIds] = {}
+    for catalog in dict.fromkeys(catalogs):
+        source = SOURCES[catalog]
+        extent = ExtentAggregator.load(catalog_path(extent_file, catalog))
+        extents.append(extent)
+        existing = load_existing_ids(
+            ctx,
+            source.collection_id,
+            skip_existing and not force,
+            catalog_path(existing_ids_file, catalog),
+        )
+        if existing is not None:
+            existing_ids[source.collection_id] = existing
+        producers[catalog] = partial(
+            iter_stac_items,
+            collection_id=source.collection_id,
+            raw_metadata_creator=source.new_items_creator(backfill_shard),
+            stac_item_creator=source.new_stac_item_creator(
+                ctx.obj["geometry_options"], ctx.obj["read_options"]
+            ),
+            uploaded_after=uploaded_after,
+            handle_exceptions=handle_exceptions,
+            dead_letters=dead_letters,
+            extent=extent,
+            existing=existing,
+            asset_checker=ctx.obj["asset_checker"],
+        )
 
-def get_maxar_items_after(
-    uploaded_after: dt.datetime,
-) -> Iterator[pystac.Item]:
-    """Helper function to yield Maxar STAC Items."""
-    yield from new_maxar_stac_items(
-        pystac.stac_io.RetryStacIO(), requests.Session(), uploaded_after
+    click.echo(
+        f"Looking for STAC Items added since {uploaded_after} in {', '.join(producers)}"
     )
+    items = merge_producers(producers)
+    if partition_buffer is not None:
+        items = order_by_partition(items, partition_buffer)
+    try:
+        count = load_items(loader, items, existing=existing_ids)
+    except ProducerError as e:
+        raise click.ClickException(str(e)) from e
+    click.echo(f"Completed ingesting {count} STAC Items")
+    for extent in extents:
+        extent.save()
+    for existing in existing_ids.values():
+        existing.save()
+    report_geometry_savings(ctx.obj["geometry_options"])
+    report_errors(dead_letters)
 
 
-MetadataType = TypeVar("MetadataType")
+@main.command()
+@click.argument(
+    "files",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+def index(files: tuple[Path, ...]) -> None:
+    """Index existing NDJSON dumps for random access and balanced splits.
 
+    FILES are uncompressed NDJSON dumps. Each is read once and its index is written
+    alongside it, as if it had been dumped with --index.
+    """
+    for file in files:
+        if compression_from_path(file) is not None:
+            raise click.UsageError(
+                f"Only uncompressed NDJSON dumps can be indexed: {file}"
+            )
+        with METRICS.timer("index"):
+            count = build_index(file)
+        click.echo(f"Indexed {count} STAC Items in {file}")
 
-def sync_handler(
-    collection_id: str,
-    raw_metadata_creator: Callable[[dt.datetime], Iterator[MetadataType]],
-    stac_item_creator: Callable[[MetadataType], pystac.Item],
-    uploaded_after: dt.datetime,
-    handle_exceptions: HandleExceptionsType,
-) -> tuple[list[dict], list[str]]:
-    """Orchestrate creating STAC Items from a data provider."""
-    raw_metadata = list(raw_metadata_creator(uploaded_after))
-    click.echo(f"Found {len(raw_metadata)} metadata items added since {uploaded_after}")
 
-    items = []
-    errors = []
-    for raw_metadata_ in raw_metadata:
-        try:
-            item = stac_item_creator(raw_metadata_).to_dict()
-        except Exception as e:
-            if handle_exceptions == "IGNORE":
-                errors.append(f"{raw_metadata_}: {e}")
+@main.command()
+@click.argument("file", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("ids", nargs=-1, required=True)
+def lookup(file: Path, ids: tuple[str, ...]) -> None:
+    """Print STAC Items from an indexed NDJSON dump by ID, as NDJSON.
+
+    Only the index and the lines of the STAC Items requested are read from FILE.
+    """
+    try:
+        dump = IndexedDump(file)
+    except FileNotFoundError:
+        raise click.UsageError(
+            f"{file} has not been indexed, see `hotosm index`"
+        ) from None
+    missing = []
+    with dump:
+        for item_id in ids:
+            item = dump.get(item_id)
+            if item is None:
+                missing.append(item_id)
             else:
-                raise
-        # NOTE: STAC Items cannot contain a Collection ID unless they also include
-        # a link to the Collection, which we won't necessarily know ahead of time.
-        # We add the Collection ID here as a requirement for `pypgstac load items`.
-        item["collection"] = collection_id
-        items.append(item)
+                click.echo(dumps_str(item))
+    if missing:
+        raise click.ClickException(
+            f"STAC Items not found in {file}: {', '.join(missing)}"
+        )
+
+
+@main.command()
+@click.argument(
+    "files",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of concurrent PgSTAC connections.",
+)
+@click.option(
+    "--chunk-bytes",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CHUNK_BYTES,
+    show_default=True,
+    help="Split uncompressed NDJSON files into byte ranges of this size.",
+)
+@click.option(
+    "--state-file",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help=(
+        "Record loaded shards and byte ranges in this file, skipping them when "
+        "the load is resumed."
+    ),
+)
+@partition_buffer_option
+@pgstac_username
+@pgstac_password
+@pgstac_host
+@pgstac_port
+@pgstac_database
+@click.pass_context
+def load(
+    ctx: click.Context,
+    files: tuple[Path, ...],
+    workers: int,
+    chunk_bytes: int,
+    state_file: Path | None,
+    partition_buffer: int | None,
+    **_pgstac_options: Any,
+) -> None:
+    """Load dumped STAC Items into PgSTAC over concurrent connections.
 
-    return items, errors
+    FILES are NDJSON dumps, optionally compressed, or manifests of sharded dumps.
+    Shards and compressed files are each loaded over one connection, while
+    uncompressed files are split into byte ranges. STAC Items are upserted, so
+    interrupted loads can be resumed with the same --state-file.
+    """
+    from psycopg_pool import ConnectionPool
+    from pypgstac.db import PgstacDB
+    from pypgstac.load import Loader
 
+    tasks = plan_tasks(list(files), chunk_bytes)
+    state = LoadState(state_file)
+    click.echo(f"Loading {len(tasks)} shards or byte ranges with {workers} connections")
 
-def dump_to_ndjson(path: Path, items: list[dict]) -> None:
-    """Dump STAC Items to Newline Delimited JSON (NDJSON)."""
-    with path.open("w") as dst:
-        for item in items:
-            dst.write(json.dumps(item) + "\n")
-    click.echo(f"Completed dumping {len(items)} STAC Items to {path}")
+    def progress(task: LoadTask, count: int, seconds: float) -> None:
+        rate = count / seconds if seconds else 0.0
+        click.echo(
+            f"Loaded {count} STAC Items from {task.key} in {seconds:.1f}s "
+            f"({rate:.1f} items/s)"
+        )
+
+    pool = ConnectionPool(
+        conninfo=ctx.obj["pgstac"].dsn, min_size=1, max_size=workers, open=True
+    )
+    try:
+        result = load_tasks(
+            tasks,
+            new_loader=lambda: Loader(PgstacDB(pool=pool)),
+            workers=workers,
+            state=state,
+            progress=progress,
+            partition_buffer=partition_buffer,
+        )
+    finally:
+        pool.close()
+
+    if result.skipped:
+        click.echo(f"Skipped {len(result.skipped)} previously loaded tasks")
+    click.echo(
+        f"Completed loading {result.count} STAC Items in {result.seconds:.1f}s "
+        f"({result.items_per_second:.1f} items/s, "
+        f"{result.bytes_per_second / 1e6:.1f} MB/s)"
+    )
+    if result.failed:
+        for key, error in result.failed.items():
+            click.echo(f"{key}: {error}")
+        raise click.ClickException(
+            f"Failed to load {len(result.failed)} tasks. Rerun with the same "
+            "--state-file to retry them."
+        )
+
+
+@main.command()
+@click.argument(
+    "files",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default="number of CPUs",
+    help="Number of processes validating STAC Items concurrently.",
+)
+@click.option(
+    "--chunk-bytes",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CHUNK_BYTES,
+    show_default=True,
+    help="Split uncompressed NDJSON files into byte ranges of this size.",
+)
+@click.option(
+    "--schema-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help=(
+        "Directory of additional JSON schemas, e.g. of STAC extensions, used by "
+        "the URI in their `$id`."
+    ),
+)
+@click.option(
+    "--strict",
+    is_flag=True,
+    help="Fail if STAC Items declare extensions whose schema is not available.",
+)
+@click.option(
+    "--report",
+    "report_file",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help="Write every failure to this NDJSON file.",
+)
+def validate(
+    files: tuple[Path, ...],
+    workers: int,
+    chunk_bytes: int,
+    schema_dir: Path | None,
+    strict: bool,
+    report_file: Path | None,
+) -> None:
+    """Validate dumped STAC Items offline, e.g. before loading them.
+
+    FILES are NDJSON dumps, optionally compressed, or manifests of sharded dumps,
+    which are split as for `hotosm load` and validated over a pool of processes.
+    STAC Items are checked against the STAC core schemas bundled with PySTAC, the
+    OAM extension schema bundled with this package, schemas in --schema-dir and
+    invariants of the OAM catalog such as a positive `gsd`. Exits with an error if
+    any STAC Item is invalid.
+    """
+    tasks = plan_tasks(list(files), chunk_bytes)
+    click.echo(
+        f"Validating {len(tasks)} shards or byte ranges with {workers} processes"
+    )
+    with METRICS.timer("validate"):
+        report = validate_tasks(tasks, workers, schema_dir)
+
+    for failure in report.failures[:DEFAULT_MAX_REPORTED]:
+        click.echo(str(failure))
+    if (hidden := len(report.failures) - DEFAULT_MAX_REPORTED) > 0:
+        click.echo(f"... and {hidden} more")
+    if report_file is not None:
+        with report_file.open("w") as dst:
+            for failure in report.failures:
+                dst.write(dumps_str(failure.to_dict()) + "\n")
+    for key, error in report.errors.items():
+        click.echo(f"{key}: {error}")
+    for uri, count in report.unchecked.most_common():
+        click.echo(f"Schema not available offline for {count} STAC Items: {uri}")
+
+    click.echo(
+        f"Validated {report.count} STAC Items in {report.seconds:.1f}s "
+        f"({report.items_per_second:.1f} items/s)"
+    )
+    if report.failures or report.errors:
+        raise click.ClickException(
+            f"{len(report.failures)} STAC Items failed validation and "
+            f"{len(report.errors)} files or byte ranges could not be read"
+        )
+    if strict and report.unchecked:
+        raise click.ClickException(
+            f"{len(report.unchecked)} schemas were not available, add them to "
+            "--schema-dir"
+        )
+
+
+@main.command()
+@click.option(
+    "--dead-letter",
+    "dead_letter_file",
+    type=click.Path(exists=True, dir_okay=False, writable=True, path_type=Path),
+    required=True,
+    help="Dead-letter file written with --dead-letter by another program.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Number of records fetched and turned into STAC Items concurrently.",
+)
+@pgstac_username
+@pgstac_password
+@pgstac_host
+@pgstac_port
+@pgstac_database
+@click.pass_context
+def retry(
+    ctx: click.Context,
+    dead_letter_file: Path,
+    workers: int,
+    **_pgstac_options: Any,
+) -> None:
+    """Reprocess the records in a dead-letter file and sync them to PgSTAC.
+
+    Only the failed records are fetched again from upstream, instead of rerunning
+    the whole window they were found in. Records that fail again are written back
+    to the dead-letter file, replacing its contents.
+    """
+    from pypgstac.load import Loader
 
+    loader = Loader(ctx.obj["pgstac"])
+    fetchers = new_dead_letter_fetchers()
+    creators: dict[str, Callable[[Any], pystac.Item]] = {
+        OAM_COLLECTION_ID: new_oam_stac_item_creator(
+            ctx.obj["geometry_options"], ctx.obj["read_options"]
+        ),
+        MAXAR_COLLECTION_ID: new_maxar_stac_item_creator(ctx.obj["geometry_options"]),
+    }
+
+    groups = group_by_collection(read_dead_letters(dead_letter_file))
+    tmp = dead_letter_file.with_suffix(dead_letter_file.suffix + ".tmp")
+    tmp.unlink(missing_ok=True)
+    with DeadLetters(tmp) as failures:
+        for collection_id, dead_letters in groups.items():
+            click.echo(f"Retrying {len(dead_letters)} records for {collection_id}")
+            if collection_id not in creators:
+                click.echo(f"Skipping records for unknown collection {collection_id}")
+                for dead_letter in dead_letters:
+                    failures.add(dead_letter)
+                continue
+            items = retry_dead_letters(
+                dead_letters,
+                fetch=fetchers[collection_id],
+                create=creators[collection_id],
+                workers=workers,
+                failures=failures,
+            )
+            count = load_items(loader, items, collection_id)
+            click.echo(f"Completed ingesting {count} STAC Items")
+    if tmp.exists():
+        tmp.replace(dead_letter_file)
+    else:
+        dead_letter_file.write_bytes(b"")
+
+    report_geometry_savings(ctx.obj["geometry_options"])
+    # Records that failed again have been moved into the original dead-letter file
+    report_errors(failures, dead_letter_file)
 
-def report_errors(errors: list[str]) -> None:
-    """Helper function to report error messages via Click."""
-    if errors:
-        click.echo(f"Encountered errors with {len(errors)} OAM catalog entries:")
-        for error in errors:
-            click.echo(error)
+
+@main.command()
+@click.option(
+    "--catalog",
+    type=click.Choice(["OAM", "Maxar"]),
+    required=True,
+    help="Watch this dataset catalog for new STAC Items.",
+)
+@click.option(
+    "--interval",
+    type=click.FloatRange(min=0, min_open=True),
+    default=300.0,
+    show_default=True,
+    help="Seconds between the start of consecutive polls.",
+)
+@click.option(
+    "--jitter",
+    type=click.FloatRange(min=0, max=1),
+    default=0.1,
+    show_default=True,
+    help="Randomize each interval by up to this fraction of --interval.",
+)
+@click.option(
+    "--overlap",
+    type=click.FloatRange(min=0),
+    default=60.0,
+    show_default=True,
+    help="Seconds of overlap between consecutive polling windows.",
+)
+@click.option(
+    "--watermark-file",
+    type=click.Path(writable=True, path_type=Path),
+    help="Persist the polling watermark to this file to resume after restarts.",
+)
+@uploaded_since_sec
+@uploaded_after_dt
+@handle_exceptions
+@extent_file_option
+@dead_letter_option
+@skip_existing_option
+@force_option
+@existing_ids_file_option
+@pgstac_username
+@pgstac_password
+@pgstac_host
+@pgstac_port
+@pgstac_database
+@click.pass_context
+def watch(
+    ctx: click.Context,
+    catalog: str,
+    interval: float,
+    jitter: float,
+    overlap: float,
+    watermark_file: Path | None,
+    uploaded_since: float | None,
+    uploaded_after: dt.datetime | None,
+    handle_exceptions: HandleExceptionsType,
+    extent_file: Path | None,
+    dead_letter_file: Path | None,
+    skip_existing: bool,
+    force: bool,
+    existing_ids_file: Path | None,
+    **_pgstac_options: Any,
+) -> None:
+    """Continuously sync new STAC Items from a catalog to PgSTAC.
+
+    HTTP sessions, the GDAL environment and the PgSTAC connection are kept open
+    between polls. Polling starts from the watermark file if it exists, otherwise
+    from --uploaded-since/--uploaded-after, otherwise one interval ago.
+    """
+    if uploaded_since is None and uploaded_after is None:
+        start = dt.datetime.now(tz=dt.UTC) - dt.timedelta(seconds=interval)
+    else:
+        start = parse_uploaded_since(uploaded_since, uploaded_after)
+    from pypgstac.load import Loader
+
+    watermark = Watermark.load(start, watermark_file)
+    extent = ExtentAggregator.load(extent_file)
+    loader = Loader(ctx.obj["pgstac"])
+
+    source = SOURCES[catalog]
+    collection_id = source.collection_id
+    raw_metadata_creator = source.new_items_creator(None)
+    stac_item_creator = source.new_stac_item_creator(
+        ctx.obj["geometry_options"], ctx.obj["read_options"]
+    )
+    existing = load_existing_ids(
+        ctx, collection_id, skip_existing and not force, existing_ids_file
+    )
+
+    def poll(after: dt.datetime) -> None:
+        click.echo(f"Looking for STAC Items added since {after}")
+        with DeadLetters(dead_letter_file) as dead_letters:
+            items, _ = sync_handler(
+                collection_id=collection_id,
+                raw_metadata_creator=raw_metadata_creator,
+                stac_item_creator=stac_item_creator,
+                uploaded_after=after,
+                handle_exceptions=handle_exceptions,
+                dead_letters=dead_letters,
+                extent=extent,
+                existing=existing,
+                asset_checker=ctx.obj["asset_checker"],
+            )
+        if items:
+            load_items(loader, items, collection_id, existing)
+            extent.save()
+            if existing is not None:
+                existing.save()
+        click.echo(f"Completed ingesting {len(items)} STAC Items")
+        report_geometry_savings(ctx.obj["geometry_options"])
+        report_errors(dead_letters)
+        ctx.obj["export_metrics"]()
+
+    stop = threading.Event()
+    install_signal_handlers(stop)
+    with gdal_env(ctx.obj["read_options"]):
+        polls = run_watch(
+            poll,
+            watermark,
+            interval=interval,
+            jitter=jitter,
+            overlap=dt.timedelta(seconds=overlap),
+            stop=stop,
+        )
+    ctx.obj["pgstac"].close()
+    click.echo(f"Stopped watching {catalog} after {polls} polls")
+
+
+@main.command()
+@click.option(
+    "--queue",
+    "queue_file",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help=(
+        "SQLite file queueing upload events, shared with `hotosm enqueue` and "
+        "other consumers. Events are only kept in memory if not provided."
+    ),
+)
+@click.option(
+    "--webhook",
+    metavar="HOST:PORT",
+    help="Receive upload events POSTed to an HTTP server on this address.",
+)
+@click.option(
+    "--webhook-token",
+    envvar="HOTOSM_WEBHOOK_TOKEN",
+    help="Require this bearer token on requests to the webhook.",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=100,
+    show_default=True,
+    help="Largest number of upload events ingested together.",
+)
+@click.option(
+    "--batch-seconds",
+    type=click.FloatRange(min=0),
+    default=5.0,
+    show_default=True,
+    help="Seconds to wait for a batch to fill after its first event.",
+)
+@click.option(
+    "--lease-seconds",
+    type=click.FloatRange(min=0, min_open=True),
+    default=DEFAULT_LEASE_SECONDS,
+    show_default=True,
+    help="Seconds after which the events of a batch that failed are retried.",
+)
+@handle_exceptions
+@extent_file_option
+@dead_letter_option
+@pgstac_username
+@pgstac_password
+@pgstac_host
+@pgstac_port
+@pgstac_database
+@click.pass_context
+def consume(
+    ctx: click.Context,
+    queue_file: Path | None,
+    webhook: str | None,
+    webhook_token: str | None,
+    batch_size: int,
+    batch_seconds: float,
+    lease_seconds: float,
+    handle_exceptions: HandleExceptionsType,
+    extent_file: Path | None,
+    dead_letter_file: Path | None,
+    **_pgstac_options: Any,
+) -> None:
+    """Sync OAM images to PgSTAC as upload events arrive.
+
+    Upload events carry the IDs of images added to OAM. Images are fetched from the
+    OAM metadata API and upserted to PgSTAC in micro-batches, and events are only
+    removed from the queue once their batch has been loaded. Images that could not
+    be turned into STAC Items are written to the dead-letter file.
+    """
+    if queue_file is None and webhook is None:
+        raise click.UsageError("Provide --queue, --webhook or both")
+    from pypgstac.load import Loader
+
+    from stactools.hotosm.oam_metadata_client import OamMetadataClient
+
+    queue: EventQueue = MemoryQueue() if queue_file is None else SqliteQueue(queue_file)
+    ctx.call_on_close(queue.close)
+    receiver = None
+    if webhook is not None:
+        host, _, port = webhook.rpartition(":")
+        if not port.isdigit():
+            raise click.BadParameter("Expected HOST:PORT", param_hint="--webhook")
+        receiver = WebhookReceiver(
+            queue, host or "127.0.0.1", int(port), token=webhook_token
+        ).start()
+
+    extent = ExtentAggregator.load(extent_file)
+    loader = Loader(ctx.obj["pgstac"])
+    client = OamMetadataClient.new()
+    stac_item_creator = new_oam_stac_item_creator(
+        ctx.obj["geometry_options"], ctx.obj["read_options"]
+    )
+
+    def ingest(ids: list[str]) -> None:
+        with DeadLetters(dead_letter_file) as dead_letters:
+            raw_metadata = timed_iter(get_oam_items_by_id(client, ids, dead_letters))
+            items = create_stac_items(
+                OAM_COLLECTION_ID,
+                raw_metadata,
+                stac_item_creator,
+                handle_exceptions,
+                dead_letters,
+                extent,
+                asset_checker=ctx.obj["asset_checker"],
+            )
+            count = load_items(loader, items, OAM_COLLECTION_ID)
+        extent.save()
+        click.echo(f"Ingested {count} STAC Items from {len(ids)} upload events")
+        report_errors(dead_letters)
+        ctx.obj["export_metrics"]()
+
+    stop = threading.Event()
+    install_signal_handlers(stop)
+    try:
+        with gdal_env(ctx.obj["read_options"]):
+            batches = run_consumer(
+                queue,
+                ingest,
+                batch_size=batch_size,
+                batch_seconds=batch_seconds,
+                stop=stop,
+                lease_seconds=lease_seconds,
+            )
+    finally:
+        if receiver is not None:
+            receiver.stop()
+    ctx.obj["pgstac"].close()
+    click.echo(f"Stopped consuming upload events after {batches} batches")
+
+
+@main.command()
+@click.option(
+    "--queue",
+    "queue_file",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    required=True,
+    help="SQLite file queueing upload events, read by `hotosm consume`.",
+)
+@click.argument("ids", nargs=-1, required=True)
+def enqueue(queue_file: Path, ids: tuple[str, ...]) -> None:
+    """Queue upload events for OAM images by ID, e.g. to backfill missed events."""
+    queue = SqliteQueue(queue_file)
+    try:
+        count = queue.put(ids)
+    finally:
+        queue.close()
+    click.echo(f"Queued {count} upload events in {queue_file}")
+
+
+@main.command()
+@click.option(
+    "--catalog",
+    type=click.Choice(["OAM", "Maxar"]),
+    required=True,
+    help="Reconcile PgSTAC with this dataset catalog.",
+)
+@click.option(
+    "--orphans",
+    "orphans_file",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    required=True,
+    help="Write IDs of STAC Items removed upstream to this file, one per line.",
+)
+@click.option(
+    "--missing",
+    "missing_file",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help="Write IDs of upstream records missing from PgSTAC to this file.",
+)
+@click.option(
+    "--delete",
+    is_flag=True,
+    help="Delete the STAC Items removed upstream from PgSTAC.",
+)
+@click.option(
+    "--max-delete-fraction",
+    type=click.FloatRange(min=0, max=1),
+    default=0.05,
+    show_default=True,
+    help=(
+        "Refuse to --delete more than this fraction of the STAC Items in PgSTAC, "
+        "e.g. if the upstream listing was truncated."
+    ),
+)
+@click.option(
+    "--sort-buffer",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SORT_BUFFER,
+    show_default=True,
+    help="Upstream IDs sorted in memory before sorted runs are spilled to disk.",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_RECONCILE_BATCH_SIZE,
+    show_default=True,
+    help="IDs read from, or deleted from, PgSTAC per round trip.",
+)
+@pgstac_username
+@pgstac_password
+@pgstac_host
+@pgstac_port
+@pgstac_database
+@click.pass_context
+def reconcile(
+    ctx: click.Context,
+    catalog: str,
+    orphans_file: Path,
+    missing_file: Path | None,
+    delete: bool,
+    max_delete_fraction: float,
+    sort_buffer: int,
+    batch_size: int,
+    **_pgstac_options: Any,
+) -> None:
+    """Find, and optionally delete, STAC Items removed from a catalog upstream.
+
+    The complete upstream ID set is sorted on disk and merged against the IDs in
+    PgSTAC, streamed in sorted order, so memory use does not grow with the size
+    of the catalog.
+    """
+    db = ctx.obj["pgstac"]
+    collection_id = SOURCES[catalog].collection_id
+
+    click.echo(f"Comparing the IDs of {catalog} with PgSTAC")
+    result = reconcile_ids(
+        new_upstream_ids(catalog),
+        iter_pgstac_ids(db, collection_id, batch_size),
+        orphans_file,
+        missing_file,
+        buffer_ids=sort_buffer,
+    )
+    click.echo(
+        f"Found {result.upstream} upstream records and {result.catalog} STAC Items: "
+        f"{result.orphans} removed upstream, {result.missing} missing from PgSTAC"
+    )
+    click.echo(f"Wrote the IDs of STAC Items removed upstream to {orphans_file}")
+
+    if delete and result.orphans:
+        if result.orphans > max_delete_fraction * result.catalog:
+            db.close()
+            raise click.ClickException(
+                f"Refusing to delete {result.orphans} of {result.catalog} STAC "
+                f"Items, more than --max-delete-fraction={max_delete_fraction}"
+            )
+        deleted = delete_items(db, collection_id, read_ids(orphans_file), batch_size)
+        click.echo(f"Deleted {deleted} STAC Items from {collection_id}")
+    db.close()
+
+
+@main.command()
+@click.argument(
+    "records",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help=(
+        "Merge the dumps into this NDJSON file, keeping one copy of duplicated "
+        "STAC Items. Compressed if it ends with `.gz` or `.zst`."
+    ),
+)
+@click.option(
+    "--missing",
+    "missing_file",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help="Write IDs of upstream records missing from the dumps to this file.",
+)
+@click.option(
+    "--strict",
+    is_flag=True,
+    help="Fail if upstream records are missing from the dumps.",
+)
+@click.option(
+    "--sort-buffer",
+    type=click.IntRange(min=1),
+    default=DEFAULT_SORT_BUFFER,
+    show_default=True,
+    help="IDs sorted in memory before sorted runs are spilled to disk.",
+)
+def merge_backfill(
+    records: tuple[Path, ...],
+    output: Path | None,
+    missing_file: Path | None,
+    strict: bool,
+    sort_buffer: int,
+) -> None:
+    """Check that the dumps of a backfill split with --shard are complete.
+
+    Takes the records written next to the dump of each slice, which must cover
+    every slice of the backfill exactly once. The IDs of the dumped STAC Items are
+    compared with the IDs of the upstream records added since the same datetime,
+    up to when the first slice started listing the catalog, and the dumps are
+    optionally merged into one file.
+    """
+    try:
+        backfill = [BackfillRecord.read(path) for path in records]
+        check_records(backfill)
+    except (ValueError, KeyError) as e:
+        raise click.ClickException(str(e)) from e
+    catalog = backfill[0].catalog
+    uploaded_after = backfill[0].uploaded_after
+    uploaded_before = listed_before(backfill)
+    tasks = plan_tasks([record.dump for record in backfill])
+
+    def dumped_items() -> Iterator[dict]:
+        for task in tasks:
+            yield from task.read()
+
+    click.echo(
+        f"Comparing {sum(record.count for record in backfill)} dumped STAC Items "
+        f"with the records added to {catalog} between {uploaded_after} and "
+        f"{uploaded_before}"
+    )
+    result = verify_backfill(
+        backfilled_upstream_ids(catalog, uploaded_after, uploaded_before),
+        (item["id"] for item in dumped_items()),
+        missing_file,
+        buffer_ids=sort_buffer,
+    )
+    click.echo(
+        f"Found {result.upstream} upstream records and {result.dumped} STAC Items: "
+        f"{result.missing} missing, {len(result.duplicates)} duplicated and "
+        f"{result.unexpected} not upstream"
+    )
+    if missing_file is not None:
+        click.echo(f"Wrote the IDs of missing records to {missing_file}")
+
+    if output is not None:
+        count = dump_items(output, unique_items(dumped_items(), result.duplicates))
+        click.echo(f"Merged {count} STAC Items into {output}")
+    if strict and result.missing:
+        raise click.ClickException(
+            f"{result.missing} upstream records are missing from the dumps"
+        )
+
+
+# ===== Helper functions
+def create_and_save_collection(
+    catalog: str, destination: Path, extent_file: Path | None = None
+) -> None:
+    """Create a STAC Collection and write to JSON.
+
+    The extent of the STAC Collection is taken from `extent_file`, aggregated while
+    syncing STAC Items, if provided.
+    """
+    import pystac
+
+    from stactools.hotosm.maxar.stac import (
+        create_collection as create_maxar_collection,
+    )
+    from stactools.hotosm.maxar.sync import MAXAR_ROOT
+    from stactools.hotosm.stac import create_collection as create_oam_collection
+
+    if catalog == "OAM":
+        collection = create_oam_collection()
+    elif catalog == "Maxar":
+        maxar_catalog = pystac.read_file(urljoin(MAXAR_ROOT, "catalog.json"))
+        assert isinstance(maxar_catalog, pystac.Catalog)
+        collection = create_maxar_collection(maxar_catalog)
+    else:
+        raise click.BadParameter("Unknown collection ID {collection}")
+
+    if extent_file is not None:
+        extent = ExtentAggregator.load(extent_file)
+        if extent.bbox is None:
+            raise click.UsageError(
+                f"No STAC Items have been aggregated in {extent_file}"
+            )
+        collection.extent = extent.to_extent()
+        click.echo(f"Using the extent of {extent.count} STAC Items from {extent_file}")
+
+    with destination.open("w") as dst:
+        dst.write(dumps_str(collection.to_dict()))
+
+
+def new_oam_items_creator(
+    shard: BackfillShard | None = None,
+) -> Callable[[dt.datetime], Iterator[OamMetadata]]:
+    """Create a function yielding new OamMetadata entities with a new API client.
+
+    Only the entities in `shard` are yielded, if provided.
+    """
+    from stactools.hotosm.oam_metadata_client import OamMetadataClient
+
+    return partial(get_oam_items_after, OamMetadataClient.new(), shard=shard)
+
+
+def new_maxar_items_creator(
+    shard: BackfillShard | None = None,
+) -> Callable[[dt.datetime], Iterator[pystac.Item]]:
+    """Create a function yielding new Maxar STAC Items with a new HTTP session.
+
+    Only the STAC Items in `shard` are yielded, if provided.
+    """
+    import requests
+
+    from stactools.hotosm.maxar.sync import LimitedStacIO
+
+    return partial(
+        get_maxar_items_after, LimitedStacIO(), requests.Session(), shard=shard
+    )
+
+
+def new_oam_stac_item_creator(
+    geometry_options: GeometryOptions,
+    read_options: AssetReadOptions,
+) -> Callable[[OamMetadata], pystac.Item]:
+    """Create a function creating OAM STAC Items with optimized geometries."""
+    from stactools.hotosm.stac import create_item
+
+    return partial(
+        create_item, geometry_options=geometry_options, read_options=read_options
+    )
+
+
+def new_maxar_stac_item_creator(
+    geometry_options: GeometryOptions,
+) -> Callable[[pystac.Item], pystac.Item]:
+    """Create a function rewriting Maxar STAC Items with optimized geometries."""
+    from stactools.hotosm.maxar.stac import create_item
+
+    return partial(create_item, geometry_options=geometry_options)
+
+
+@dataclass(frozen=True)
+class Source:
+    """Dataset catalog that STAC Items are synced from.
+
+    Attributes:
+        collection_id: ID of the STAC Collection of the STAC Items.
+        new_items_creator: Create a function yielding the upstream records added
+            after a datetime, in a slice of the catalog if one is given.
+        new_stac_item_creator: Create a function turning an upstream record into a
+            STAC Item, with geometry and asset read options.
+    """
+
+    collection_id: str
+    new_items_creator: Callable[
+        [BackfillShard | None], Callable[[dt.datetime], Iterator[Any]]
+    ]
+    new_stac_item_creator: Callable[
+        [GeometryOptions, AssetReadOptions], Callable[[Any], pystac.Item]
+    ]
+
+
+def _new_maxar_stac_item_creator(
+    geometry_options: GeometryOptions, _read_options: AssetReadOptions
+) -> Callable[[pystac.Item], pystac.Item]:
+    # Maxar STAC Items are rewritten without reading their assets
+    return new_maxar_stac_item_creator(geometry_options)
+
+
+# Dataset catalogs, by the name used for --catalog
+SOURCES: dict[str, Source] = {
+    "OAM": Source(OAM_COLLECTION_ID, new_oam_items_creator, new_oam_stac_item_creator),
+    "Maxar": Source(
+        MAXAR_COLLECTION_ID, new_maxar_items_creator, _new_maxar_stac_item_creator
+    ),
+}
+
+
+def backfilled_upstream_ids(
+    catalog: str, uploaded_after: dt.datetime, uploaded_before: dt.datetime
+) -> Iterator[str]:
+    """Yield the IDs of the STAC Items a backfill dumps from the records of a catalog.
+
+    Records are listed and filtered as they are when dumped, so OAM images with
+    metadata that cannot be parsed are left out. Only records added between
+    `uploaded_after` and `uploaded_before` are listed.
+    """
+    if catalog == "OAM":
+        from stactools.hotosm.oam_metadata_client import OamMetadataClient
+
+        for oam_metadata in OamMetadataClient.new().get_all_items(uploaded_after):
+            assert oam_metadata.uploaded_at is not None
+            if oam_metadata.uploaded_at < uploaded_before:
+                yield oam_metadata.id
+    else:
+        import requests
+
+        from stactools.hotosm.maxar.stac import item_id
+        from stactools.hotosm.maxar.sync import LimitedStacIO, new_stac_items
+
+        items = new_stac_items(
+            LimitedStacIO(),
+            requests.Session(),
+            uploaded_after,
+            before=uploaded_before,
+        )
+        for item in items:
+            yield item_id(item.id)
+
+
+def new_upstream_ids(catalog: str) -> Iterator[str]:
+    """Yield the IDs of the STAC Items created from all records of a catalog."""
+    if catalog == "OAM":
+        from stactools.hotosm.oam_metadata_client import OamMetadataClient
+
+        yield from OamMetadataClient.new().get_all_ids()
+    else:
+        import requests
+
+        from stactools.hotosm.maxar.stac import item_id
+        from stactools.hotosm.maxar.sync import LimitedStacIO, new_stac_items
+
+        for item in new_stac_items(LimitedStacIO(), requests.Session(), None):
+            yield item_id(item.id)
+
+
+def new_dead_letter_fetchers() -> dict[str, Callable[[DeadLetter], Any]]:
+    """Create functions fetching the upstream records of failures, by Collection."""
+    import pystac
+
+    from stactools.hotosm.maxar.sync import LimitedStacIO
+    from stactools.hotosm.oam_metadata_client import OamMetadataClient
+
+    client = OamMetadataClient.new()
+    stac_io = LimitedStacIO()
+
+    def fetch_oam(dead_letter: DeadLetter) -> OamMetadata:
+        return client.get_item(dead_letter.id).sanitize()
+
+    def fetch_maxar(dead_letter: DeadLetter) -> pystac.Item:
+        if dead_letter.href is None:
+            raise ValueError(f"No HREF recorded for Maxar STAC Item {dead_letter.id}")
+        return pystac.Item.from_file(dead_letter.href, stac_io=stac_io)
+
+    return {OAM_COLLECTION_ID: fetch_oam, MAXAR_COLLECTION_ID: fetch_maxar}
+
+
+def get_oam_items_after(
+    client: OamMetadataClient,
+    uploaded_after: dt.datetime,
+    shard: BackfillShard | None = None,
+) -> Iterator[OamMetadata]:
+    """Helper function to yield sanitizied OamMetadata entities.
+
+    If `shard` is provided, only the entities in its range of pages are yielded.
+    Pages are then listed oldest first, so that images uploaded during a backfill
+    are added to the last page, which belongs to the last shard, rather than moving
+    the entities of every page.
+    """
+    if shard is None:
+        entities = client.get_all_items(uploaded_after)
+    else:
+        pages = math.ceil(client.get_count() / OAM_PAGE_SIZE)
+        first_page, last_page = shard.page_range(pages)
+        entities = client.get_all_items(
+            uploaded_after,
+            limit=OAM_PAGE_SIZE,
+            first_page=first_page,
+            last_page=last_page,
+            sort="asc",
+        )
+    for oam_metadata in entities:
+        yield oam_metadata.sanitize()
+
+
+def get_oam_items_by_id(
+    client: OamMetadataClient, ids: Iterable[str], dead_letters: DeadLetters
+) -> Iterator[OamMetadata]:
+    """Yield sanitized OamMetadata entities for image IDs.
+
+    Images that could not be fetched, e.g. because they were deleted since their
+    upload event, are added to `dead_letters`.
+    """
+    for id_ in ids:
+        try:
+            with METRICS.timer("fetch", collection=OAM_COLLECTION_ID):
+                oam_metadata = client.get_item(id_).sanitize()
+        except Exception as e:
+            METRICS.inc(ITEMS, collection=OAM_COLLECTION_ID, outcome="failed")
+            dead_letters.add(
+                DeadLetter.from_exception(OAM_COLLECTION_ID, id_, "fetch", e)
+            )
+            continue
+        yield oam_metadata
+
+
+def get_maxar_items_after(
+    stac_io: pystac.StacIO,
+    session: requests.Session,
+    uploaded_after: dt.datetime,
+    shard: BackfillShard | None = None,
+) -> Iterator[pystac.Item]:
+    """Helper function to yield Maxar STAC Items, of the events in `shard` if given."""
+    from stactools.hotosm.maxar.sync import new_stac_items as new_maxar_stac_items
+
+    yield from new_maxar_stac_items(stac_io, session, uploaded_after, shard)
+
+
+MetadataType = TypeVar("MetadataType")
+
+
+def sync_handler(
+    collection_id: str,
+    raw_metadata_creator: Callable[[dt.datetime], Iterator[MetadataType]],
+    stac_item_creator: Callable[[MetadataType], pystac.Item],
+    uploaded_after: dt.datetime,
+    handle_exceptions: HandleExceptionsType,
+    dead_letters: DeadLetters | None = None,
+    extent: ExtentAggregator | None = None,
+    existing: ExistingIds | None = None,
+    asset_checker: AssetChecker | None = None,
+) -> tuple[list[dict], DeadLetters]:
+    """Orchestrate creating STAC Items from a data provider."""
+    dead_letters = dead_letters if dead_letters is not None else DeadLetters()
+    items = list(
+        iter_stac_items(
+            collection_id=collection_id,
+            raw_metadata_creator=raw_metadata_creator,
+            stac_item_creator=stac_item_creator,
+            uploaded_after=uploaded_after,
+            handle_exceptions=handle_exceptions,
+            dead_letters=dead_letters,
+            extent=extent,
+            existing=existing,
+            asset_checker=asset_checker,
+        )
+    )
+    return items, dead_letters
+
+
+def iter_stac_items(
+    collection_id: str,
+    raw_metadata_creator: Callable[[dt.datetime], Iterator[MetadataType]],
+    stac_item_creator: Callable[[MetadataType], pystac.Item],
+    uploaded_after: dt.datetime,
+    handle_exceptions: HandleExceptionsType,
+    dead_letters: DeadLetters,
+    extent: ExtentAggregator | None = None,
+    existing: ExistingIds | None = None,
+    asset_checker: AssetChecker | None = None,
+) -> Iterator[dict]:
+    """Yield STAC Item dictionaries as they are created from a data provider.
+
+    Records that could not be turned into STAC Items are added to `dead_letters`,
+    and skipped when `handle_exceptions` is "IGNORE". The extent of created STAC
+    Items is added to `extent`, if provided. Records of STAC Items in `existing`
+    are skipped, and the assets of created STAC Items are checked with
+    `asset_checker`, if provided.
+    """
+    with METRICS.timer("fetch", collection=collection_id):
+        raw_metadata = list(timed_iter(raw_metadata_creator(uploaded_after)))
+    click.echo(f"Found {len(raw_metadata)} metadata items added since {uploaded_after}")
+
+    yield from create_stac_items(
+        collection_id,
+        raw_metadata,
+        stac_item_creator,
+        handle_exceptions,
+        dead_letters,
+        extent,
+        existing,
+        asset_checker,
+    )
+
+
+def stac_item_id(collection_id: str, raw_metadata: Any) -> str:
+    """ID of the STAC Item created from an upstream record."""
+    if collection_id == MAXAR_COLLECTION_ID:
+        from stactools.hotosm.maxar.stac import item_id
+
+        return item_id(raw_metadata.id)
+    return str(raw_metadata.id)
+
+
+def load_existing_ids(
+    ctx: click.Context,
+    collection_id: str,
+    enabled: bool,
+    existing_ids_file: Path | None,
+) -> ExistingIds | None:
+    """Load the IDs of STAC Items already in PgSTAC for --skip-existing."""
+    if not enabled:
+        return None
+    with METRICS.timer("existing_ids", collection=collection_id):
+        existing = ExistingIds.load(ctx.obj["pgstac"], collection_id, existing_ids_file)
+    click.echo(f"Skipping the {len(existing)} STAC Items already in {collection_id}")
+    return existing
+
+
+def create_stac_items(
+    collection_id: str,
+    raw_metadata: Iterable[tuple[MetadataType, float]],
+    stac_item_creator: Callable[[MetadataType], pystac.Item],
+    handle_exceptions: HandleExceptionsType,
+    dead_letters: DeadLetters,
+    extent: ExtentAggregator | None = None,
+    existing: ExistingIds | None = None,
+    asset_checker: AssetChecker | None = None,
+) -> Iterator[dict]:
+    """Yield STAC Item dictionaries created from fetched upstream records.
+
+    `raw_metadata` pairs each record with the seconds spent fetching it, as yielded
+    by `timed_iter`. Records of STAC Items in `existing` are skipped before
+    creating them, if provided. The assets of created STAC Items are checked with
+    `asset_checker`, if provided, and STAC Items with missing assets fail like
+    records that could not be turned into STAC Items.
+    """
+    count = 0
+    skipped = 0
+    start = time.perf_counter()
+
+    def created() -> Iterator[tuple[MetadataType, dict]]:
+        nonlocal skipped
+        for raw_metadata_, fetch_seconds in raw_metadata:
+            if existing is not None:
+                if stac_item_id(collection_id, raw_metadata_) in existing:
+                    METRICS.inc(ITEMS, collection=collection_id, outcome="skipped")
+                    skipped += 1
+                    continue
+            stage = "create_item"
+            try:
+                with trace_item(SLOW_ITEMS, raw_metadata_, fetch_seconds):
+                    with METRICS.timer(stage, collection=collection_id):
+                        stac_item = stac_item_creator(raw_metadata_)
+                    stage = "serialize"
+                    with METRICS.timer(stage, collection=collection_id):
+                        item = stac_item.to_dict()
+            except Exception as e:
+                fail(raw_metadata_, stage, e)
+                continue
+            yield raw_metadata_, item
+
+    def fail(raw_metadata_: MetadataType, stage: str, e: Exception) -> None:
+        METRICS.inc(ITEMS, collection=collection_id, outcome="failed")
+        dead_letters.add(
+            DeadLetter.from_exception(collection_id, raw_metadata_, stage, e)
+        )
+        if handle_exceptions != "IGNORE":
+            raise e
+
+    if asset_checker is None:
+        checked: Iterable[tuple[MetadataType, dict, list[AssetCheck]]] = (
+            (raw_metadata_, item, []) for raw_metadata_, item in created()
+        )
+    else:
+        checked = asset_checker.check_items(created())
+    for raw_metadata_, item, missing in checked:
+        if missing:
+            fail(
+                raw_metadata_,
+                "check_assets",
+                AssetNotFoundError(
+                    "Missing assets: " + ", ".join(str(check) for check in missing)
+                ),
+            )
+            continue
+        METRICS.inc(ITEMS, collection=collection_id, outcome="created")
+        # NOTE: STAC Items cannot contain a Collection ID unless they also include
+        # a link to the Collection, which we won't necessarily know ahead of time.
+        # We add the Collection ID here as a requirement for `pypgstac load items`.
+        item["collection"] = collection_id
+        if extent is not None:
+            extent.add(item)
+        count += 1
+        yield item
+
+    if skipped:
+        click.echo(f"Skipped {skipped} STAC Items already in PgSTAC")
+    if elapsed := time.perf_counter() - start:
+        METRICS.set_gauge(ITEMS_PER_SECOND, count / elapsed, collection=collection_id)
+
+
+def load_items(
+    loader: Loader,
+    items: Iterable[dict],
+    collection_id: str | None = None,
+    existing: ExistingIds | dict[str, ExistingIds] | None = None,
+) -> int:
+    """Upsert STAC Items into PgSTAC, recording load metrics.
+
+    STAC Items may be streamed, in which case the load stage includes the time spent
+    creating them. STAC Items of several Collections may be loaded together, in
+    which case `collection_id` is not given and `existing` maps Collection IDs to
+    their sets. Once loaded, their IDs are added to `existing`, if provided.
+    Returns the number of STAC Items loaded.
+    """
+    from pypgstac.load import Methods
+
+    if isinstance(existing, ExistingIds):
+        existing = {collection_id or "": existing}
+    existing = existing or {}
+    collections: Counter[str] = Counter()
+    ids: dict[str, list[str]] = defaultdict(list)
+
+    def counted() -> Iterator[dict]:
+        for item in items:
+            collection = item.get("collection", collection_id or "")
+            collections[collection] += 1
+            if collection in existing:
+                ids[collection].append(item["id"])
+            yield item
+
+    labels = {} if collection_id is None else {"collection": collection_id}
+    with METRICS.timer("load", **labels):
+        loader.load_items(counted(), insert_mode=Methods.upsert)
+    for collection, loaded in ids.items():
+        existing[collection].update(loaded)
+    for collection, count in collections.items():
+        METRICS.inc(ITEMS, count, collection=collection, outcome="loaded")
+    return collections.total()
+
+
+def dump_to_file(
+    path: Path, items: Iterable[dict], format: DumpFormat, **options: Any
+) -> int:
+    """Dump STAC Items to a file as they are created, returning the number dumped.
+
+    Keyword arguments are passed to `stactools.hotosm.dump.dump_items`.
+    """
+    if format == "geoparquet" and importlib.util.find_spec("stac_geoparquet") is None:
+        raise click.UsageError(
+            "Dumping STAC-GeoParquet requires the `geoparquet` extra, "
+            "e.g., `pip install stactools-hotosm[geoparquet]`"
+        )
+    if format == "geoparquet" and (
+        options.get("shard_items") or options.get("shard_bytes")
+    ):
+        raise click.UsageError("Sharding is only supported for NDJSON dumps")
+    if options.get("index") and (
+        format != "ndjson" or compression_from_path(path) is not None
+    ):
+        raise click.UsageError("Only uncompressed NDJSON dumps can be indexed")
+    if (
+        format == "ndjson"
+        and compression_from_path(path) == "zstd"
+        and importlib.util.find_spec("zstandard") is None
+    ):
+        raise click.UsageError(
+            "Dumping zstd compressed NDJSON requires the `zstd` extra, "
+            "e.g., `pip install stactools-hotosm[zstd]`"
+        )
+    with METRICS.timer("dump", format=format):
+        count = dump_items(path, items, format=format, **options)
+    click.echo(f"Completed dumping {count} STAC Items to {path}")
+    return count
+
+
+def plan_catalog(
+    catalog: str,
+    uploaded_after: dt.datetime,
+    shard: BackfillShard | None = None,
+    existing: ExistingIds | None = None,
+    check_assets: bool = False,
+) -> Plan:
+    """Estimate the work of creating the STAC Items of the new records of a catalog.
+
+    Only the requests listing the records are made: no imagery is opened and no
+    STAC Item is created.
+    """
+    if catalog == "OAM":
+        from stactools.hotosm.oam_metadata_client import OamMetadataClient
+
+        records = get_oam_items_after(OamMetadataClient.new(), uploaded_after, shard)
+        return plan_oam(records, existing, check_assets)
+
+    import requests
+
+    from stactools.hotosm.maxar.sync import LimitedStacIO, new_event_collections
+
+    collections = new_event_collections(
+        LimitedStacIO(), requests.Session(), uploaded_after, shard
+    )
+    return plan_maxar(collections, check_assets)
+
+
+def report_plan(
+    ctx: click.Context,
+    catalog: str,
+    uploaded_after: dt.datetime,
+    shard: BackfillShard | None,
+    existing: ExistingIds | None,
+) -> None:
+    """Estimate the work of a run and print it, instead of running it."""
+    click.echo(
+        f"Planning the STAC Items of {catalog} records added since {uploaded_after}"
+        + (f" in slice {shard}" if shard is not None else "")
+    )
+    plan = plan_catalog(
+        catalog,
+        uploaded_after,
+        shard,
+        existing,
+        check_assets=ctx.obj["asset_checker"] is not None,
+    )
+    click.echo(plan.summary())
+
+
+def catalog_path(path: Path | None, catalog: str) -> Path | None:
+    """Path of the file of one catalog synced by `sync`, if a path is given.
+
+    For example, the file of OAM is `extent-oam.json` for `extent.json`.
+    """
+    if path is None:
+        return None
+    return path.with_name(f"{path.stem}-{catalog.lower()}{path.suffix}")
+
+
+def write_backfill_record(record: BackfillRecord, path: Path) -> None:
+    """Write the record of a dump of one slice of a backfill next to the dump."""
+    record_path = backfill_record_path(path)
+    record.write(record_path)
+    click.echo(f"Wrote the record of backfill slice {record.shard} to {record_path}")
+
+
+def report_geometry_savings(geometry_options: GeometryOptions) -> None:
+    """Report the bytes saved by optimizing STAC Item geometries, if enabled."""
+    if not geometry_options.enabled:
+        return
+    before, after = geometry_savings()
+    if before:
+        click.echo(
+            f"Optimized geometries from {before:.0f} to {after:.0f} bytes "
+            f"({1 - after / before:.1%} saved)"
+        )
+
+
+def report_errors(dead_letters: DeadLetters, path: Path | None = None) -> None:
+    """Helper function to report error messages via Click.
+
+    Failures are reported as recorded in `path`, if provided, e.g. once the file of
+    `dead_letters` has been moved there, or else in the file of `dead_letters`.
+    """
+    path = path if path is not None else dead_letters.path
+    if dead_letters.count:
+        click.echo(f"Encountered errors with {dead_letters.count} catalog entries:")
+        for dead_letter in dead_letters.reported:
+            click.echo(str(dead_letter))
+        if hidden := dead_letters.count - len(dead_letters.reported):
+            click.echo(f"... and {hidden} more")
+        if path is not None:
+            click.echo(
+                f"Recorded failures in {path}, reprocess them with "
+                f"`hotosm retry --dead-letter {path}`"
+            )
@@ -0,0 +1,171 @@
+"""Adaptive limits on concurrent requests to upstream hosts."""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+from urllib.parse import urlparse
+
+from stactools.hotosm.metrics import (
+    CONCURRENCY_DECREASES,
+    CONCURRENCY_IN_FLIGHT,
+    CONCURRENCY_LIMIT,
+    METRICS,
+)
+
+
+@dataclass(frozen=True)
+class AimdOptions:
+    """Tuning of additive increase, multiplicative decrease (AIMD) limits.
+
+    Attributes:
+        initial_limit: Requests allowed in flight to a host before any feedback.
+        min_limit: Lowest limit, so that a host is never starved.
+        max_limit: Highest limit.
+        decrease_factor: Multiplier applied to the limit when a host is overloaded.
+        latency_factor: A host is considered overloaded when its recent latency
+            grows beyond this multiple of the lowest recent latency observed.
+        latency_alpha: Smoothing factor of the moving average of latency.
+    """
+
+    initial_limit: float = 4.0
+    min_limit: float = 1.0
+    max_limit: float = 64.0
+    decrease_factor: float = 0.5
+    latency_factor: float = 3.0
+    latency_alpha: float = 0.2
+
+
+class Request:
+    """Outcome of a request made while holding a slot from a limiter."""
+
+    def __init__(self) -> None:
+        """Start a request with an unknown outcome."""
+        self.overloaded: bool | None = None
+
+    def record_status(self, status: int) -> None:
+        """Record the HTTP status of the response.
+
+        Rate limiting (429) and server errors (5xx) signal an overloaded host.
+        """
+        self.overloaded = status == 429 or status >= 500
+
+
+class AimdLimiter:
+    """Limit on concurrent requests to one host, adjusted from their outcomes.
+
+    The limit grows by one for every limit's worth of successful requests (i.e.
+    about one per round trip when the limit is saturated) and is cut by
+    `decrease_factor` when requests fail with 429 or 5xx statuses, raise, or when
+    latency rises well above its baseline. Cuts are spaced by at least the recent
+    latency so that a burst of failures from one round trip only counts once.
+    """
+
+    def __init__(self, host: str, options: AimdOptions | None = None) -> None:
+        """Create a limiter for a host."""
+        self.host = host
+        self.options = options or AimdOptions()
+        self.limit = self.options.initial_limit
+        self.in_flight = 0
+        self.latency: float | None = None
+        self.baseline: float | None = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self._export()
+
+    @contextmanager
+    def request(self) -> Iterator[Request]:
+        """Wait for a slot and hold it for the duration of a request."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            METRICS.set_gauge(CONCURRENCY_IN_FLIGHT, self.in_flight, host=self.host)
+
+        request = Request()
+        start = time.monotonic()
+        try:
+            yield request
+        except BaseException:
+            if request.overloaded is None:
+                request.overloaded = True
+            raise
+        finally:
+            self._release(request, time.monotonic() - start)
+
+    def _release(self, request: Request, latency: float) -> None:
+        options = self.options
+        with self._condition:
+            self.in_flight -= 1
+            self.latency = (
+                latency
+                if self.latency is None
+                else options.latency_alpha * latency
+                + (1 - options.latency_alpha) * self.latency
+            )
+            if self.baseline is None or self.latency < self.baseline:
+                self.baseline = self.latency
+
+            congested = self.latency > options.latency_factor * self.baseline
+            now = time.monotonic()
+            if request.overloaded or congested:
+                if now - self._last_decrease >= self.latency:
+                    self.limit = max(
+                        options.min_limit, self.limit * options.decrease_factor
+                    )
+                    self._last_decrease = now
+                    # Forget the baseline so that a host that became slower for
+                    # good is not throttled forever
+                    self.baseline = self.latency
+                    METRICS.inc(CONCURRENCY_DECREASES, host=self.host)
+            else:
+                self.limit = min(options.max_limit, self.limit + 1 / self.limit)
+            self._export()
+            self._condition.notify_all()
+
+    def _export(self) -> None:
+        METRICS.set_gauge(CONCURRENCY_LIMIT, self.limit, host=self.host)
+        METRICS.set_gauge(CONCURRENCY_IN_FLIGHT, self.in_flight, host=self.host)
+
+
+class ConcurrencyController:
+    """Adaptive concurrency limits shared by all clients, one per upstream host."""
+
+    def __init__(self, options: AimdOptions | None = None) -> None:
+        """Create a controller creating limiters with the same options."""
+        self.options = options or AimdOptions()
+        self.limiters: dict[str, AimdLimiter] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, options: AimdOptions) -> None:
+        """Use new options, forgetting the limits learned so far."""
+        with self._lock:
+            self.options = options
+            self.limiters.clear()
+
+    def limiter(self, host: str) -> AimdLimiter:
+        """Get the limiter for a host."""
+        with self._lock:
+            if host not in self.limiters:
+                self.limiters[host] = AimdLimiter(host, self.options)
+            return self.limiters[host]
+
+    @contextmanager
+    def request(self, url: str) -> Iterator[Request]:
+        """Hold a slot for a request to the host of a URL.
+
+        Requests to local files (URLs without a host) are not limited.
+        """
+        host = urlparse(url).netloc
+        if not host:
+            yield Request()
+            return
+        with self.limiter(host).request() as request:
+            yield request
+
+
+# Concurrency limits of the current process
+CONTROLLER = ConcurrencyController()
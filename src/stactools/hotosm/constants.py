@@ -7,6 +7,8 @@ COLLECTION_DESCRIPTION = (
     "licensed satellite and unmanned aerial vehicle (UAV) imagery."
 )
 
+MAXAR_COLLECTION_ID = "maxar-opendata"
+
 OAM_EXTENSION_SCHEMA_URI_PATTERN: str = (
     "https://hotosm.github.io/stactools-hotosm/oam/v{version}/schema.json"
 )
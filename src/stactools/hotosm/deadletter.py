@@ -0,0 +1,201 @@
+"""Dead-letter files recording upstream records that could not be ingested."""
+
+from __future__ import annotations
+
+import dataclasses
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterable, Iterator, Mapping
+
+from stactools.hotosm.metrics import ITEMS, METRICS
+from stactools.hotosm.serialize import dumps, loads
+
+if TYPE_CHECKING:
+    import pystac
+
+# Number of failures kept in memory to be reported at the end of a run
+DEFAULT_MAX_REPORTED = 20
+
+
+@dataclass(frozen=True)
+class DeadLetter:
+    """An upstream record that could not be turned into a STAC Item.
+
+    Attributes:
+        collection: ID of the STAC Collection the record belongs to.
+        id: ID of the record in the upstream catalog.
+        stage: Stage of the ingest that failed, e.g. "create_item".
+        error: Class name of the exception.
+        message: Exception message.
+        href: Location of the upstream record if it was read from a file, e.g.
+            for Maxar STAC Items, rather than from an API.
+    """
+
+    collection: str
+    id: str
+    stage: str
+    error: str
+    message: str
+    href: str | None = None
+
+    @classmethod
+    def from_exception(
+        cls, collection: str, record: Any, stage: str, exception: Exception
+    ) -> DeadLetter:
+        """Record an exception raised while ingesting an upstream record."""
+        get_self_href = getattr(record, "get_self_href", None)
+        return cls(
+            collection=collection,
+            id=str(getattr(record, "id", record)),
+            stage=stage,
+            error=type(exception).__name__,
+            message=str(exception),
+            href=get_self_href() if get_self_href is not None else None,
+        )
+
+    def __str__(self) -> str:
+        """Summarize the failure in one line."""
+        return f"{self.id} ({self.stage}) {self.error}: {self.message}"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to a JSON compatible dictionary."""
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> DeadLetter:
+        """Parse from a dictionary created by `to_dict`."""
+        return cls(**data)
+
+
+class DeadLetters:
+    """Failures of a run, streamed to a dead-letter NDJSON file.
+
+    Only the number of failures and the first few of them are kept in memory for
+    reporting. Failures are appended to the file, if any, as they happen so that it
+    accumulates over many runs.
+    """
+
+    def __init__(
+        self, path: Path | None = None, max_reported: int = DEFAULT_MAX_REPORTED
+    ) -> None:
+        """Record failures, optionally appending them to a file."""
+        self.path = path
+        self.max_reported = max_reported
+        self.count = 0
+        self.reported: list[DeadLetter] = []
+        self._file: IO[bytes] | None = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of failures recorded."""
+        return self.count
+
+    def add(self, dead_letter: DeadLetter) -> None:
+        """Record a failure."""
+        with self._lock:
+            self.count += 1
+            if len(self.reported) < self.max_reported:
+                self.reported.append(dead_letter)
+            if self.path is not None:
+                if self._file is None:
+                    self._file = self.path.open("ab")
+                self._file.write(dumps(dead_letter.to_dict()) + b"\n")
+                self._file.flush()
+
+    def close(self) -> None:
+        """Close the dead-letter file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> DeadLetters:
+        """Record failures within a context, closing the file on exit."""
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        """Close the dead-letter file."""
+        self.close()
+
+
+def read_dead_letters(path: Path) -> Iterator[DeadLetter]:
+    """Read failures from a dead-letter NDJSON file."""
+    with path.open("rb") as src:
+        for line in src:
+            if line.strip():
+                yield DeadLetter.from_dict(loads(line))
+
+
+def retry_dead_letters(
+    dead_letters: Iterable[DeadLetter],
+    fetch: Callable[[DeadLetter], Any],
+    create: Callable[[Any], pystac.Item],
+    workers: int,
+    failures: DeadLetters,
+) -> Iterator[dict]:
+    """Yield STAC Item dictionaries recreated from failed upstream records.
+
+    Records are fetched again from upstream and converted to STAC Items over
+    `workers` threads, since both mostly wait on the network. At most twice as many
+    records as workers are in flight, and STAC Items are yielded as they complete.
+    Records that fail again are added to `failures`.
+    """
+
+    def retry(dead_letter: DeadLetter) -> dict | None:
+        stage = "fetch"
+        try:
+            with METRICS.timer(stage, collection=dead_letter.collection):
+                record = fetch(dead_letter)
+            stage = "create_item"
+            with METRICS.timer(stage, collection=dead_letter.collection):
+                stac_item = create(record)
+            stage = "serialize"
+            with METRICS.timer(stage, collection=dead_letter.collection):
+                item = stac_item.to_dict()
+        except Exception as e:
+            METRICS.inc(ITEMS, collection=dead_letter.collection, outcome="failed")
+            failures.add(
+                dataclasses.replace(
+                    dead_letter, stage=stage, error=type(e).__name__, message=str(e)
+                )
+            )
+            return None
+        METRICS.inc(ITEMS, collection=dead_letter.collection, outcome="created")
+        item["collection"] = dead_letter.collection
+        return item
+
+    def completed(futures: Iterable[Future[dict | None]]) -> Iterator[dict]:
+        for future in futures:
+            if (item := future.result()) is not None:
+                yield item
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: set[Future[dict | None]] = set()
+        for dead_letter in dead_letters:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from completed(done)
+            pending.add(executor.submit(retry, dead_letter))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from completed(done)
+
+
+def group_by_collection(
+    dead_letters: Iterable[DeadLetter],
+) -> Mapping[str, list[DeadLetter]]:
+    """Group failures by the STAC Collection their records belong to.
+
+    Dead-letter files accumulate over many runs, so a record that failed in several
+    runs is listed several times. Each record is only kept once, with its latest
+    failure, in the position of its first failure.
+    """
+    groups: dict[str, dict[str, DeadLetter]] = {}
+    for dead_letter in dead_letters:
+        groups.setdefault(dead_letter.collection, {})[dead_letter.id] = dead_letter
+    return {
+        collection: list(dead_letters.values())
+        for collection, dead_letters in groups.items()
+    }
@@ -0,0 +1,326 @@
+"""Write STAC Items to intermediate files for bulk loading."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import itertools
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, Literal, cast
+
+from stactools.hotosm.dump_index import IndexBuilder, index_path
+from stactools.hotosm.serialize import JsonSerializer, current_serializer
+
+DumpFormat = Literal["ndjson", "geoparquet"]
+DUMP_FORMATS: tuple[DumpFormat, ...] = ("ndjson", "geoparquet")
+
+# Number of STAC Items buffered in memory and written as a single Parquet row group
+DEFAULT_ROW_GROUP_SIZE = 10_000
+
+
+class _Counter:
+    """Count STAC Items as they pass through to a writer."""
+
+    def __init__(self, items: Iterable[dict]) -> None:
+        """Wrap an iterable of STAC Items."""
+        self.items = items
+        self.count = 0
+
+    def __iter__(self) -> Iterator[dict]:
+        for item in self.items:
+            self.count += 1
+            yield item
+
+
+def dump_items(
+    path: Path,
+    items: Iterable[dict],
+    format: DumpFormat = "ndjson",
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    shard_items: int | None = None,
+    shard_bytes: int | None = None,
+    index: bool = False,
+) -> int:
+    """Dump STAC Items to a file in the given format, returning the number written."""
+    if format == "ndjson":
+        return dump_to_ndjson(
+            path,
+            items,
+            shard_items=shard_items,
+            shard_bytes=shard_bytes,
+            index=index,
+        )
+    elif format == "geoparquet":
+        return dump_to_geoparquet(path, items, row_group_size=row_group_size)
+    raise ValueError(f"Unknown dump format {format}")
+
+
+# ===== NDJSON
+Compression = Literal["gzip", "zstd"]
+COMPRESSION_SUFFIXES: dict[str, Compression] = {".gz": "gzip", ".zst": "zstd"}
+
+
+def compression_from_path(path: Path) -> Compression | None:
+    """Infer the compression of an NDJSON file from its suffix."""
+    return COMPRESSION_SUFFIXES.get(path.suffix)
+
+
+def open_ndjson(path: Path) -> BinaryIO:
+    """Open a possibly compressed NDJSON file for reading bytes."""
+    compression = compression_from_path(path)
+    if compression == "gzip":
+        return cast(BinaryIO, gzip.open(path, "rb"))
+    elif compression == "zstd":
+        import zstandard
+
+        # NOTE: The zstd reader does not support reading lines without buffering
+        return cast(BinaryIO, io.BufferedReader(zstandard.open(path, "rb")))
+    return path.open("rb")
+
+
+def shard_path(path: Path, index: int) -> Path:
+    """Path of a shard, numbering the file name before its suffixes.
+
+    For example, shard 1 of `items.ndjson.gz` is `items-00001.ndjson.gz`.
+    """
+    stem, dot, suffixes = path.name.partition(".")
+    return path.with_name(f"{stem}-{index:05d}{dot}{suffixes}")
+
+
+def manifest_path(path: Path) -> Path:
+    """Path of the manifest describing the shards of a dump.
+
+    For example, the manifest of `items.ndjson.gz` is `items.manifest.json`.
+    """
+    stem = path.name.partition(".")[0]
+    return path.with_name(f"{stem}.manifest.json")
+
+
+@dataclass
+class Shard:
+    """A file holding part of a dump of STAC Items."""
+
+    path: str
+    count: int
+    bytes: int
+    sha256: str
+
+
+@dataclass
+class Manifest:
+    """List of shards in a dump of STAC Items.
+
+    Shard paths are relative to the directory containing the manifest.
+    """
+
+    compression: Compression | None
+    shards: list[Shard] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        """Total number of STAC Items in all shards."""
+        return sum(shard.count for shard in self.shards)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize as a dictionary."""
+        return {
+            "format": "ndjson",
+            "compression": self.compression,
+            "count": self.count,
+            "shards": [asdict(shard) for shard in self.shards],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> Manifest:
+        """Parse from a dictionary."""
+        return cls(
+            compression=d["compression"],
+            shards=[Shard(**shard) for shard in d["shards"]],
+        )
+
+    @classmethod
+    def read(cls, path: Path) -> Manifest:
+        """Read a manifest file."""
+        return cls.from_dict(json.loads(path.read_text()))
+
+    def write(self, path: Path) -> None:
+        """Write the manifest file."""
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+
+class _HashingWriter:
+    """File-like object counting and hashing the bytes written to a file."""
+
+    def __init__(self, dst: BinaryIO) -> None:
+        """Wrap a binary file opened for writing."""
+        self.dst = dst
+        self.bytes = 0
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        """Write bytes to the underlying file."""
+        self.bytes += len(data)
+        self.sha256.update(data)
+        return self.dst.write(data)
+
+    def flush(self) -> None:
+        """Flush the underlying file."""
+        self.dst.flush()
+
+
+class NdjsonWriter:
+    """Write STAC Items to an optionally compressed NDJSON file.
+
+    Counts the STAC Items and uncompressed bytes written, and the size and SHA256
+    checksum of the file on disk. Uncompressed files can be indexed as they are
+    written (see `stactools.hotosm.dump_index`).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        compression: Compression | None = None,
+        serializer: JsonSerializer | None = None,
+        index: bool = False,
+    ) -> None:
+        """Open an NDJSON file for writing, with the current serializer by default."""
+        if index and compression is not None:
+            raise ValueError("Only uncompressed NDJSON dumps can be indexed")
+        self.path = path
+        self.serializer = serializer or current_serializer()
+        self.count = 0
+        self.uncompressed_bytes = 0
+        self._index = IndexBuilder() if index else None
+        self._file = path.open("wb")
+        self._hashing = _HashingWriter(self._file)
+        self._dst: BinaryIO | gzip.GzipFile
+        # NOTE: Compressors only need `write` and `flush` from the file they wrap
+        hashing = cast(BinaryIO, self._hashing)
+        if compression == "gzip":
+            self._dst = gzip.GzipFile(fileobj=hashing, mode="wb")
+        elif compression == "zstd":
+            import zstandard
+
+            self._dst = zstandard.ZstdCompressor().stream_writer(hashing, closefd=False)
+        else:
+            self._dst = hashing
+
+    def write(self, item: dict) -> None:
+        """Write a STAC Item as a line of JSON."""
+        line = self.serializer.dumps(item) + b"\n"
+        self._dst.write(line)
+        self.count += 1
+        self.uncompressed_bytes += len(line)
+        if self._index is not None:
+            self._index.add(item["id"], len(line))
+
+    def close(self) -> Shard:
+        """Finish writing the file, returning a description of it."""
+        if self._dst is not self._hashing:
+            self._dst.close()
+        self._file.close()
+        if self._index is not None:
+            self._index.write(index_path(self.path))
+        return Shard(
+            path=self.path.name,
+            count=self.count,
+            bytes=self._hashing.bytes,
+            sha256=self._hashing.sha256.hexdigest(),
+        )
+
+    def __enter__(self) -> NdjsonWriter:
+        """Use as a context manager closing the file on exit."""
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        """Close the file."""
+        self.close()
+
+
+def dump_to_ndjson(
+    path: Path,
+    items: Iterable[dict],
+    shard_items: int | None = None,
+    shard_bytes: int | None = None,
+    index: bool = False,
+) -> int:
+    """Dump STAC Items to Newline Delimited JSON (NDJSON).
+
+    The file is compressed with gzip or zstd if its name ends with `.gz` or `.zst`.
+    If `shard_items` or `shard_bytes` are given, STAC Items are split across shards
+    numbered after `path` (see `shard_path`), starting a new shard once the current
+    one holds `shard_items` STAC Items or `shard_bytes` of uncompressed NDJSON. A
+    manifest listing the item count, size and checksum of each shard is written
+    alongside them (see `manifest_path`), once all STAC Items have been written, so
+    that a dump that failed part way through has no manifest.
+
+    If `index` is set, each uncompressed file is written with a sidecar index of
+    the byte offset and ID of its STAC Items (see `dump_index.index_path`).
+    """
+    compression = compression_from_path(path)
+    if shard_items is None and shard_bytes is None:
+        with NdjsonWriter(path, compression, index=index) as dst:
+            for item in items:
+                dst.write(item)
+        return dst.count
+
+    manifest = Manifest(compression=compression)
+    # Remove the manifest of a previous dump, which would list stale shards
+    manifest_path(path).unlink(missing_ok=True)
+    writer: NdjsonWriter | None = None
+    try:
+        for item in items:
+            if writer is None:
+                writer = NdjsonWriter(
+                    shard_path(path, len(manifest.shards)), compression, index=index
+                )
+            writer.write(item)
+            if (shard_items is not None and writer.count >= shard_items) or (
+                shard_bytes is not None and writer.uncompressed_bytes >= shard_bytes
+            ):
+                manifest.shards.append(writer.close())
+                writer = None
+    finally:
+        if writer is not None:
+            manifest.shards.append(writer.close())
+    manifest.write(manifest_path(path))
+    return manifest.count
+
+
+# ===== GeoParquet
+def dump_to_geoparquet(
+    path: Path,
+    items: Iterable[dict],
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> int:
+    """Dump STAC Items to STAC-GeoParquet.
+
+    STAC Items are converted to Arrow and written to temporary Parquet files in
+    chunks of `row_group_size` as they arrive, so memory use is bounded by the row
+    group size rather than the number of STAC Items. The chunks are then combined
+    into a single file with one row group per chunk, using a schema unified from all
+    chunks. Geometries are stored as WKB and STAC Item properties as typed columns.
+
+    No file is written if there are no STAC Items, because the Parquet schema is
+    inferred from the STAC Items. Requires the optional `stac-geoparquet` dependency
+    (`geoparquet` extra).
+    """
+    from stac_geoparquet.arrow import parse_stac_items_to_parquet
+
+    items = iter(items)
+    first = next(items, None)
+    if first is None:
+        return 0
+
+    counter = _Counter(itertools.chain([first], items))
+    parse_stac_items_to_parquet(
+        counter,
+        output_path=path,
+        chunk_size=row_group_size,
+        schema="ChunksToDisk",
+        compression="zstd",
+    )
+    return counter.count
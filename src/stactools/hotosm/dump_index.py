@@ -0,0 +1,222 @@
+"""Sidecar indexes of NDJSON dumps for random access without scanning them."""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import BinaryIO, Iterator, Sequence
+
+from stactools.hotosm.serialize import loads
+
+# Index files start with this header: magic, number of records, number of slots in
+# the ID hash table and size of the indexed NDJSON file, as little-endian integers.
+MAGIC = b"HOTIDX01"
+HEADER = struct.Struct("<8sQQQ")
+
+
+def index_path(path: Path) -> Path:
+    """Path of the index of an NDJSON dump, e.g. `items.ndjson.idx`."""
+    return path.with_name(f"{path.name}.idx")
+
+
+def id_hash(item_id: str) -> int:
+    """Hash of a STAC Item ID that is stable across processes."""
+    digest = hashlib.blake2b(item_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class IndexBuilder:
+    """Collect the byte offset and ID of each line written to an NDJSON file."""
+
+    def __init__(self) -> None:
+        """Start an empty index."""
+        self.offsets = array("Q")
+        self.hashes = array("Q")
+        self.size = 0
+
+    def add(self, item_id: str, length: int) -> None:
+        """Record the next line, of `length` bytes, holding the STAC Item `item_id`."""
+        self.offsets.append(self.size)
+        self.hashes.append(id_hash(item_id))
+        self.size += length
+
+    def write(self, path: Path) -> None:
+        """Write the index file.
+
+        IDs are stored in an open-addressing hash table of (hash, record number + 1)
+        pairs with linear probing, sized to at most half full, so that looking up an
+        ID reads a couple of slots whatever the size of the dump.
+        """
+        count = len(self.offsets)
+        slots = 1
+        while slots < 2 * count:
+            slots *= 2
+        table = array("Q", bytes(16 * slots))
+        for record, hash_ in enumerate(self.hashes):
+            slot = hash_ & (slots - 1)
+            while table[2 * slot + 1]:
+                slot = (slot + 1) & (slots - 1)
+            table[2 * slot] = hash_
+            table[2 * slot + 1] = record + 1
+
+        boundaries = array("Q", self.offsets)
+        boundaries.append(self.size)
+        tmp = path.with_name(f"{path.name}.tmp")
+        with tmp.open("wb") as dst:
+            dst.write(HEADER.pack(MAGIC, count, slots, self.size))
+            dst.write(_little_endian(boundaries))
+            dst.write(_little_endian(table))
+        tmp.replace(path)
+
+
+def build_index(path: Path) -> int:
+    """Index an existing, uncompressed NDJSON dump, returning its number of records.
+
+    This reads the whole dump once. Dumps written with `index=True` are indexed as
+    they are written instead.
+    """
+    builder = IndexBuilder()
+    with path.open("rb") as src:
+        for line in src:
+            if line.strip():
+                builder.add(loads(line)["id"], len(line))
+            else:
+                # Blank lines are skipped, or kept at the end of the previous record
+                builder.size += len(line)
+    builder.write(index_path(path))
+    return len(builder.offsets)
+
+
+class IndexedDump:
+    """Random access to an uncompressed NDJSON dump through its index.
+
+    Both files are memory mapped, so opening a dump is cheap and only the pages
+    holding the records that are read are loaded from disk.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open a dump and its index.
+
+        Raises:
+            FileNotFoundError: If the dump has not been indexed.
+            ValueError: If the index is invalid or out of date.
+        """
+        self.path = path
+        self._files: list[BinaryIO] = []
+        self._maps: list[mmap.mmap] = []
+        try:
+            index = self._map(index_path(path))
+            magic, self.count, self.slots, self.size = HEADER.unpack_from(index)
+            if magic != MAGIC:
+                raise ValueError(f"{index_path(path)} is not an index of a dump")
+            if path.stat().st_size != self.size:
+                raise ValueError(f"{index_path(path)} is out of date with {path}")
+            self._data = self._map(path) if self.size else None
+        except BaseException:
+            self.close()
+            raise
+        view = memoryview(index)
+        offsets_end = HEADER.size + 8 * (self.count + 1)
+        self.boundaries = self._integers(view[HEADER.size : offsets_end])
+        self._table = self._integers(view[offsets_end : offsets_end + 16 * self.slots])
+
+    def _map(self, path: Path) -> mmap.mmap:
+        file = path.open("rb")
+        self._files.append(file)
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(data)
+        return data
+
+    @staticmethod
+    def _integers(view: memoryview) -> Sequence[int]:
+        if sys.byteorder == "big":
+            values = array("Q", view)
+            values.byteswap()
+            return values
+        return view.cast("Q")
+
+    def __len__(self) -> int:
+        """Number of records in the dump."""
+        return self.count
+
+    def line(self, record: int) -> bytes:
+        """Line of JSON of a record, by position in the dump."""
+        if not 0 <= record < self.count:
+            raise IndexError(record)
+        assert self._data is not None
+        return self._data[self.boundaries[record] : self.boundaries[record + 1]]
+
+    def item(self, record: int) -> dict:
+        """STAC Item of a record, by position in the dump."""
+        return loads(self.line(record))
+
+    def get(self, item_id: str) -> dict | None:
+        """STAC Item with an ID, or None if it is not in the dump."""
+        if not self.count:
+            return None
+        hash_ = id_hash(item_id)
+        slot = hash_ & (self.slots - 1)
+        while record := self._table[2 * slot + 1]:
+            if self._table[2 * slot] == hash_:
+                item = self.item(record - 1)
+                if item["id"] == item_id:
+                    return item
+            slot = (slot + 1) & (self.slots - 1)
+        return None
+
+    def __contains__(self, item_id: object) -> bool:
+        """Check whether the dump holds a STAC Item with an ID."""
+        return isinstance(item_id, str) and self.get(item_id) is not None
+
+    def __iter__(self) -> Iterator[dict]:
+        """Yield the STAC Items in the dump, in order."""
+        for record in range(self.count):
+            yield self.item(record)
+
+    def split(self, chunks: int) -> list[tuple[int, int]]:
+        """Split the dump into byte ranges of about the same size.
+
+        Ranges start and end on record boundaries and there are at most `chunks` of
+        them, fewer if the dump has fewer records.
+        """
+        starts = [0]
+        for chunk in range(1, chunks):
+            record = bisect_left(self.boundaries, chunk * self.size // chunks)
+            if 0 < record < self.count and self.boundaries[record] > starts[-1]:
+                starts.append(self.boundaries[record])
+        return [
+            (start, end)
+            for start, end in zip(starts, starts[1:] + [self.size], strict=True)
+            if end > start
+        ]
+
+    def close(self) -> None:
+        """Unmap and close the files."""
+        # Views into the maps must be released before they can be closed
+        self.boundaries = self._table = ()
+        for data in self._maps:
+            data.close()
+        for file in self._files:
+            file.close()
+        self._maps.clear()
+        self._files.clear()
+
+    def __enter__(self) -> IndexedDump:
+        """Use as a context manager closing the files on exit."""
+        return self
+
+    def __exit__(self, *_exc_info: object) -> None:
+        """Unmap and close the files."""
+        self.close()
@@ -0,0 +1,404 @@
+"""Event driven ingest of images uploaded to OAM, consumed from a queue."""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Iterable, Protocol
+
+from stactools.hotosm.metrics import EVENTS, METRICS, QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+# Seconds a batch of events is hidden from other consumers while it is ingested,
+# after which events that were not acknowledged are delivered again
+DEFAULT_LEASE_SECONDS = 600.0
+
+# Seconds between checks of the queue for new events while filling a batch
+POLL_SECONDS = 0.2
+
+# Largest webhook request body accepted, in bytes
+MAX_WEBHOOK_BODY = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Event:
+    """Notification that an image was uploaded to OAM.
+
+    Attributes:
+        id: ID of the image in the OAM metadata API.
+        receipt: Handle used to acknowledge the event once it has been ingested.
+    """
+
+    id: str
+    receipt: int
+
+
+class EventQueue(Protocol):
+    """Queue of upload events delivered at least once.
+
+    Events taken from the queue are leased rather than removed, and are delivered
+    again if they are not acknowledged before the lease expires, e.g. because
+    the consumer crashed or failed to load the batch into PgSTAC.
+    """
+
+    def put(self, ids: Iterable[str]) -> int:
+        """Add events for image IDs, returning the number added."""
+        ...
+
+    def get(self, max_events: int, lease_seconds: float) -> list[Event]:
+        """Lease up to `max_events` events without waiting."""
+        ...
+
+    def ack(self, events: Iterable[Event]) -> None:
+        """Remove ingested events from the queue."""
+        ...
+
+    def depth(self) -> int:
+        """Number of events in the queue, including leased events."""
+        ...
+
+    def close(self) -> None:
+        """Release resources held by the queue."""
+        ...
+
+
+class MemoryQueue:
+    """Event queue held in memory, lost when the process exits."""
+
+    def __init__(self) -> None:
+        """Create an empty queue."""
+        self._lock = threading.Lock()
+        self._ready: deque[Event] = deque()
+        self._leased: dict[int, tuple[Event, float]] = {}
+        self._next_receipt = 0
+
+    def put(self, ids: Iterable[str]) -> int:
+        """Add events for image IDs, returning the number added."""
+        with self._lock:
+            count = 0
+            for id_ in ids:
+                self._next_receipt += 1
+                self._ready.append(Event(id=id_, receipt=self._next_receipt))
+                count += 1
+            return count
+
+    def get(self, max_events: int, lease_seconds: float) -> list[Event]:
+        """Lease up to `max_events` events without waiting."""
+        now = time.monotonic()
+        with self._lock:
+            expired = sorted(
+                (
+                    event
+                    for event, leased_until in self._leased.values()
+                    if leased_until <= now
+                ),
+                key=lambda event: event.receipt,
+            )
+            for event in expired:
+                del self._leased[event.receipt]
+            self._ready.extendleft(reversed(expired))
+
+            events: list[Event] = []
+            while self._ready and len(events) < max_events:
+                event = self._ready.popleft()
+                self._leased[event.receipt] = (event, now + lease_seconds)
+                events.append(event)
+            return events
+
+    def ack(self, events: Iterable[Event]) -> None:
+        """Remove ingested events from the queue."""
+        with self._lock:
+            for event in events:
+                self._leased.pop(event.receipt, None)
+
+    def depth(self) -> int:
+        """Number of events in the queue, including leased events."""
+        with self._lock:
+            return len(self._ready) + len(self._leased)
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class SqliteQueue:
+    """Event queue persisted in a SQLite database file.
+
+    The file can be shared by processes, e.g. a webhook receiver and several
+    consumers, since leasing events happens in an exclusive transaction.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open or create a queue in a SQLite file."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS events (
+                receipt INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL,
+                enqueued_at REAL NOT NULL,
+                leased_until REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+
+    def put(self, ids: Iterable[str]) -> int:
+        """Add events for image IDs, returning the number added."""
+        now = time.time()
+        rows = [(id_, now) for id_ in ids]
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany(
+                "INSERT INTO events (id, enqueued_at) VALUES (?, ?)", rows
+            )
+            self._db.execute("COMMIT")
+        return len(rows)
+
+    def get(self, max_events: int, lease_seconds: float) -> list[Event]:
+        """Lease up to `max_events` events without waiting."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT receipt, id FROM events WHERE leased_until <= ? "
+                    "ORDER BY receipt LIMIT ?",
+                    (now, max_events),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE events SET leased_until = ? WHERE receipt = ?",
+                    [(now + lease_seconds, receipt) for receipt, _ in rows],
+                )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+        return [Event(id=id_, receipt=receipt) for receipt, id_ in rows]
+
+    def ack(self, events: Iterable[Event]) -> None:
+        """Remove ingested events from the queue."""
+        receipts = [(event.receipt,) for event in events]
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany("DELETE FROM events WHERE receipt = ?", receipts)
+            self._db.execute("COMMIT")
+
+    def depth(self) -> int:
+        """Number of events in the queue, including leased events."""
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM events").fetchone()
+        return count
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+
+def parse_event_ids(body: object) -> list[str]:
+    """Get image IDs from a notification.
+
+    Notifications are JSON objects with an image `id` or a list of `ids`, or a
+    list of image IDs.
+
+    Raises:
+        ValueError: If the notification is not in one of these forms.
+    """
+    if isinstance(body, dict):
+        body = body.get("ids", [body["id"]] if "id" in body else None)
+    if not isinstance(body, list) or not all(
+        isinstance(id_, str) and id_ for id_ in body
+    ):
+        raise ValueError("Expected an `id`, a list of `ids` or a list of image IDs")
+    return body
+
+
+class WebhookReceiver:
+    """HTTP server adding upload notifications POSTed to it to a queue.
+
+    Notifications are accepted with `202 Accepted` once they have been queued.
+    `GET /healthz` reports the depth of the queue.
+    """
+
+    def __init__(
+        self,
+        queue: EventQueue,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        token: str | None = None,
+    ) -> None:
+        """Receive notifications on a host and port, optionally requiring a token."""
+        self.queue = queue
+        self.token = token
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Host and port the server listens on."""
+        host, port = self.server.server_address[:2]
+        return str(host), int(port)
+
+    def start(self) -> WebhookReceiver:
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="hotosm-webhook", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Receiving upload notifications on {self.address}")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving requests."""
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != "/healthz":
+                    self._respond(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+                    return
+                self._respond(HTTPStatus.OK, {"depth": receiver.queue.depth()})
+
+            def do_POST(self) -> None:
+                if receiver.token is not None and (
+                    self.headers.get("Authorization") != f"Bearer {receiver.token}"
+                ):
+                    self._respond(HTTPStatus.UNAUTHORIZED, {"error": "Unauthorized"})
+                    return
+                if (header := self.headers.get("Content-Length")) is None:
+                    self._respond(
+                        HTTPStatus.LENGTH_REQUIRED, {"error": "Length required"}
+                    )
+                    return
+                try:
+                    length = int(header)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self._respond(
+                        HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}
+                    )
+                    return
+                if length > MAX_WEBHOOK_BODY:
+                    self._respond(
+                        HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Too large"}
+                    )
+                    return
+                try:
+                    ids = parse_event_ids(json.loads(self.rfile.read(length)))
+                except (ValueError, KeyError) as e:
+                    self._respond(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+                    return
+                count = receiver.queue.put(ids)
+                METRICS.inc(EVENTS, count, outcome="received")
+                self._respond(HTTPStatus.ACCEPTED, {"queued": count})
+
+            def _respond(self, status: HTTPStatus, body: dict) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: object) -> None:
+                logger.debug(format % args)
+
+        return Handler
+
+
+def next_batch(
+    queue: EventQueue,
+    batch_size: int,
+    batch_seconds: float,
+    stop: threading.Event,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+) -> list[Event]:
+    """Wait for a micro-batch of events.
+
+    Waits until there is at least one event, then for up to `batch_seconds` more
+    for the batch to fill up to `batch_size` events. Returns early, possibly with
+    no events, once `stop` is set.
+    """
+    events: list[Event] = []
+    deadline: float | None = None
+    while not stop.is_set():
+        events += queue.get(batch_size - len(events), lease_seconds)
+        if events and deadline is None:
+            deadline = time.monotonic() + batch_seconds
+        if len(events) >= batch_size or (
+            deadline is not None and time.monotonic() >= deadline
+        ):
+            break
+        timeout = POLL_SECONDS
+        if deadline is not None:
+            timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+        stop.wait(timeout)
+    return events
+
+
+def run_consumer(
+    queue: EventQueue,
+    ingest: Callable[[list[str]], None],
+    batch_size: int,
+    batch_seconds: float,
+    stop: threading.Event,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    max_batches: int | None = None,
+) -> int:
+    """Ingest micro-batches of upload events until stopped.
+
+    Args:
+        queue: Queue of upload events.
+        ingest: Callable that ingests the images with the IDs given.
+        batch_size: Largest number of events ingested together.
+        batch_seconds: Seconds to wait for a batch to fill after its first event.
+        stop: Event that ends the loop once set.
+        lease_seconds: Seconds after which events of a batch that failed are
+            delivered again.
+        max_batches: Stop after this many batches. Runs until stopped if not
+            provided.
+
+    Returns:
+        Number of batches ingested.
+    """
+    batches = 0
+    while not stop.is_set():
+        METRICS.set_gauge(QUEUE_DEPTH, queue.depth())
+        events = next_batch(queue, batch_size, batch_seconds, stop, lease_seconds)
+        if not events:
+            continue
+        # Duplicate notifications for an image are ingested once
+        ids = list(dict.fromkeys(event.id for event in events))
+        try:
+            ingest(ids)
+        except Exception:
+            # Leave the events leased so that they are delivered again
+            METRICS.inc(EVENTS, len(events), outcome="failed")
+            logger.exception(f"Ingesting a batch of {len(events)} events failed")
+        else:
+            queue.ack(events)
+            METRICS.inc(EVENTS, len(events), outcome="ingested")
+
+        batches += 1
+        if max_batches is not None and batches >= max_batches:
+            break
+
+    return batches
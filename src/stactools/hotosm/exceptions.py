@@ -3,3 +3,7 @@
 
 class AssetNotFoundError(FileNotFoundError):
     """Raised if an imagery asset does not exist."""
+
+
+class AssetTimeoutError(TimeoutError):
+    """Raised if reading an imagery asset exceeds its deadline."""
@@ -0,0 +1,136 @@
+"""Compact sets of the IDs of STAC Items already in PgSTAC."""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+from stactools.hotosm.dump_index import id_hash
+
+if TYPE_CHECKING:
+    from pypgstac.db import PgstacDB
+
+logger = logging.getLogger(__name__)
+
+# Cache files start with this header: magic and number of hashes, followed by the
+# sorted hashes, as little-endian integers.
+MAGIC = b"HOTIDS01"
+HEADER = struct.Struct("<8sQ")
+
+# Cache files older than this are refreshed from PgSTAC, to pick up STAC Items
+# that were deleted or loaded by other programs
+DEFAULT_MAX_AGE_SECONDS = 24 * 60 * 60
+
+
+class ExistingIds:
+    """IDs of the STAC Items already in a Collection, to skip re-creating them.
+
+    IDs are kept as a sorted array of 64-bit hashes (see
+    `stactools.hotosm.dump_index.id_hash`), 8 bytes per STAC Item whatever the
+    length of its ID, and looked up by binary search. Unlike a Bloom filter, a new
+    STAC Item is only mistaken for an existing one on a hash collision, which is
+    vanishingly unlikely for catalogs of millions of STAC Items.
+
+    The set is optionally cached in a file, to avoid reading every ID from PgSTAC
+    on each run.
+    """
+
+    def __init__(self, hashes: Iterable[int] = (), path: Path | None = None) -> None:
+        """Create the set from hashes of IDs, in any order."""
+        self.hashes = array("Q", sorted(hashes))
+        self.path = path
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[str], path: Path | None = None) -> ExistingIds:
+        """Create the set from IDs."""
+        return cls((id_hash(id_) for id_ in ids), path)
+
+    @classmethod
+    def read(cls, path: Path) -> ExistingIds:
+        """Read the set from a cache file written by `save`.
+
+        Raises:
+            ValueError: If the file is not a cache of IDs.
+        """
+        existing = cls(path=path)
+        with path.open("rb") as src:
+            header = src.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise ValueError(f"{path} is not a cache of STAC Item IDs")
+            magic, count = HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a cache of STAC Item IDs")
+            try:
+                existing.hashes.fromfile(src, count)
+            except EOFError as e:
+                raise ValueError(f"{path} is truncated") from e
+        if sys.byteorder == "big":
+            existing.hashes.byteswap()
+        return existing
+
+    @classmethod
+    def load(
+        cls,
+        db: PgstacDB,
+        collection_id: str,
+        path: Path | None = None,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+    ) -> ExistingIds:
+        """Load the set from a cache file, or from PgSTAC if it is missing or stale.
+
+        IDs read from PgSTAC are written to the cache file, if one is given.
+        """
+        if (
+            path is not None
+            and path.exists()
+            and time.time() - path.stat().st_mtime < max_age_seconds
+        ):
+            try:
+                return cls.read(path)
+            except ValueError as e:
+                logger.warning(f"Ignoring the cache of STAC Item IDs: {e}")
+
+        from stactools.hotosm.reconcile import iter_pgstac_ids
+
+        existing = cls.from_ids(iter_pgstac_ids(db, collection_id), path)
+        existing.save()
+        return existing
+
+    def __len__(self) -> int:
+        """Number of IDs in the set."""
+        return len(self.hashes)
+
+    def __contains__(self, item_id: object) -> bool:
+        """Check whether a STAC Item with an ID is in the set."""
+        if not isinstance(item_id, str):
+            return False
+        hash_ = id_hash(item_id)
+        position = bisect_left(self.hashes, hash_)
+        return position < len(self.hashes) and self.hashes[position] == hash_
+
+    def update(self, ids: Iterable[str]) -> None:
+        """Add the IDs of STAC Items that were loaded into PgSTAC."""
+        added = sorted(id_hash(id_) for id_ in ids)
+        if added:
+            self.hashes = array("Q", heapq.merge(self.hashes, added))
+
+    def save(self) -> None:
+        """Write the set to its cache file, if it has one."""
+        if self.path is None:
+            return
+        hashes = self.hashes
+        if sys.byteorder == "big":
+            hashes = array("Q", hashes)
+            hashes.byteswap()
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        with tmp.open("wb") as dst:
+            dst.write(HEADER.pack(MAGIC, len(hashes)))
+            hashes.tofile(dst)
+        tmp.replace(self.path)
@@ -0,0 +1,139 @@
+"""Aggregate the extent of a STAC Collection from the STAC Items ingested into it."""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pystac
+
+
+def _parse_datetime(value: str) -> dt.datetime:
+    parsed = dt.datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.UTC)
+    return parsed
+
+
+@dataclass
+class ExtentAggregator:
+    """Running spatial and temporal extent of STAC Items.
+
+    STAC Items are added one at a time as they pass through a sync, keeping only
+    their bounding box and datetime range, so aggregating uses constant memory no
+    matter how many STAC Items there are. The extent is optionally persisted to a
+    file so that it accumulates over many runs and can be applied to the STAC
+    Collection without scanning PgSTAC or the upstream catalog.
+
+    Bounding boxes crossing the antimeridian, i.e. with a minimum longitude greater
+    than their maximum longitude, are split in two at the antimeridian, so the
+    extent covers all longitudes rather than missing either side.
+
+    Attributes:
+        bbox: Bounding box of the STAC Items, which never crosses the antimeridian.
+        start: Earliest datetime of the STAC Items.
+        end: Latest datetime of the STAC Items.
+        count: Number of STAC Items processed. STAC Items added by several runs,
+            e.g. overlapping syncs, are counted once per run, so this may be more
+            than the number of distinct STAC Items.
+        path: File the extent is persisted to.
+    """
+
+    bbox: list[float] | None = None
+    start: dt.datetime | None = None
+    end: dt.datetime | None = None
+    count: int = 0
+    path: Path | None = None
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> ExtentAggregator:
+        """Load the extent from a file, starting empty if it does not exist."""
+        if path is None or not path.exists():
+            return cls(path=path)
+        data = json.loads(path.read_text())
+        return cls(
+            bbox=data["bbox"],
+            start=_parse_datetime(data["start"]) if data["start"] else None,
+            end=_parse_datetime(data["end"]) if data["end"] else None,
+            count=data["count"],
+            path=path,
+        )
+
+    def save(self) -> None:
+        """Write the extent to its file, if it has one."""
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict()))
+        tmp.replace(self.path)
+
+    def to_dict(self) -> dict:
+        """Serialize the extent to a JSON compatible dictionary."""
+        return {
+            "bbox": self.bbox,
+            "start": self.start.isoformat() if self.start else None,
+            "end": self.end.isoformat() if self.end else None,
+            "count": self.count,
+        }
+
+    def add(self, item: dict) -> None:
+        """Expand the extent to include a STAC Item dictionary."""
+        self.count += 1
+        if bbox := item.get("bbox"):
+            # 3D bounding boxes list the minimum and maximum elevation after (x, y)
+            half = len(bbox) // 2
+            self._add_bbox([bbox[0], bbox[1], bbox[half], bbox[half + 1]])
+
+        properties = item.get("properties", {})
+        start = properties.get("start_datetime") or properties.get("datetime")
+        end = properties.get("end_datetime") or properties.get("datetime")
+        self._add_interval(
+            _parse_datetime(start) if start else None,
+            _parse_datetime(end) if end else None,
+        )
+
+    def merge(self, other: ExtentAggregator) -> None:
+        """Expand the extent to include another aggregated extent."""
+        self.count += other.count
+        if other.bbox is not None:
+            self._add_bbox(other.bbox)
+        self._add_interval(other.start, other.end)
+
+    def _add_bbox(self, bbox: list[float]) -> None:
+        if bbox[0] > bbox[2]:
+            self._add_bbox([bbox[0], bbox[1], 180.0, bbox[3]])
+            self._add_bbox([-180.0, bbox[1], bbox[2], bbox[3]])
+        elif self.bbox is None:
+            self.bbox = list(bbox)
+        else:
+            self.bbox = [
+                min(self.bbox[0], bbox[0]),
+                min(self.bbox[1], bbox[1]),
+                max(self.bbox[2], bbox[2]),
+                max(self.bbox[3], bbox[3]),
+            ]
+
+    def _add_interval(self, start: dt.datetime | None, end: dt.datetime | None) -> None:
+        if start is not None and (self.start is None or start < self.start):
+            self.start = start
+        if end is not None and (self.end is None or end > self.end):
+            self.end = end
+
+    def to_extent(self) -> pystac.Extent:
+        """Create a STAC Collection extent.
+
+        Raises:
+            ValueError: If no STAC Items with a bounding box have been added.
+        """
+        from pystac import Extent, SpatialExtent, TemporalExtent
+
+        if self.bbox is None:
+            raise ValueError("Cannot create an extent without any STAC Items")
+        return Extent(
+            SpatialExtent([self.bbox]),
+            TemporalExtent([[self.start, self.end]]),
+        )
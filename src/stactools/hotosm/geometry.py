@@ -0,0 +1,85 @@
+"""Reduce the size of STAC Item geometries."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from stactools.hotosm.metrics import GEOMETRY_BYTES, GEOMETRY_VERTICES, METRICS
+from stactools.hotosm.serialize import dumps, loads
+
+
+@dataclass(frozen=True)
+class GeometryOptions:
+    """Options for reducing the size of STAC Item geometries.
+
+    Attributes:
+        precision: Number of decimal places to round coordinates to. Coordinates
+            are snapped to a grid of this precision while keeping geometries valid,
+            so polygons that collapse at this precision are removed.
+        simplify_tolerance: Simplify geometries, preserving their topology, so that
+            no point moves more than this distance in degrees.
+    """
+
+    precision: int | None = None
+    simplify_tolerance: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether geometries are modified with these options."""
+        return self.precision is not None or self.simplify_tolerance is not None
+
+
+def optimize_geometry(
+    geometry: dict[str, Any], options: GeometryOptions, **labels: str
+) -> tuple[dict[str, Any], list[float]]:
+    """Simplify and quantize a GeoJSON geometry, returning it with its bounding box.
+
+    The size of the geometry serialized to JSON and its number of vertices before
+    and after are recorded in the run metrics, labeled by `labels`. The original
+    geometry is kept if it would become empty.
+
+    Requires the optional `shapely` dependency (`geometry` extra).
+    """
+    import numpy as np
+    import shapely
+
+    shape = shapely.geometry.shape(geometry)
+    optimized = shape
+    if options.simplify_tolerance is not None:
+        optimized = optimized.simplify(
+            options.simplify_tolerance, preserve_topology=True
+        )
+    if options.precision is not None:
+        grid_size = 10.0**-options.precision
+        optimized = shapely.set_precision(optimized, grid_size)
+        # Snapping to the grid leaves floating point noise (e.g. 0.30000000000000004)
+        # that rounding removes from the serialized coordinates.
+        precision = options.precision
+        optimized = shapely.transform(optimized, lambda xy: np.round(xy, precision))
+    if optimized.is_empty:
+        optimized = shape
+
+    coordinates = shapely.get_coordinates(optimized)
+    bbox = [*coordinates.min(axis=0).tolist(), *coordinates.max(axis=0).tolist()]
+    result = loads(shapely.to_geojson(optimized))
+
+    METRICS.inc(GEOMETRY_BYTES, len(dumps(geometry)), stage="input", **labels)
+    METRICS.inc(GEOMETRY_BYTES, len(dumps(result)), stage="output", **labels)
+    METRICS.inc(
+        GEOMETRY_VERTICES,
+        int(shapely.get_num_coordinates(shape)),
+        stage="input",
+        **labels,
+    )
+    METRICS.inc(GEOMETRY_VERTICES, len(coordinates), stage="output", **labels)
+
+    return result, bbox
+
+
+def geometry_savings() -> tuple[float, float]:
+    """Bytes of STAC Item geometries before and after optimization in this run."""
+    return (
+        METRICS.counter_total(GEOMETRY_BYTES, stage="input"),
+        METRICS.counter_total(GEOMETRY_BYTES, stage="output"),
+    )
@@ -0,0 +1,279 @@
+"""Load dumps of STAC Items into PgSTAC over concurrent connections."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterator
+
+from stactools.hotosm.dump import Manifest, compression_from_path, open_ndjson
+from stactools.hotosm.dump_index import IndexedDump, index_path
+from stactools.hotosm.metrics import ITEMS, METRICS
+from stactools.hotosm.partition import order_by_partition
+from stactools.hotosm.serialize import loads
+
+if TYPE_CHECKING:
+    from pypgstac.load import Loader
+
+logger = logging.getLogger(__name__)
+
+# Size of the byte ranges that uncompressed NDJSON files are split into
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class LoadTask:
+    """Part of a dump that is loaded into PgSTAC over a single connection.
+
+    Uncompressed NDJSON files are split into byte ranges from `start` up to `end`.
+    Each range holds the lines that begin within it, so ranges do not need to be
+    aligned with line breaks. Compressed files and shards are loaded whole, and
+    shards listed in a manifest are checked against their `sha256` checksum.
+    """
+
+    path: Path
+    start: int = 0
+    end: int | None = None
+    sha256: str | None = None
+
+    @property
+    def key(self) -> str:
+        """Identify the task in the state file of a resumable load."""
+        if self.end is None:
+            return str(self.path)
+        return f"{self.path}:{self.start}-{self.end}"
+
+    @property
+    def size(self) -> int:
+        """Number of bytes read from disk for this task."""
+        if self.end is None:
+            return self.path.stat().st_size
+        return self.end - self.start
+
+    def verify(self) -> None:
+        """Check the file against its checksum from a manifest, if any."""
+        if self.sha256 is None:
+            return
+        digest = hashlib.sha256()
+        with self.path.open("rb") as src:
+            while chunk := src.read(1024 * 1024):
+                digest.update(chunk)
+        if digest.hexdigest() != self.sha256:
+            raise ValueError(f"Checksum of {self.path} does not match its manifest")
+
+    def read(self) -> Iterator[dict]:
+        """Yield the STAC Items in this part of the dump."""
+        with open_ndjson(self.path) as src:
+            if self.end is None:
+                lines: Iterator[bytes] = iter(src)
+            else:
+                lines = self._read_range(src)
+            for line in lines:
+                if line.strip():
+                    yield loads(line)
+
+    def _read_range(self, src: BinaryIO) -> Iterator[bytes]:
+        assert self.end is not None
+        position = self.start
+        if self.start:
+            # Skip the rest of a line beginning in the previous range. If the
+            # previous range ends with a line break, this only reads that break.
+            src.seek(self.start - 1)
+            position += len(src.readline()) - 1
+        while position < self.end:
+            line = src.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line
+
+
+def plan_tasks(
+    paths: list[Path], chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> list[LoadTask]:
+    """Split dump files into tasks that can be loaded concurrently.
+
+    Manifests (`*.manifest.json`) are expanded to one task per shard, compressed
+    NDJSON files are loaded whole and uncompressed NDJSON files are split into byte
+    ranges of about `chunk_bytes`. Ranges of indexed files are aligned with STAC
+    Items, using the index rather than reading the file.
+    """
+    tasks: list[LoadTask] = []
+    for path in paths:
+        if path.name.endswith(".manifest.json"):
+            manifest = Manifest.read(path)
+            tasks.extend(
+                LoadTask(path.parent / shard.path, sha256=shard.sha256)
+                for shard in manifest.shards
+            )
+        elif compression_from_path(path) is not None:
+            tasks.append(LoadTask(path))
+        elif (ranges := _indexed_ranges(path, chunk_bytes)) is not None:
+            tasks.extend(LoadTask(path, start, end) for start, end in ranges)
+        else:
+            size = path.stat().st_size
+            tasks.extend(
+                LoadTask(path, start, min(start + chunk_bytes, size))
+                for start in range(0, size, chunk_bytes)
+            )
+    return tasks
+
+
+def _indexed_ranges(path: Path, chunk_bytes: int) -> list[tuple[int, int]] | None:
+    if not index_path(path).exists():
+        return None
+    try:
+        with IndexedDump(path) as dump:
+            return dump.split(-(-dump.size // chunk_bytes))
+    except ValueError as e:
+        logger.warning(f"Ignoring the index of {path}: {e}")
+        return None
+
+
+class LoadState:
+    """Completed load tasks, optionally persisted to resume an interrupted load.
+
+    Completed tasks are appended to the state file as lines of JSON, so the file
+    stays valid if the load is killed.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        """Read completed tasks from a state file, if it exists."""
+        self.path = path
+        self.completed: set[str] = set()
+        self._lock = threading.Lock()
+        if path is not None and path.exists():
+            with path.open() as src:
+                self.completed = {
+                    json.loads(line)["task"] for line in src if line.strip()
+                }
+
+    def is_done(self, task: LoadTask) -> bool:
+        """Whether a task was completed by a previous run."""
+        return task.key in self.completed
+
+    def mark_done(self, task: LoadTask, count: int) -> None:
+        """Record a completed task."""
+        with self._lock:
+            self.completed.add(task.key)
+            if self.path is not None:
+                with self.path.open("a") as dst:
+                    dst.write(json.dumps({"task": task.key, "count": count}) + "\n")
+
+
+@dataclass
+class LoadResult:
+    """Summary of loading dumps into PgSTAC."""
+
+    count: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    skipped: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def items_per_second(self) -> float:
+        """Throughput in STAC Items per second."""
+        return self.count / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Throughput in bytes of dump files read per second."""
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+
+def load_task(
+    loader: Loader, task: LoadTask, partition_buffer: int | None = None
+) -> int:
+    """Upsert the STAC Items of one task into PgSTAC, returning how many.
+
+    STAC Items are grouped by PgSTAC partition before loading if `partition_buffer`
+    is given (see `stactools.hotosm.partition.order_by_partition`).
+    """
+    from pypgstac.load import Methods
+
+    task.verify()
+    collections: Counter[str] = Counter()
+
+    def counted() -> Iterator[dict]:
+        for item in task.read():
+            collections[item.get("collection", "")] += 1
+            yield item
+
+    items = counted()
+    if partition_buffer is not None:
+        items = order_by_partition(items, partition_buffer)
+    with METRICS.timer("load"):
+        loader.load_items(items, insert_mode=Methods.upsert)
+    for collection, count in collections.items():
+        METRICS.inc(ITEMS, count, collection=collection, outcome="loaded")
+    return collections.total()
+
+
+def load_tasks(
+    tasks: list[LoadTask],
+    new_loader: Callable[[], Loader],
+    workers: int,
+    state: LoadState | None = None,
+    progress: Callable[[LoadTask, int, float], None] | None = None,
+    partition_buffer: int | None = None,
+) -> LoadResult:
+    """Load tasks concurrently, with one PgSTAC Loader per worker thread.
+
+    Tasks completed by a previous run according to `state` are skipped. A failed
+    task does not stop the others; failures are reported in the result so that the
+    load can be resumed to retry them. Upserting makes retrying a partially loaded
+    task safe.
+    """
+    state = state or LoadState()
+    result = LoadResult()
+    local = threading.local()
+    loaders: list[Loader] = []
+    lock = threading.Lock()
+
+    def run(task: LoadTask) -> tuple[int, float]:
+        if not hasattr(local, "loader"):
+            local.loader = new_loader()
+            with lock:
+                loaders.append(local.loader)
+        start = time.perf_counter()
+        count = load_task(local.loader, task, partition_buffer)
+        return count, time.perf_counter() - start
+
+    pending = []
+    for task in tasks:
+        if state.is_done(task):
+            result.skipped.append(task.key)
+        else:
+            pending.append(task)
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run, task): task for task in pending}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    count, seconds = future.result()
+                except Exception as e:
+                    logger.exception(f"Failed to load {task.key}")
+                    result.failed[task.key] = f"{type(e).__name__}: {e}"
+                    continue
+                state.mark_done(task, count)
+                result.count += count
+                result.bytes += task.size
+                if progress is not None:
+                    progress(task, count, seconds)
+    finally:
+        result.seconds = time.perf_counter() - start
+        for loader in loaders:
+            loader.db.disconnect()
+
+    return result
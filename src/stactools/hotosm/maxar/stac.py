@@ -19,12 +19,13 @@ from pystac.extensions.item_assets import ItemAssetDefinition
 from pystac.extensions.render import Render, RenderExtension
 
 from stactools.hotosm.constants import (
+    MAXAR_COLLECTION_ID as COLLECTION_ID,
     OAM_EXTENSION_DEFAULT_VERSION,
     OAM_EXTENSION_SCHEMA_URI_PATTERN,
 )
+from stactools.hotosm.geometry import GeometryOptions, optimize_geometry
 from stactools.hotosm.stac_common import add_alternate_assets
 
-COLLECTION_ID = "maxar-opendata"
 COLLECTION_DESCRIPTION = (
     "Maxar Open Data Catalog, formatted for Humanitarian OpenStreetMap "
     "Team's OpenAerialMap project"
@@ -99,13 +100,36 @@ def create_collection(
     return collection
 
 
-def create_item(item: Item) -> Item:
-    """Rewrite Maxar STAC Item."""
+def item_id(maxar_id: str) -> str:
+    """ID of the STAC Item created from a Maxar STAC Item with `create_item`."""
+    # The ID is unique but contains "/" that interfere with access via API
+    return maxar_id.replace("/", "-")
+
+
+def create_item(item: Item, geometry_options: GeometryOptions | None = None) -> Item:
+    """Rewrite Maxar STAC Item.
+
+    Args:
+        item: STAC Item from the Maxar Open Data catalog.
+        geometry_options: Options for simplifying and quantizing the Item geometry,
+            in which case the bbox is recomputed from the result.
+
+    Returns:
+        STAC Item for HOT OAM.
+    """
     oam_item = item.clone()
     oam_item.set_collection(None)
 
-    # The ID is unique but contains "/" that interfere with access via API
-    oam_item.id = item.id.replace("/", "-")
+    if (
+        geometry_options is not None
+        and geometry_options.enabled
+        and oam_item.geometry is not None
+    ):
+        oam_item.geometry, oam_item.bbox = optimize_geometry(
+            oam_item.geometry, geometry_options, collection=COLLECTION_ID
+        )
+
+    oam_item.id = item_id(item.id)
 
     # This Item is in an ARD tile sub-Collection. The "title" we want to use
     # is from the parent of the ARD tile Collection which is organized based
@@ -2,22 +2,43 @@
 
 import datetime as dt
 import logging
+import time
 from typing import Iterator
 from urllib.parse import urljoin
 
 import pystac
 import requests
 
+from stactools.hotosm.backfill import BackfillShard
+from stactools.hotosm.concurrency import CONTROLLER
+from stactools.hotosm.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_RESPONSE_BYTES,
+    METRICS,
+)
+
 logger = logging.getLogger(__name__)
 
 MAXAR_ROOT = "https://maxar-opendata.s3.amazonaws.com/events/"
 MAXAR_EVENT_INFO = "https://maxar-opendata.s3.amazonaws.com/events/event_info.json"
 
 
+class LimitedStacIO(pystac.stac_io.RetryStacIO):
+    """StacIO reading over HTTP within the concurrency limit of each host."""
+
+    def read_text_from_href(self, href: str) -> str:
+        """Read a file, holding a slot from the limiter of its host."""
+        with CONTROLLER.request(href):
+            return super().read_text_from_href(href)
+
+
 def new_stac_items(
     stac_io: pystac.StacIO,
     session: requests.Session,
-    after: dt.datetime,
+    after: dt.datetime | None,
+    shard: BackfillShard | None = None,
+    before: dt.datetime | None = None,
 ) -> Iterator[pystac.Item]:
     """Find Maxar STAC Items newer than some date.
 
@@ -28,12 +49,38 @@ def new_stac_items(
     Args:
         stac_io: PySTAC StacIO instance
         session: requests Session object
-        after: Only return Items added after this date.
+        after: Only return Items added after this date. All Items are returned if
+            not provided.
+        shard: If provided, only return Items of the events in this slice of the
+            catalog.
+        before: If provided, only return Items of events dated before this date.
 
     Yields:
         STAC Items
     """
-    r = session.get(MAXAR_EVENT_INFO)
+    for collection in new_event_collections(stac_io, session, after, shard, before):
+        yield from collection.get_items(recursive=True)
+
+
+def new_event_collections(
+    stac_io: pystac.StacIO,
+    session: requests.Session,
+    after: dt.datetime | None,
+    shard: BackfillShard | None = None,
+    before: dt.datetime | None = None,
+) -> Iterator[pystac.Collection]:
+    """Find the STAC Collections of Maxar events newer than some date.
+
+    Only the Collections are read, not their STAC Items. Arguments are those of
+    `new_stac_items`.
+    """
+    start = time.perf_counter()
+    with CONTROLLER.request(MAXAR_EVENT_INFO) as request:
+        r = session.get(MAXAR_EVENT_INFO)
+        request.record_status(r.status_code)
+    METRICS.observe(HTTP_REQUEST_DURATION, time.perf_counter() - start, client="maxar")
+    METRICS.inc(HTTP_REQUESTS, client="maxar", status=str(r.status_code))
+    METRICS.inc(HTTP_RESPONSE_BYTES, len(r.content), client="maxar")
     r.raise_for_status()
     events = r.json()
 
@@ -41,9 +88,14 @@ def new_stac_items(
         event_date = dt.datetime.strptime(event["date"], "%Y-%m-%d").replace(
             tzinfo=dt.UTC
         )
+        if shard is not None and not shard.owns(event["s3_directory"]):
+            continue
+        if before is not None and event_date >= before:
+            continue
         if after is None or event_date >= after:
             url = urljoin(MAXAR_ROOT, f"{event['s3_directory']}/collection.json")
-            collection = pystac.read_file(url, stac_io=stac_io)
+            with METRICS.timer("maxar_collection_read"):
+                collection = pystac.read_file(url, stac_io=stac_io)
             assert isinstance(collection, pystac.Collection)
             collection.remove_links(pystac.RelType.ROOT)
-            yield from collection.get_items(recursive=True)
+            yield collection
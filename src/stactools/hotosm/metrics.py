@@ -0,0 +1,258 @@
+"""Lightweight run metrics exported as a Prometheus textfile or JSON summary."""
+
+from __future__ import annotations
+
+import bisect
+import json
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+LabelsType = tuple[tuple[str, str], ...]
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+# Names of the metrics recorded by this package
+STAGE_DURATION = "hotosm_stage_duration_seconds"
+STAGE_ERRORS = "hotosm_stage_errors_total"
+HTTP_REQUESTS = "hotosm_http_requests_total"
+HTTP_REQUEST_DURATION = "hotosm_http_request_duration_seconds"
+HTTP_RESPONSE_BYTES = "hotosm_http_response_bytes_total"
+ITEMS = "hotosm_items_total"
+ITEMS_PER_SECOND = "hotosm_items_per_second"
+PEAK_RSS = "hotosm_peak_rss_bytes"
+GEOMETRY_BYTES = "hotosm_geometry_bytes_total"
+GEOMETRY_VERTICES = "hotosm_geometry_vertices_total"
+ASSET_READS = "hotosm_asset_reads_total"
+GDAL_OPENS = "hotosm_gdal_opens_total"
+GDAL_REQUESTS = "hotosm_gdal_http_requests_total"
+ASSET_CHECKS = "hotosm_asset_checks_total"
+CONCURRENCY_LIMIT = "hotosm_concurrency_limit"
+CONCURRENCY_IN_FLIGHT = "hotosm_concurrency_in_flight"
+CONCURRENCY_DECREASES = "hotosm_concurrency_decreases_total"
+EVENTS = "hotosm_events_total"
+QUEUE_DEPTH = "hotosm_queue_depth"
+
+# Seconds spent in each stage for the STAC Item currently being created, if traced
+ITEM_STEPS: ContextVar[dict[str, float] | None] = ContextVar("ITEM_STEPS", default=None)
+
+
+@dataclass
+class Histogram:
+    """Cumulative histogram of observations."""
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        """Initialize empty bucket counts."""
+        if not self.counts:
+            self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record an observation."""
+        idx = bisect.bisect_left(self.buckets, value)
+        if idx < len(self.buckets):
+            self.counts[idx] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Return (upper bound, cumulative count) pairs, ending with +Inf."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets, self.counts, strict=True):
+            total += count
+            pairs.append((_format_value(bound), total))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+
+class MetricsRegistry:
+    """Thread safe registry of counters, gauges and histograms."""
+
+    def __init__(self) -> None:
+        """Create an empty registry."""
+        self._lock = threading.Lock()
+        self.counters: dict[str, dict[LabelsType, float]] = {}
+        self.gauges: dict[str, dict[LabelsType, float]] = {}
+        self.histograms: dict[str, dict[LabelsType, Histogram]] = {}
+
+    def reset(self) -> None:
+        """Forget all recorded metrics."""
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increment a counter."""
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def counter_total(self, name: str, **labels: str) -> float:
+        """Sum a counter over all series matching the given labels."""
+        wanted = set(_labels(labels))
+        with self._lock:
+            return sum(
+                value
+                for key, value in self.counters.get(name, {}).items()
+                if wanted <= set(key)
+            )
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge to a value."""
+        with self._lock:
+            self.gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record an observation in a histogram."""
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, stage: str, **labels: str) -> Iterator[None]:
+        """Time a block of code as a stage, counting errors by exception class."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.inc(STAGE_ERRORS, 1, stage=stage, error=type(e).__name__, **labels)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe(STAGE_DURATION, elapsed, stage=stage, **labels)
+            if (steps := ITEM_STEPS.get()) is not None:
+                steps[stage] = steps.get(stage, 0.0) + elapsed
+
+    def record_peak_rss(self) -> None:
+        """Update the peak resident set size gauge."""
+        self.set_gauge(PEAK_RSS, peak_rss_bytes())
+
+    def to_dict(self) -> dict:
+        """Summarize all metrics as a JSON serializable dictionary."""
+        self.record_peak_rss()
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(key), "value": value}
+                    for name, series in sorted(self.counters.items())
+                    for key, value in sorted(series.items())
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(key), "value": value}
+                    for name, series in sorted(self.gauges.items())
+                    for key, value in sorted(series.items())
+                ],
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(key),
+                        "count": hist.count,
+                        "sum": hist.sum,
+                        "buckets": dict(hist.cumulative()),
+                    }
+                    for name, series in sorted(self.histograms.items())
+                    for key, hist in sorted(series.items())
+                ],
+            }
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        self.record_peak_rss()
+        lines = []
+        with self._lock:
+            for kind, metrics in (("counter", self.counters), ("gauge", self.gauges)):
+                for name, series in sorted(metrics.items()):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in sorted(series.items()):
+                        lines.append(f"{name}{_render(key)} {_format_value(value)}")
+
+            for name, hists in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(hists.items()):
+                    for bound, count in hist.cumulative():
+                        labels = _render(key + (("le", bound),))
+                        lines.append(f"{name}_bucket{labels} {count}")
+                    lines.append(f"{name}_sum{_render(key)} {_format_value(hist.sum)}")
+                    lines.append(f"{name}_count{_render(key)} {hist.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(
+        self,
+        prometheus_path: Path | None = None,
+        json_path: Path | None = None,
+    ) -> None:
+        """Write metrics to a Prometheus textfile and/or a JSON summary.
+
+        Files are written atomically so that a node_exporter textfile collector
+        never reads a partially written file.
+        """
+        if prometheus_path is not None:
+            _atomic_write(prometheus_path, self.to_prometheus())
+        if json_path is not None:
+            _atomic_write(json_path, json.dumps(self.to_dict(), indent=2))
+
+
+def peak_rss_bytes() -> int:
+    """Return the peak resident set size of this process in bytes."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes while macOS reports bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _labels(labels: dict[str, str]) -> LabelsType:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _render(labels: LabelsType) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(content)
+    tmp.replace(path)
+
+
+# Registry shared by the whole process
+METRICS = MetricsRegistry()
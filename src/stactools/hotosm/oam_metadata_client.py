@@ -4,11 +4,19 @@ from __future__ import annotations
 
 import datetime as dt
 import logging
+import time
 from dataclasses import dataclass
-from typing import ClassVar, Iterator
+from typing import Any, ClassVar, Iterator, Literal
 
 import requests
 
+from stactools.hotosm.concurrency import CONTROLLER
+from stactools.hotosm.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_RESPONSE_BYTES,
+    METRICS,
+)
 from stactools.hotosm.oam_metadata import OamMetadata
 
 logger = logging.getLogger(__name__)
@@ -33,6 +41,27 @@ class OamMetadataClient:
             api_root=api_root.rstrip("/"),
         )
 
+    def _get(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a GET request to the API within its concurrency limit.
+
+        Request metrics are recorded, and the response status is fed back to the
+        concurrency limit of the API host.
+        """
+        start = time.perf_counter()
+        try:
+            with CONTROLLER.request(url) as request:
+                resp = self.session.get(url, **kwargs)
+                request.record_status(resp.status_code)
+        except requests.RequestException as e:
+            METRICS.inc(HTTP_REQUESTS, client="oam", status=type(e).__name__)
+            raise
+        METRICS.observe(
+            HTTP_REQUEST_DURATION, time.perf_counter() - start, client="oam"
+        )
+        METRICS.inc(HTTP_REQUESTS, client="oam", status=str(resp.status_code))
+        METRICS.inc(HTTP_RESPONSE_BYTES, len(resp.content), client="oam")
+        return resp
+
     def _parse_result(self, result: dict) -> OamMetadata:
         """Parse a metadata API result into our data class."""
         uploaded_at = result.get("uploaded_at")
@@ -63,7 +92,7 @@ class OamMetadataClient:
 
     def get_count(self) -> int:
         """Return the total count of items in the catalog."""
-        resp = self.session.get(
+        resp = self._get(
             self.api_root,
             params={
                 "limit": 1,
@@ -84,7 +113,7 @@ class OamMetadataClient:
         Returns:
             The OamMetadata for the catalog entry requested.
         """
-        resp = self.session.get(
+        resp = self._get(
             f"{self.api_root}/{item_id}",
         )
         resp.raise_for_status()
@@ -97,6 +126,7 @@ class OamMetadataClient:
         limit: int = 100,
         page_number: int = 1,
         raise_on_error: bool = False,
+        sort: Literal["asc", "desc"] = "desc",
     ) -> list[OamMetadata]:
         """List OAM metadata items.
 
@@ -107,23 +137,38 @@ class OamMetadataClient:
             page_number: Offset `limit` pages into the catalog, beginning with page 1.
             raise_on_error: Raise an exception if an item cannot be parsed instead of
                 simply logging the exception. Defaults to False.
+            sort: Order of the items by upload datetime. Defaults to newest first.
 
         Returns:
             At most `limit` metadata items.
         """
-        resp = self.session.get(
+        return self._parse_results(
+            self._list_page(limit, page_number, sort), uploaded_after, raise_on_error
+        )
+
+    def _list_page(
+        self, limit: int, page_number: int, sort: Literal["asc", "desc"]
+    ) -> list[dict]:
+        resp = self._get(
             self.api_root,
             params={
                 "order_by": "uploaded_at",
-                "sort": "desc",
+                "sort": sort,
                 "limit": str(limit),
                 "page": str(page_number),
             },
         )
         resp.raise_for_status()
+        return resp.json()["results"]
 
+    def _parse_results(
+        self,
+        page: list[dict],
+        uploaded_after: dt.datetime | None = None,
+        raise_on_error: bool = False,
+    ) -> list[OamMetadata]:
         results = []
-        for result in resp.json()["results"]:
+        for result in page:
             # Some OAM metadata entries have null start/end times, so log these
             # as errors and keep moving
             try:
@@ -145,7 +190,12 @@ class OamMetadataClient:
         return results
 
     def get_all_items(
-        self, uploaded_after: dt.datetime | None = None, limit: int = 500
+        self,
+        uploaded_after: dt.datetime | None = None,
+        limit: int = 500,
+        first_page: int = 1,
+        last_page: int | None = None,
+        sort: Literal["asc", "desc"] = "desc",
     ) -> Iterator[OamMetadata]:
         """Iterate through all images in the catalog.
 
@@ -153,18 +203,44 @@ class OamMetadataClient:
             uploaded_after: If provided, filter to only return items uploaded after this
                 date
             limit: Number of items to retrieve.
-            raise_on_error: Raise an exception if an item cannot be parsed instead of
-                simply logging the exception. Defaults to False.
+            first_page: Start from this page, beginning with page 1.
+            last_page: If provided, stop after this page rather than at the end of the
+                catalog.
+            sort: Order of the items by upload datetime. Defaults to newest first,
+                stopping at the first page without images uploaded after
+                `uploaded_after`. Oldest first, pages are listed up to `last_page`
+                or the end of the catalog, skipping older images.
 
         Returns:
             At most `limit` metadata items.
         """
+        page = first_page
+        while last_page is None or page <= last_page:
+            results = self._list_page(limit, page, sort)
+            if not results:
+                break
+            items = self._parse_results(results, uploaded_after)
+            # Newest first, no later page has images uploaded after `uploaded_after`
+            # once a page has none. Oldest first, they are on the last pages.
+            if not items and sort == "desc":
+                break
+            page += 1
+            yield from items
+
+    def get_all_ids(self, limit: int = 500) -> Iterator[str]:
+        """Iterate through the IDs of all images in the catalog.
+
+        Unlike `get_all_items`, results are not parsed, so the IDs of images with
+        metadata that cannot be parsed are included.
+
+        Args:
+            limit: Number of IDs to retrieve per request.
+        """
         page = 1
         while True:
-            items = self.get_items(
-                uploaded_after=uploaded_after, limit=limit, page_number=page
-            )
-            if not items:
+            results = self._list_page(limit, page, "desc")
+            if not results:
                 break
             page += 1
-            yield from items
+            for result in results:
+                yield result["_id"]
@@ -0,0 +1,80 @@
+"""Order STAC Items by their PgSTAC partition before loading."""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from stactools.hotosm.serialize import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Number of STAC Items held in memory before sorted runs are spilled to disk
+DEFAULT_PARTITION_BUFFER = 100_000
+
+
+def partition_key(item: dict) -> tuple[str, str]:
+    """Key grouping STAC Items by the PgSTAC partition they are loaded into.
+
+    PgSTAC partitions STAC Items by Collection and, depending on the Collection's
+    `partition_trunc`, by the year or month of `datetime` (or `start_datetime`
+    for Items with a range). Grouping by month also groups by year, so the key is
+    the Collection ID and the `YYYY-MM` prefix of the datetime.
+    """
+    properties = item.get("properties", {})
+    datetime = properties.get("datetime") or properties.get("start_datetime") or ""
+    return item.get("collection", ""), datetime[:7]
+
+
+def order_by_partition(
+    items: Iterable[dict],
+    buffer_items: int = DEFAULT_PARTITION_BUFFER,
+    spill_dir: Path | None = None,
+) -> Iterator[dict]:
+    """Yield STAC Items grouped by PgSTAC partition.
+
+    `Loader.load_items` only groups STAC Items by partition within each chunk it
+    loads, so STAC Items arriving in upload order touch many partitions per chunk.
+    This sorts STAC Items by `partition_key` with an external merge sort: up to
+    `buffer_items` are sorted in memory, and beyond that sorted runs are spilled to
+    temporary NDJSON files in `spill_dir` and merged. The order of STAC Items
+    within a partition is preserved.
+    """
+    buffer: list[dict] = []
+    runs: list[Path] = []
+    with tempfile.TemporaryDirectory(
+        prefix="hotosm-partition-", dir=spill_dir
+    ) as tmp_dir:
+        for item in items:
+            buffer.append(item)
+            if len(buffer) >= buffer_items:
+                run = Path(tmp_dir) / f"run-{len(runs):05d}.ndjson"
+                _write_run(run, buffer)
+                runs.append(run)
+                buffer = []
+        buffer.sort(key=partition_key)
+
+        if not runs:
+            yield from buffer
+            return
+
+        logger.info(f"Merging {len(runs) + 1} sorted runs of STAC Items")
+        with ExitStack() as stack:
+            readers = [_read_run(stack.enter_context(run.open("rb"))) for run in runs]
+            yield from heapq.merge(*readers, buffer, key=partition_key)
+
+
+def _write_run(path: Path, items: list[dict]) -> None:
+    items.sort(key=partition_key)
+    with path.open("wb") as dst:
+        for item in items:
+            dst.write(dumps(item) + b"\n")
+
+
+def _read_run(lines: Iterable[bytes]) -> Iterator[dict]:
+    for line in lines:
+        yield loads(line)
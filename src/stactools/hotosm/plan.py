@@ -0,0 +1,123 @@
+"""Estimate the work of a dump or sync from listing-level calls only."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable
+
+from stactools.hotosm.metrics import HTTP_REQUESTS, METRICS
+
+if TYPE_CHECKING:
+    import pystac
+
+    from stactools.hotosm.existing import ExistingIds
+    from stactools.hotosm.oam_metadata import OamMetadata
+
+# Assets of OAM STAC Items checked by --check-assets: the thumbnail and the
+# metadata, as the visual asset is already read while creating them
+OAM_CHECKED_ASSETS = 2
+
+
+@dataclass
+class Plan:
+    """Estimated work of creating the STAC Items of the new records of a catalog.
+
+    Attributes:
+        catalog: Name of the dataset catalog.
+        records: Number of upstream records in the window.
+        existing: Number of records whose STAC Items are already in PgSTAC, if
+            known.
+        asset_bytes: Total size of the imagery of the STAC Items to create, if
+            known.
+        listing_requests: Requests listing the records, which a run repeats.
+        record_reads: Requests reading one upstream record each.
+        asset_opens: Imagery assets opened with GDAL to create STAC Items.
+        asset_checks: HEAD requests checking assets with --check-assets, if known.
+    """
+
+    catalog: str
+    records: int = 0
+    existing: int | None = None
+    asset_bytes: int | None = None
+    listing_requests: int = 0
+    record_reads: int = 0
+    asset_opens: int = 0
+    asset_checks: int | None = 0
+
+    @property
+    def to_create(self) -> int:
+        """Number of STAC Items to create, counting all records if unknown."""
+        return self.records - (self.existing or 0)
+
+    def summary(self) -> str:
+        """Describe the plan in a few lines."""
+        existing = (
+            "unknown" if self.existing is None else f"{self.existing:,} in PgSTAC"
+        )
+        imagery = (
+            "unknown"
+            if self.asset_bytes is None
+            else f"{self.asset_bytes / 1e9:,.1f} GB"
+        )
+        checks = "unknown" if self.asset_checks is None else f"{self.asset_checks:,}"
+        return "\n".join(
+            [
+                f"{self.catalog}: {self.records:,} upstream records, {existing}, "
+                f"{self.to_create:,} STAC Items to create",
+                f"  Imagery of the STAC Items to create: {imagery}",
+                f"  Requests: {self.listing_requests:,} to list records, "
+                f"{self.record_reads:,} to read records, {self.asset_opens:,} "
+                f"imagery opens, {checks} asset checks",
+            ]
+        )
+
+
+def plan_oam(
+    records: Iterable[OamMetadata],
+    existing: ExistingIds | None = None,
+    check_assets: bool = False,
+) -> Plan:
+    """Plan the creation of OAM STAC Items from their listed metadata.
+
+    Listing OAM returns the full metadata of each image, including the size of its
+    imagery, so no record is read on its own. Creating a STAC Item opens its
+    imagery once, to read its projection.
+    """
+    listed = METRICS.counter_total(HTTP_REQUESTS, client="oam")
+    plan = Plan("OAM", existing=None if existing is None else 0, asset_bytes=0)
+    for record in records:
+        plan.records += 1
+        if existing is not None and record.id in existing:
+            plan.existing = (plan.existing or 0) + 1
+            continue
+        plan.asset_bytes = (plan.asset_bytes or 0) + record.image_file_size
+    plan.listing_requests = int(
+        METRICS.counter_total(HTTP_REQUESTS, client="oam") - listed
+    )
+    plan.asset_opens = plan.to_create
+    plan.asset_checks = OAM_CHECKED_ASSETS * plan.to_create if check_assets else 0
+    return plan
+
+
+def plan_maxar(
+    collections: Iterable[pystac.Catalog], check_assets: bool = False
+) -> Plan:
+    """Plan the creation of Maxar STAC Items from the Collections of their events.
+
+    STAC Items are counted from the links of the Collections and their children,
+    without reading them. Their IDs and assets are only known once they are read,
+    so neither the STAC Items already in PgSTAC nor the size of their imagery are
+    estimated. Maxar STAC Items are rewritten without opening their imagery.
+    """
+    # One request for event_info.json, then one per Collection or child Catalog
+    plan = Plan("Maxar", listing_requests=1)
+    for collection in collections:
+        catalogs = [collection]
+        while catalogs:
+            catalog = catalogs.pop()
+            plan.listing_requests += 1
+            plan.records += len(catalog.get_links("item"))
+            catalogs.extend(catalog.get_children())
+    plan.record_reads = plan.records
+    plan.asset_checks = None if check_assets else 0
+    return plan
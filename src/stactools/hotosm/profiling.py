@@ -0,0 +1,162 @@
+"""Run profiling and per-item timing to find slow assets and upstream hosts."""
+
+from __future__ import annotations
+
+import cProfile
+import heapq
+import io
+import json
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TypeVar
+
+from stactools.hotosm.metrics import ITEM_STEPS
+
+T = TypeVar("T")
+
+
+@dataclass(order=True)
+class ItemTiming:
+    """Wall time spent creating one STAC Item, broken down by step."""
+
+    total: float
+    item_id: str = field(compare=False)
+    hrefs: list[str] = field(compare=False, default_factory=list)
+    steps: dict[str, float] = field(compare=False, default_factory=dict)
+    error: str | None = field(compare=False, default=None)
+
+    def to_dict(self) -> dict:
+        """Return a JSON serializable representation."""
+        return {
+            "id": self.item_id,
+            "total_seconds": self.total,
+            "steps": self.steps,
+            "hrefs": self.hrefs,
+            "error": self.error,
+        }
+
+
+class SlowItemLog:
+    """Keep the N slowest STAC Items seen, in bounded memory."""
+
+    def __init__(self, top_n: int = 20) -> None:
+        """Create a log keeping the `top_n` slowest items."""
+        self.top_n = top_n
+        self._heap: list[ItemTiming] = []
+        self._lock = threading.Lock()
+
+    def record(self, timing: ItemTiming) -> None:
+        """Record the timing of an item, keeping it only if it is among the slowest."""
+        with self._lock:
+            if len(self._heap) < self.top_n:
+                heapq.heappush(self._heap, timing)
+            elif timing.total > self._heap[0].total:
+                heapq.heapreplace(self._heap, timing)
+
+    def slowest(self) -> list[ItemTiming]:
+        """Return the slowest items recorded, slowest first."""
+        with self._lock:
+            return sorted(self._heap, reverse=True)
+
+    def write(self, path: Path) -> None:
+        """Write the slowest items report as JSON."""
+        path.write_text(
+            json.dumps([timing.to_dict() for timing in self.slowest()], indent=2)
+        )
+
+
+@contextmanager
+def trace_item(
+    log: SlowItemLog, source: Any, fetch_seconds: float = 0.0
+) -> Iterator[ItemTiming]:
+    """Time the creation of a STAC Item from upstream metadata.
+
+    Stages timed with `METRICS.timer` inside this block (e.g., projection reads and
+    validation) are attributed to this item.
+    """
+    item_id, hrefs = _describe_source(source)
+    timing = ItemTiming(
+        total=0.0, item_id=item_id, hrefs=hrefs, steps={"fetch": fetch_seconds}
+    )
+    token = ITEM_STEPS.set(timing.steps)
+    start = time.perf_counter()
+    try:
+        yield timing
+    except Exception as e:
+        timing.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        ITEM_STEPS.reset(token)
+        timing.total = fetch_seconds + time.perf_counter() - start
+        log.record(timing)
+
+
+def timed_iter(iterable: Iterable[T]) -> Iterator[tuple[T, float]]:
+    """Yield each value along with the seconds spent producing it."""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            value = next(iterator)
+        except StopIteration:
+            return
+        yield value, time.perf_counter() - start
+
+
+class RunProfiler:
+    """Capture a cProfile of the whole run along with the slowest items."""
+
+    def __init__(self, directory: Path, log: SlowItemLog) -> None:
+        """Profile into `directory`, reporting the slowest items from `log`."""
+        self.directory = directory
+        self.log = log
+        self._profile = cProfile.Profile()
+
+    def start(self) -> None:
+        """Start profiling."""
+        self._profile.enable()
+
+    def stop(self) -> None:
+        """Stop profiling and write reports.
+
+        Writes,
+            * `hotosm.prof`: cProfile output, e.g. for `snakeviz` or `pstats`
+            * `hotosm-stats.txt`: functions sorted by cumulative time
+            * `slow-items.json`: the slowest items with per-step timings and hrefs
+        """
+        self._profile.disable()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._profile.dump_stats(self.directory / "hotosm.prof")
+
+        out = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=out)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(100)
+        (self.directory / "hotosm-stats.txt").write_text(out.getvalue())
+
+        self.log.write(self.directory / "slow-items.json")
+
+
+def _describe_source(source: Any) -> tuple[str, list[str]]:
+    """Return the ID and asset HREFs of upstream metadata.
+
+    Duck typed to support both `OamMetadata` and Maxar `pystac.Item` records without
+    importing the heavier STAC dependencies here.
+    """
+    item_id = str(getattr(source, "id", source))
+    if assets := getattr(source, "assets", None):
+        hrefs = [asset.get_absolute_href() or asset.href for asset in assets.values()]
+    else:
+        hrefs = [
+            href
+            for attr in ("image_url", "thumbnail_url", "metadata_url")
+            if (href := getattr(source, attr, None))
+        ]
+    return item_id, hrefs
+
+
+# Slowest items of the run, reported when profiling
+SLOW_ITEMS = SlowItemLog()
@@ -0,0 +1,251 @@
+"""Find STAC Items in PgSTAC that were removed upstream, with bounded memory."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import tempfile
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Literal
+
+if TYPE_CHECKING:
+    from pypgstac.db import PgstacDB
+
+logger = logging.getLogger(__name__)
+
+# Number of IDs held in memory before sorted runs are spilled to disk
+DEFAULT_SORT_BUFFER = 500_000
+
+# Number of IDs fetched from PgSTAC per round trip, and deleted per statement
+DEFAULT_BATCH_SIZE = 10_000
+
+Side = Literal["orphan", "missing"]
+
+
+def sorted_ids(
+    ids: Iterable[str],
+    buffer_ids: int = DEFAULT_SORT_BUFFER,
+    spill_dir: Path | None = None,
+    unique: bool = True,
+) -> Iterator[str]:
+    """Yield IDs in sorted order, without duplicates unless `unique` is False.
+
+    IDs are sorted with an external merge sort: up to `buffer_ids` are sorted in
+    memory, and beyond that sorted runs are spilled to temporary files in
+    `spill_dir` and merged, so memory use does not grow with the number of IDs.
+
+    Raises:
+        ValueError: If an ID contains a line feed, which separates the IDs of
+            spilled runs.
+    """
+    buffer: list[str] = []
+    runs: list[Path] = []
+    with tempfile.TemporaryDirectory(prefix="hotosm-ids-", dir=spill_dir) as tmp_dir:
+        for id_ in ids:
+            if "\n" in id_:
+                raise ValueError(f"IDs cannot contain line breaks: {id_!r}")
+            buffer.append(id_)
+            if len(buffer) >= buffer_ids:
+                run = Path(tmp_dir) / f"run-{len(runs):05d}.txt"
+                _write_run(run, buffer)
+                runs.append(run)
+                buffer = []
+        buffer.sort()
+
+        if not runs:
+            yield from _unique(buffer) if unique else buffer
+            return
+
+        logger.info(f"Merging {len(runs) + 1} sorted runs of IDs")
+        with ExitStack() as stack:
+            readers = [
+                _read_run(stack.enter_context(run.open(encoding="utf-8", newline="\n")))
+                for run in runs
+            ]
+            merged = heapq.merge(*readers, buffer)
+            yield from _unique(merged) if unique else merged
+
+
+def _write_run(path: Path, ids: list[str]) -> None:
+    ids.sort()
+    # Only line feeds end lines, so that IDs may contain carriage returns
+    with path.open("w", encoding="utf-8", newline="\n") as dst:
+        for id_ in ids:
+            dst.write(id_ + "\n")
+
+
+def _read_run(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        yield line[:-1]
+
+
+def _unique(ids: Iterable[str]) -> Iterator[str]:
+    for id_, _ in itertools.groupby(ids):
+        yield id_
+
+
+def diff_sorted(
+    upstream: Iterable[str], catalog: Iterable[str]
+) -> Iterator[tuple[Side, str]]:
+    """Merge two sorted ID streams, yielding the IDs that are only in one of them.
+
+    IDs only in `catalog` are "orphan", i.e. removed upstream, and IDs only in
+    `upstream` are "missing" from the catalog. Runs in linear time, holding one ID
+    from each stream in memory.
+
+    Raises:
+        ValueError: If either stream is not sorted.
+    """
+    upstream_ids = _checked(upstream, "upstream")
+    catalog_ids = _checked(catalog, "catalog")
+    up = next(upstream_ids, None)
+    cat = next(catalog_ids, None)
+    while up is not None and cat is not None:
+        if up == cat:
+            up = next(upstream_ids, None)
+            cat = next(catalog_ids, None)
+        elif up < cat:
+            yield "missing", up
+            up = next(upstream_ids, None)
+        else:
+            yield "orphan", cat
+            cat = next(catalog_ids, None)
+    while up is not None:
+        yield "missing", up
+        up = next(upstream_ids, None)
+    while cat is not None:
+        yield "orphan", cat
+        cat = next(catalog_ids, None)
+
+
+def _checked(ids: Iterable[str], name: str) -> Iterator[str]:
+    previous: str | None = None
+    for id_ in ids:
+        if previous is not None and id_ <= previous:
+            if id_ == previous:
+                continue
+            raise ValueError(f"The {name} IDs are not sorted: {id_!r} < {previous!r}")
+        previous = id_
+        yield id_
+
+
+def iter_pgstac_ids(
+    db: PgstacDB, collection_id: str, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[str]:
+    """Yield the IDs of the STAC Items of a Collection in PgSTAC, sorted.
+
+    IDs are streamed from a server-side cursor, `batch_size` at a time, and sorted
+    by the database in byte order, which matches the order of Python strings.
+    """
+    conn = db.connect()
+    with conn.transaction():
+        with conn.cursor(name="hotosm_reconcile_ids") as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(
+                'SELECT id FROM items WHERE collection = %s ORDER BY id COLLATE "C"',
+                (collection_id,),
+            )
+            for (id_,) in cursor:
+                yield id_
+
+
+def delete_items(
+    db: PgstacDB,
+    collection_id: str,
+    ids: Iterable[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Delete STAC Items of a Collection from PgSTAC in batches.
+
+    Each batch is deleted in its own transaction. Returns the number of STAC Items
+    deleted.
+    """
+    conn = db.connect()
+    deleted = 0
+    ids = iter(ids)
+    while batch := list(itertools.islice(ids, batch_size)):
+        with conn.transaction():
+            cursor = conn.execute(
+                "DELETE FROM items WHERE collection = %s AND id = ANY(%s)",
+                (collection_id, batch),
+            )
+            deleted += cursor.rowcount
+        logger.info(f"Deleted {deleted} STAC Items from {collection_id}")
+    return deleted
+
+
+@dataclass
+class ReconcileResult:
+    """Differences between the upstream catalog and PgSTAC.
+
+    Attributes:
+        upstream: Number of unique IDs in the upstream catalog.
+        catalog: Number of STAC Items in PgSTAC.
+        orphans: Number of STAC Items in PgSTAC that were removed upstream.
+        missing: Number of upstream records that are not in PgSTAC.
+    """
+
+    upstream: int = 0
+    catalog: int = 0
+    orphans: int = 0
+    missing: int = 0
+
+
+def reconcile(
+    upstream: Iterable[str],
+    catalog: Iterable[str],
+    orphans_file: Path | None = None,
+    missing_file: Path | None = None,
+    buffer_ids: int = DEFAULT_SORT_BUFFER,
+    spill_dir: Path | None = None,
+) -> ReconcileResult:
+    """Diff upstream IDs, in any order, against sorted PgSTAC IDs.
+
+    Upstream IDs are sorted with `sorted_ids` before the merge. IDs of orphaned
+    STAC Items are written to `orphans_file`, one per line, and IDs missing from
+    PgSTAC to `missing_file`, if they are provided.
+    """
+    result = ReconcileResult()
+
+    def counted_upstream() -> Iterator[str]:
+        for id_ in sorted_ids(upstream, buffer_ids, spill_dir):
+            result.upstream += 1
+            yield id_
+
+    def counted_catalog() -> Iterator[str]:
+        for id_ in catalog:
+            result.catalog += 1
+            yield id_
+
+    with ExitStack() as stack:
+        orphans = (
+            stack.enter_context(orphans_file.open("w"))
+            if orphans_file is not None
+            else None
+        )
+        missing = (
+            stack.enter_context(missing_file.open("w"))
+            if missing_file is not None
+            else None
+        )
+        for side, id_ in diff_sorted(counted_upstream(), counted_catalog()):
+            if side == "orphan":
+                result.orphans += 1
+                if orphans is not None:
+                    orphans.write(id_ + "\n")
+            else:
+                result.missing += 1
+                if missing is not None:
+                    missing.write(id_ + "\n")
+    return result
+
+
+def read_ids(path: Path) -> Iterator[str]:
+    """Read IDs written one per line by `reconcile`."""
+    with path.open() as src:
+        for line in src:
+            if line := line.rstrip("\n"):
+                yield line
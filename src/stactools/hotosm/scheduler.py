@@ -0,0 +1,104 @@
+"""Run several producers of STAC Items concurrently, consuming them in one place."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Mapping, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Values produced ahead of the consumer, per producer
+DEFAULT_BUFFER_PER_PRODUCER = 1_000
+
+# Seconds between checks for a stopped consumer while a producer waits on the queue
+_POLL_SECONDS = 0.1
+
+
+@dataclass(frozen=True)
+class _Done:
+    name: str
+    error: BaseException | None = None
+
+
+class ProducerError(RuntimeError):
+    """Raised by `merge_producers` when a producer fails."""
+
+    def __init__(self, name: str, error: BaseException) -> None:
+        """Wrap the error of the named producer."""
+        super().__init__(f"{name} failed: {type(error).__name__}: {error}")
+        self.name = name
+        self.error = error
+
+
+def merge_producers(
+    producers: Mapping[str, Callable[[], Iterable[T]]],
+    buffer_per_producer: int = DEFAULT_BUFFER_PER_PRODUCER,
+) -> Iterator[T]:
+    """Run producers on their own threads, yielding their values as they arrive.
+
+    Each producer is a callable returning an iterable, called on its thread so that
+    any setup, e.g. fetching upstream metadata, also runs concurrently. Values are
+    passed through a bounded queue, so producers pause when the consumer falls
+    behind rather than holding their output in memory.
+
+    If a producer fails, the others are stopped, values still in the queue are
+    dropped and `ProducerError` is raised. The producers are also stopped if the
+    consumer stops iterating early.
+    """
+    channel: queue.Queue[T | _Done] = queue.Queue(
+        maxsize=buffer_per_producer * max(len(producers), 1)
+    )
+    stop = threading.Event()
+
+    def put(value: T | _Done) -> bool:
+        while not stop.is_set():
+            try:
+                channel.put(value, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(name: str, producer: Callable[[], Iterable[T]]) -> None:
+        try:
+            for value in producer():
+                if not put(value):
+                    return
+        except BaseException as e:
+            logger.exception(f"{name} failed")
+            put(_Done(name, e))
+        else:
+            put(_Done(name))
+
+    threads = [
+        threading.Thread(
+            target=run, args=(name, producer), name=f"hotosm-{name}", daemon=True
+        )
+        for name, producer in producers.items()
+    ]
+    for thread in threads:
+        thread.start()
+
+    failure: ProducerError | None = None
+    running = len(threads)
+    try:
+        while running:
+            value = channel.get()
+            if isinstance(value, _Done):
+                running -= 1
+                if value.error is not None:
+                    failure = ProducerError(value.name, value.error)
+                    break
+                continue
+            yield value
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    if failure is not None:
+        raise failure from failure.error
@@ -0,0 +1,106 @@
+"""Fast JSON serialization of STAC Items and Collections.
+
+STAC Items are serialized with [orjson](https://github.com/ijl/orjson) when it is
+installed (it is a dependency of `pypgstac`), falling back to the C accelerated
+`json.dumps` from the standard library otherwise. Both write compact JSON without
+escaping non-ASCII characters, so their output is the same bytes except for:
+
+- Floats written in scientific notation, which the standard library formats with
+  `repr`, e.g. `1e-07` where orjson writes `1e-7`, and `1e-05` where orjson
+  writes `0.00001`. Both parse to the same floats.
+- NaN and infinite floats, which are not valid JSON: the standard library raises
+  a `ValueError`, while orjson writes `null`.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable
+
+# Environment variable selecting a serializer by name, e.g. to compare them
+SERIALIZER_ENV = "HOTOSM_JSON_SERIALIZER"
+
+
+@dataclass(frozen=True)
+class JsonSerializer:
+    """Functions serializing to and parsing from JSON."""
+
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes | str], Any]
+
+    def dumps_str(self, obj: Any) -> str:
+        """Serialize to a JSON string."""
+        return self.dumps(obj).decode()
+
+
+STDLIB_SERIALIZER = JsonSerializer(
+    name="json",
+    dumps=lambda obj: json.dumps(
+        obj, separators=(",", ":"), ensure_ascii=False, allow_nan=False
+    ).encode(),
+    loads=json.loads,
+)
+
+
+def _orjson_serializer() -> JsonSerializer | None:
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return JsonSerializer(name="orjson", dumps=orjson.dumps, loads=orjson.loads)
+
+
+def available_serializers() -> dict[str, JsonSerializer]:
+    """Serializers that can be used, by name."""
+    serializers = {STDLIB_SERIALIZER.name: STDLIB_SERIALIZER}
+    if (orjson_serializer := _orjson_serializer()) is not None:
+        serializers[orjson_serializer.name] = orjson_serializer
+    return serializers
+
+
+def get_serializer(name: str | None = None) -> JsonSerializer:
+    """Get a serializer by name, defaulting to the fastest available.
+
+    Raises:
+        ValueError: If the serializer is not available.
+    """
+    serializers = available_serializers()
+    if name is None:
+        return serializers.get("orjson", STDLIB_SERIALIZER)
+    if name not in serializers:
+        raise ValueError(f"JSON serializer {name} is not available")
+    return serializers[name]
+
+
+# NOTE: The environment variable is read by the `--json-serializer` option, which
+# reports unknown serializers
+_serializer = get_serializer()
+
+
+def use_serializer(name: str | None) -> JsonSerializer:
+    """Set the serializer used by `dumps` and `loads`, returning it."""
+    global _serializer
+    _serializer = get_serializer(name)
+    return _serializer
+
+
+def current_serializer() -> JsonSerializer:
+    """Serializer used by `dumps` and `loads`."""
+    return _serializer
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes with the current serializer."""
+    return _serializer.dumps(obj)
+
+
+def dumps_str(obj: Any) -> str:
+    """Serialize to a JSON string with the current serializer."""
+    return _serializer.dumps_str(obj)
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON with the current serializer."""
+    return _serializer.loads(data)
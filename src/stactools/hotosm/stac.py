@@ -2,7 +2,6 @@
 
 import datetime as dt
 
-import rasterio
 from pystac import (
     Asset,
     Collection,
@@ -24,6 +23,11 @@ from pystac.utils import datetime_to_str
 from rasterio.errors import RasterioIOError
 from rio_stac.stac import get_projection_info
 
+from stactools.hotosm.asset_reads import (
+    DEFAULT_ASSET_READ_OPTIONS,
+    AssetReadOptions,
+    read_asset,
+)
 from stactools.hotosm.constants import (
     COLLECTION_DESCRIPTION,
     COLLECTION_ID,
@@ -32,6 +36,8 @@ from stactools.hotosm.constants import (
     OAM_EXTENSION_SCHEMA_URI_PATTERN,
 )
 from stactools.hotosm.exceptions import AssetNotFoundError
+from stactools.hotosm.geometry import GeometryOptions, optimize_geometry
+from stactools.hotosm.metrics import METRICS
 from stactools.hotosm.oam_metadata import OamMetadata
 from stactools.hotosm.stac_common import add_alternate_assets
 
@@ -102,17 +108,25 @@ def create_collection() -> Collection:
     return collection
 
 
-def create_item(oam_metadata: OamMetadata) -> Item:
+def create_item(
+    oam_metadata: OamMetadata,
+    geometry_options: GeometryOptions | None = None,
+    read_options: AssetReadOptions = DEFAULT_ASSET_READ_OPTIONS,
+) -> Item:
     """Create a STAC Item for an OAM image.
 
     Args:
         oam_metadata: OpenAerialMap metadata describing a cataloged image.
+        geometry_options: Options for simplifying and quantizing the Item geometry,
+            in which case the bbox is recomputed from the result.
+        read_options: Deadlines, retries and hedging for reading the imagery asset.
 
     Returns:
         STAC Item describing the cataloged image.
 
     Raises:
         AssetNotFoundError: If an imagery asset does not exist.
+        AssetTimeoutError: If reading an imagery asset exceeds its deadline.
     """
     if oam_metadata.acquisition_start == oam_metadata.acquisition_end:
         datetime = oam_metadata.acquisition_start
@@ -124,10 +138,16 @@ def create_item(oam_metadata: OamMetadata) -> Item:
             "end_datetime": datetime_to_str(oam_metadata.acquisition_end),
         }
 
+    geometry, bbox = oam_metadata.geojson, oam_metadata.bbox
+    if geometry_options is not None and geometry_options.enabled:
+        geometry, bbox = optimize_geometry(
+            geometry, geometry_options, collection=COLLECTION_ID
+        )
+
     item = Item(
         id=oam_metadata.id,
-        geometry=oam_metadata.geojson,
-        bbox=oam_metadata.bbox,
+        geometry=geometry,
+        bbox=bbox,
         datetime=datetime,
         properties={
             "title": oam_metadata.title,
@@ -191,19 +211,24 @@ def create_item(oam_metadata: OamMetadata) -> Item:
         ),
     )
 
-    _add_projection_extension(item, ["visual"])
+    _add_projection_extension(item, ["visual"], read_options)
     add_alternate_assets(item)
 
     item.stac_extensions.append(
         OAM_EXTENSION_SCHEMA_URI_PATTERN.format(version=OAM_EXTENSION_DEFAULT_VERSION)
     )
 
-    item.validate()
+    with METRICS.timer("validation"):
+        item.validate()
 
     return item
 
 
-def _add_projection_extension(item: Item, asset_keys: list[str]):
+def _add_projection_extension(
+    item: Item,
+    asset_keys: list[str],
+    read_options: AssetReadOptions = DEFAULT_ASSET_READ_OPTIONS,
+):
     """Modify Item in place by adding projection extension for assets."""
     item.ext.add("proj")
     for asset_key in asset_keys:
@@ -211,8 +236,8 @@ def _add_projection_extension(item: Item, asset_keys: list[str]):
 
         href = item.assets[asset_key].href
         try:
-            with rasterio.open(href) as src:
-                proj_info = get_projection_info(src)
+            with METRICS.timer("projection"):
+                proj_info = read_asset(href, get_projection_info, read_options)
         except RasterioIOError as e:
             raise AssetNotFoundError(f"Asset does not exist at {href}") from e
         ext.apply(**proj_info)
@@ -0,0 +1,281 @@
+"""Validate dumped STAC Items offline, over a pool of processes."""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from stactools.hotosm.constants import (
+    OAM_EXTENSION_DEFAULT_VERSION,
+    OAM_EXTENSION_SCHEMA_URI_PATTERN,
+)
+from stactools.hotosm.load import LoadTask
+
+if TYPE_CHECKING:
+    from jsonschema.protocols import Validator
+
+OAM_EXTENSION_SCHEMA_URI = OAM_EXTENSION_SCHEMA_URI_PATTERN.format(
+    version=OAM_EXTENSION_DEFAULT_VERSION
+)
+CORE_SCHEMA_URI_PATTERN = (
+    "https://schemas.stacspec.org/v{version}/item-spec/json-schema/item.json"
+)
+
+# Schemas shipped with this package, by URI. The OAM extension schema is a copy of
+# `stac-extension/json-schema/schema.json`.
+BUNDLED_SCHEMAS = {
+    OAM_EXTENSION_SCHEMA_URI: Path(__file__).parent
+    / "schemas"
+    / "oam"
+    / f"v{OAM_EXTENSION_DEFAULT_VERSION}"
+    / "schema.json",
+}
+
+# Errors reported for each schema a STAC Item fails, beyond which they are counted
+MAX_ERRORS_PER_SCHEMA = 1
+
+
+@dataclass(frozen=True)
+class ValidationFailure:
+    """A STAC Item that failed validation.
+
+    Attributes:
+        id: ID of the STAC Item, or its position in the dump if it has none.
+        source: Dump file, shard or byte range holding the STAC Item.
+        errors: One line summary of each failed schema or invariant.
+    """
+
+    id: str
+    source: str
+    errors: tuple[str, ...]
+
+    def __str__(self) -> str:
+        """Summarize the failure in one line."""
+        return f"{self.id}: {'; '.join(self.errors)}"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to a JSON compatible dictionary."""
+        return {"id": self.id, "source": self.source, "errors": list(self.errors)}
+
+
+@dataclass
+class ValidationReport:
+    """Outcome of validating part or all of a dump.
+
+    Attributes:
+        count: Number of STAC Items validated.
+        failures: STAC Items that failed validation.
+        unchecked: Schemas that are not available offline, with the number of STAC
+            Items that declare them.
+        errors: Dump files, shards or byte ranges that could not be read.
+        seconds: Wall clock time spent validating.
+    """
+
+    count: int = 0
+    failures: list[ValidationFailure] = field(default_factory=list)
+    unchecked: Counter[str] = field(default_factory=Counter)
+    errors: dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Whether every STAC Item could be read and is valid."""
+        return not self.failures and not self.errors
+
+    @property
+    def items_per_second(self) -> float:
+        """Validation throughput."""
+        return self.count / self.seconds if self.seconds else 0.0
+
+    def merge(self, other: ValidationReport) -> None:
+        """Add the outcome of validating another part of a dump."""
+        self.count += other.count
+        self.failures.extend(other.failures)
+        self.unchecked.update(other.unchecked)
+        self.errors.update(other.errors)
+
+
+def load_schemas(schema_dir: Path | None = None) -> dict[str, dict]:
+    """Load the JSON schemas available offline, by URI.
+
+    These are the STAC core schemas bundled with PySTAC, the schemas bundled with
+    this package and any JSON schemas in `schema_dir`, which are registered by
+    their `$id`.
+    """
+    from pystac.validation.local_validator import get_local_schema_cache
+
+    schemas = get_local_schema_cache()
+    for uri, path in BUNDLED_SCHEMAS.items():
+        schemas[uri] = json.loads(path.read_text())
+    if schema_dir is not None:
+        for path in sorted(schema_dir.glob("**/*.json")):
+            schema = json.loads(path.read_text())
+            if isinstance(schema, dict) and "$id" in schema:
+                schemas[schema["$id"].rstrip("#")] = schema
+    return schemas
+
+
+def check_oam_invariants(item: dict) -> list[str]:
+    """Check a STAC Item against invariants of the OAM catalog.
+
+    These go beyond what the OAM extension schema requires, e.g. a positive `gsd`
+    and a non-empty producer name.
+    """
+    errors = []
+    properties = item.get("properties") or {}
+    if not item.get("collection"):
+        errors.append("collection: required to load into PgSTAC")
+    if OAM_EXTENSION_SCHEMA_URI not in item.get("stac_extensions", []):
+        errors.append(f"stac_extensions: missing {OAM_EXTENSION_SCHEMA_URI}")
+    gsd = properties.get("gsd")
+    if isinstance(gsd, bool) or not isinstance(gsd, int | float) or gsd <= 0:
+        errors.append(f"properties/gsd: expected a positive number, got {gsd!r}")
+    for key in ("oam:producer_name", "oam:platform_type"):
+        if not properties.get(key):
+            errors.append(f"properties/{key}: required")
+    if item.get("geometry") is None:
+        errors.append("geometry: required")
+    bbox = item.get("bbox")
+    if not isinstance(bbox, list) or len(bbox) not in (4, 6):
+        errors.append("bbox: expected 4 or 6 coordinates")
+    else:
+        half = len(bbox) // 2
+        # Longitudes are not compared since a bbox may cross the antimeridian
+        if any(bbox[i] > bbox[i + half] for i in range(1, half)):
+            errors.append("bbox: minimum above maximum")
+    if "visual" not in (item.get("assets") or {}):
+        errors.append("assets/visual: required")
+    return errors
+
+
+class ItemValidator:
+    """Validate STAC Items against offline schemas and OAM invariants."""
+
+    def __init__(self, schema_dir: Path | None = None) -> None:
+        """Load the schemas available offline."""
+        from referencing import Registry
+        from referencing.jsonschema import DRAFT7
+
+        self.schemas = load_schemas(schema_dir)
+        self.registry: Registry = Registry().with_resources(
+            (uri, DRAFT7.create_resource(schema))
+            for uri, schema in self.schemas.items()
+        )
+        self._validators: dict[str, Validator] = {}
+
+    def validator(self, uri: str) -> Validator | None:
+        """Validator for the schema at a URI, if it is available offline."""
+        if uri not in self._validators:
+            schema = self.schemas.get(uri)
+            if schema is None:
+                return None
+            from jsonschema import Draft7Validator
+            from jsonschema.validators import validator_for
+
+            cls = validator_for(schema, default=Draft7Validator)
+            self._validators[uri] = cls(schema, registry=self.registry)
+        return self._validators[uri]
+
+    def validate(self, item: dict) -> tuple[list[str], list[str]]:
+        """Validate a STAC Item.
+
+        Returns:
+            One line summaries of the errors, and the URIs of the schemas declared
+            by the STAC Item that are not available offline.
+        """
+        from jsonschema.exceptions import best_match
+
+        errors: list[str] = []
+        unchecked: list[str] = []
+        # NOTE: Dumped STAC Items carry a Collection ID for `pypgstac load items`
+        # without the link to the Collection that the core schema then requires.
+        # PgSTAC adds the link when serving them, so validate them without the ID.
+        stac_item = item
+        links = item.get("links")
+        if "collection" in item and not (
+            isinstance(links, list)
+            and any(
+                isinstance(link, dict) and link.get("rel") == "collection"
+                for link in links
+            )
+        ):
+            stac_item = {
+                key: value for key, value in item.items() if key != "collection"
+            }
+
+        core = CORE_SCHEMA_URI_PATTERN.format(version=item.get("stac_version"))
+        for uri in [core, *item.get("stac_extensions", [])]:
+            validator = self.validator(uri)
+            if validator is None:
+                unchecked.append(uri)
+                continue
+            schema_errors = list(validator.iter_errors(stac_item))
+            if schema_errors:
+                error = best_match(schema_errors)
+                path = "/".join(str(part) for part in error.absolute_path) or "$"
+                label = "core" if uri == core else uri
+                more = len(schema_errors) - MAX_ERRORS_PER_SCHEMA
+                summary = f"[{label}] {path}: {error.message}"
+                errors.append(summary + (f" (+{more} more)" if more > 0 else ""))
+        errors.extend(check_oam_invariants(item))
+        return errors, unchecked
+
+
+@cache
+def _item_validator(schema_dir: Path | None) -> ItemValidator:
+    # Built once per worker process
+    return ItemValidator(schema_dir)
+
+
+def validate_task(task: LoadTask, schema_dir: Path | None = None) -> ValidationReport:
+    """Validate the STAC Items in part of a dump."""
+    validator = _item_validator(schema_dir)
+    report = ValidationReport()
+    start = time.perf_counter()
+    try:
+        task.verify()
+        for position, item in enumerate(task.read()):
+            report.count += 1
+            errors, unchecked = validator.validate(item)
+            report.unchecked.update(unchecked)
+            if errors:
+                item_id = item.get("id") or f"#{position}"
+                report.failures.append(
+                    ValidationFailure(str(item_id), task.key, tuple(errors))
+                )
+    except Exception as e:
+        report.errors[task.key] = f"{type(e).__name__}: {e}"
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def validate_tasks(
+    tasks: list[LoadTask],
+    workers: int,
+    schema_dir: Path | None = None,
+    progress: Callable[[LoadTask, ValidationReport], None] | None = None,
+) -> ValidationReport:
+    """Validate parts of dumps over a pool of `workers` processes.
+
+    Validation is CPU bound, so processes rather than threads let it scale with
+    the number of cores. Each process loads the schemas once.
+    """
+    report = ValidationReport()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(validate_task, task, schema_dir): task for task in tasks
+        }
+        for future in as_completed(futures):
+            task_report = future.result()
+            report.merge(task_report)
+            if progress is not None:
+                progress(futures[future], task_report)
+    report.seconds = time.perf_counter() - start
+    return report
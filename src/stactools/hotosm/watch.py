@@ -0,0 +1,124 @@
+"""Long running polling of upstream catalogs for new imagery."""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import random
+import signal
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import FrameType
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Watermark:
+    """Upload time after which upstream records still need to be ingested.
+
+    The watermark is optionally persisted to a file so that a restarted watcher
+    resumes from where the previous one stopped instead of re-reading a window.
+    """
+
+    value: dt.datetime
+    path: Path | None = None
+
+    @classmethod
+    def load(cls, default: dt.datetime, path: Path | None = None) -> Watermark:
+        """Load the watermark from a file, falling back to a default."""
+        if path is not None and path.exists():
+            value = dt.datetime.fromisoformat(path.read_text().strip())
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=dt.UTC)
+            return cls(value=value, path=path)
+        return cls(value=default, path=path)
+
+    def advance(self, polled_at: dt.datetime, overlap: dt.timedelta) -> None:
+        """Move the watermark to the start of a successful poll, minus some overlap.
+
+        Records uploaded while a poll is running can be missed by it, so the next
+        window starts before the previous poll began. Upserting into PgSTAC makes
+        the overlap harmless.
+        """
+        self.value = max(self.value, polled_at - overlap)
+        if self.path is not None:
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(self.value.isoformat())
+            tmp.replace(self.path)
+
+
+def jittered(interval: float, jitter: float, rng: random.Random | None = None) -> float:
+    """Randomize an interval by up to +/- `jitter` fraction of its length.
+
+    Jitter avoids many watchers (or a watcher and a cron job) hitting the upstream
+    API in lockstep.
+    """
+    rng = rng or random.Random()
+    return max(0.0, interval * (1 + rng.uniform(-jitter, jitter)))
+
+
+def install_signal_handlers(stop: threading.Event) -> None:
+    """Request a graceful stop on SIGINT/SIGTERM.
+
+    The first signal lets the poll in progress finish before exiting. A second
+    signal interrupts immediately.
+    """
+
+    def handler(signum: int, _frame: FrameType | None) -> None:
+        if stop.is_set():
+            raise KeyboardInterrupt
+        logger.warning(
+            f"Received {signal.Signals(signum).name}, stopping after current poll"
+        )
+        stop.set()
+
+    signal.signal(signal.SIGINT, handler)
+    signal.signal(signal.SIGTERM, handler)
+
+
+def run_watch(
+    poll: Callable[[dt.datetime], None],
+    watermark: Watermark,
+    interval: float,
+    jitter: float,
+    overlap: dt.timedelta,
+    stop: threading.Event,
+    max_polls: int | None = None,
+) -> int:
+    """Repeatedly poll for records uploaded after the watermark until stopped.
+
+    Args:
+        poll: Callable that ingests everything uploaded after the datetime given.
+        watermark: Where to start polling from. Advanced after each successful poll.
+        interval: Seconds to wait between the start of consecutive polls.
+        jitter: Fraction of `interval` to randomize each wait by.
+        overlap: Overlap between consecutive polling windows.
+        stop: Event that ends the loop once set.
+        max_polls: Stop after this many polls. Runs until stopped if not provided.
+
+    Returns:
+        Number of polls run.
+    """
+    polls = 0
+    while not stop.is_set():
+        polled_at = dt.datetime.now(tz=dt.UTC)
+        try:
+            poll(watermark.value)
+        except Exception:
+            # Keep the watermark where it was so that the next poll retries the
+            # window that failed.
+            logger.exception(f"Poll for items uploaded after {watermark.value} failed")
+        else:
+            watermark.advance(polled_at, overlap)
+
+        polls += 1
+        if max_polls is not None and polls >= max_polls:
+            break
+
+        elapsed = (dt.datetime.now(tz=dt.UTC) - polled_at).total_seconds()
+        stop.wait(max(0.0, jittered(interval, jitter) - elapsed))
+
+    return polls
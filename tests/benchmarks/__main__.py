@@ -0,0 +1,102 @@
+"""Run the ingest benchmarks and save results as JSON.
+
+Run from the repository root,
+
+    python -m tests.benchmarks --size 1000 --size 10000 --output results.json
+"""
+
+import datetime as dt
+import json
+import platform
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import click
+
+from stactools.hotosm import __version__
+
+from .suite import BENCHMARKS, run_benchmark
+
+
+@click.command()
+@click.option(
+    "--size",
+    "sizes",
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=[1000, 10000],
+    show_default=True,
+    help="Number of items to benchmark with. May be repeated.",
+)
+@click.option(
+    "--benchmark",
+    "names",
+    type=click.Choice(list(BENCHMARKS)),
+    multiple=True,
+    help="Only run these benchmarks. May be repeated. Defaults to all.",
+)
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Number of timed runs of each benchmark. The best run is reported.",
+)
+@click.option(
+    "--output",
+    type=click.Path(writable=True, path_type=Path),
+    help="Save results to this JSON file.",
+)
+@click.option(
+    "--compare",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Compare results against a previously saved JSON file.",
+)
+def main(
+    sizes: tuple[int, ...],
+    names: tuple[str, ...],
+    repeat: int,
+    output: Path | None,
+    compare: Path | None,
+) -> None:
+    """Benchmark STAC Item creation throughput with synthetic inputs."""
+    baseline = {}
+    if compare is not None:
+        for result in json.loads(compare.read_text())["results"]:
+            baseline[(result["benchmark"], result["n"])] = result["best_seconds"]
+
+    results = []
+    with TemporaryDirectory() as tmp_dir:
+        for name in names or BENCHMARKS:
+            for n in sizes:
+                workdir = Path(tmp_dir) / f"{name}-{n}"
+                result = run_benchmark(name, n, workdir, repeat)
+                results.append(result)
+
+                line = (
+                    f"{name:<20} n={n:<7} {result['best_seconds']:>9.3f}s "
+                    f"{result['items_per_second']:>12.1f} items/s"
+                )
+                if (previous := baseline.get((name, n))) is not None:
+                    line += f" ({result['best_seconds'] / previous:.2f}x baseline)"
+                click.echo(line)
+
+    if output is not None:
+        output.write_text(
+            json.dumps(
+                {
+                    "created": dt.datetime.now(tz=dt.UTC).isoformat(),
+                    "version": __version__,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "repeat": repeat,
+                    "results": results,
+                },
+                indent=2,
+            )
+        )
+        click.echo(f"Saved results to {output}")
+
+
+if __name__ == "__main__":
+    main()
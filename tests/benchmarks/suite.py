@@ -0,0 +1,204 @@
+"""Benchmarks of the ingest hot paths.
+
+Each benchmark is a setup function that builds its synthetic inputs for `n` items
+inside a working directory and returns the function to time.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import datetime as dt
+import gc
+import io
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+import pystac
+from pystac.validation import RegisteredValidator
+
+from stactools.hotosm.cli import (
+    get_maxar_items_after,
+    get_oam_items_after,
+    sync_handler,
+)
+from stactools.hotosm.dump import dump_to_ndjson
+from stactools.hotosm.maxar.stac import create_item as create_maxar_item
+from stactools.hotosm.oam_metadata_client import OamMetadataClient
+from stactools.hotosm.serialize import get_serializer
+from stactools.hotosm.stac import create_item as create_oam_item
+
+from .synthetic import (
+    EPOCH,
+    MaxarMirrorSession,
+    MaxarMirrorStacIO,
+    SyntheticOamSession,
+    oam_api_results,
+    offline_validator,
+    write_cogs,
+    write_maxar_catalog,
+)
+
+API_ROOT = "https://api.openaerialmap.test/meta"
+# Page size used by `OamMetadataClient.get_all_items`
+OAM_PAGE_LIMIT = 500
+
+Benchmark = Callable[[int, Path], Callable[[], object]]
+
+
+def _oam_client(n: int, workdir: Path) -> OamMetadataClient:
+    session = SyntheticOamSession(
+        API_ROOT, oam_api_results(n, write_cogs(workdir / "cogs"))
+    )
+    session.warm(OAM_PAGE_LIMIT)
+    return OamMetadataClient.new(session=session, api_root=API_ROOT)
+
+
+def _maxar_sources(
+    n: int, workdir: Path
+) -> tuple[MaxarMirrorStacIO, MaxarMirrorSession]:
+    event_info = write_maxar_catalog(workdir / "maxar", n)
+    return MaxarMirrorStacIO(workdir / "maxar"), MaxarMirrorSession(event_info)
+
+
+def _oam_items(n: int, workdir: Path) -> list[pystac.Item]:
+    """Create OAM STAC Items, reusing up to 1000 unique Items to bound setup time."""
+    client = _oam_client(min(n, 1000), workdir)
+    unique = [create_oam_item(m) for m in get_oam_items_after(client, EPOCH)]
+    return [unique[i % len(unique)].clone() for i in range(n)]
+
+
+def bench_oam_parse_result(n: int, workdir: Path) -> Callable[[], object]:
+    """Parse OAM metadata API results."""
+    client = _oam_client(n, workdir)
+    results = client.session.results  # type: ignore[attr-defined]
+    return lambda: [client._parse_result(result) for result in results]
+
+
+def bench_oam_sanitize(n: int, workdir: Path) -> Callable[[], object]:
+    """Sanitize parsed OAM metadata."""
+    client = _oam_client(n, workdir)
+    results = client.session.results  # type: ignore[attr-defined]
+
+    def run() -> object:
+        # Parsing is not timed, but sanitizing modifies metadata in place
+        metadata = [client._parse_result(result) for result in results]
+        start = time.perf_counter()
+        for oam_metadata in metadata:
+            oam_metadata.sanitize()
+        return time.perf_counter() - start
+
+    return run
+
+
+def bench_oam_create_item(n: int, workdir: Path) -> Callable[[], object]:
+    """Create OAM STAC Items from sanitized metadata and local COGs."""
+    client = _oam_client(n, workdir)
+    metadata = list(get_oam_items_after(client, EPOCH))
+    return lambda: [create_oam_item(oam_metadata) for oam_metadata in metadata]
+
+
+def bench_maxar_create_item(n: int, workdir: Path) -> Callable[[], object]:
+    """Rewrite Maxar STAC Items read from a local static catalog."""
+    stac_io, session = _maxar_sources(n, workdir)
+    items = list(get_maxar_items_after(stac_io, session, EPOCH))
+    return lambda: [create_maxar_item(item) for item in items]
+
+
+def bench_validate(n: int, workdir: Path) -> Callable[[], object]:
+    """Validate OAM STAC Items against core and extension schemas."""
+    items = _oam_items(n, workdir)
+    return lambda: [item.validate() for item in items]
+
+
+def bench_ndjson_dump(n: int, workdir: Path) -> Callable[[], object]:
+    """Serialize OAM STAC Items to NDJSON."""
+    items = [item.to_dict() for item in _oam_items(n, workdir)]
+    return partial(dump_to_ndjson, workdir / "items.ndjson", items)
+
+
+def _bench_serialize(serializer: str, n: int, workdir: Path) -> Callable[[], object]:
+    items = [item.to_dict() for item in _oam_items(n, workdir)]
+    dumps = get_serializer(serializer).dumps
+    return lambda: [dumps(item) for item in items]
+
+
+def bench_serialize_json(n: int, workdir: Path) -> Callable[[], object]:
+    """Serialize OAM STAC Items with the standard library `json.dumps`."""
+    return _bench_serialize("json", n, workdir)
+
+
+def bench_serialize_orjson(n: int, workdir: Path) -> Callable[[], object]:
+    """Serialize OAM STAC Items with orjson."""
+    return _bench_serialize("orjson", n, workdir)
+
+
+def bench_sync_handler_oam(n: int, workdir: Path) -> Callable[[], object]:
+    """Sync OAM STAC Items end to end, from API pages to Item dictionaries."""
+    client = _oam_client(n, workdir)
+    return partial(
+        sync_handler,
+        collection_id="openaerialmap",
+        raw_metadata_creator=partial(get_oam_items_after, client),
+        stac_item_creator=create_oam_item,
+        uploaded_after=EPOCH,
+        handle_exceptions="RAISE",
+    )
+
+
+def bench_sync_handler_maxar(n: int, workdir: Path) -> Callable[[], object]:
+    """Sync Maxar STAC Items end to end, from the event listing to dictionaries."""
+    stac_io, session = _maxar_sources(n, workdir)
+    return partial(
+        sync_handler,
+        collection_id="maxar-opendata",
+        raw_metadata_creator=partial(get_maxar_items_after, stac_io, session),
+        stac_item_creator=create_maxar_item,
+        uploaded_after=EPOCH - dt.timedelta(days=1),
+        handle_exceptions="RAISE",
+    )
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "oam_parse_result": bench_oam_parse_result,
+    "oam_sanitize": bench_oam_sanitize,
+    "oam_create_item": bench_oam_create_item,
+    "maxar_create_item": bench_maxar_create_item,
+    "validate": bench_validate,
+    "ndjson_dump": bench_ndjson_dump,
+    "serialize_json": bench_serialize_json,
+    "serialize_orjson": bench_serialize_orjson,
+    "sync_handler_oam": bench_sync_handler_oam,
+    "sync_handler_maxar": bench_sync_handler_maxar,
+}
+
+
+def run_benchmark(name: str, n: int, workdir: Path, repeat: int) -> dict:
+    """Run one benchmark `repeat` times, returning timings of each run."""
+    workdir.mkdir(parents=True, exist_ok=True)
+    validator = RegisteredValidator.get_validator()
+    RegisteredValidator.set_validator(offline_validator())
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func = BENCHMARKS[name](n, workdir)
+            runs = []
+            for _ in range(repeat):
+                gc.collect()
+                start = time.perf_counter()
+                result = func()
+                elapsed = time.perf_counter() - start
+                # Benchmarks that exclude part of their work return their own timing
+                runs.append(result if isinstance(result, float) else elapsed)
+    finally:
+        RegisteredValidator.set_validator(validator)
+
+    best = min(runs)
+    return {
+        "benchmark": name,
+        "n": n,
+        "runs": runs,
+        "best_seconds": best,
+        "items_per_second": n / best if best else None,
+    }
@@ -0,0 +1,256 @@
+"""Generate synthetic, offline inputs for the ingest benchmarks."""
+
+from __future__ import annotations
+
+import copy
+import datetime as dt
+import json
+import random
+from math import cos, pi, sin
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pystac
+import rasterio
+import requests
+from pystac.extensions.file import FileExtension
+from pystac.extensions.projection import ProjectionExtension
+from pystac.extensions.render import RenderExtension
+from pystac.validation import JsonSchemaSTACValidator
+from rasterio.crs import CRS
+from rasterio.transform import from_bounds
+
+from stactools.hotosm.maxar.sync import MAXAR_EVENT_INFO, MAXAR_ROOT
+from stactools.hotosm.stac_common import ALTERNATE_ASSETS_SCHEMA
+
+TESTS = Path(__file__).parents[1]
+OAM_API_RESPONSE = TESTS / "data" / "oam_meta_api_response10.json"
+MAXAR_ITEM = TESTS / "maxar" / "data" / "item.json"
+OAM_EXTENSION_SCHEMA = TESTS.parent / "stac-extension" / "json-schema" / "schema.json"
+
+EPOCH = dt.datetime(2016, 1, 1, tzinfo=dt.UTC)
+
+
+def oam_api_results(
+    n: int, image_urls: list[str], vertices: int = 5, seed: int = 0
+) -> list[dict]:
+    """Create OAM metadata API results in the shape of the API response fixture.
+
+    Results are sorted by descending `uploaded_at`, like the API when syncing.
+    """
+    rng = random.Random(seed)
+    template = json.loads(OAM_API_RESPONSE.read_text())["results"][0]
+
+    results = []
+    for i in range(n):
+        result = copy.deepcopy(template)
+        lon = rng.uniform(-179, 179)
+        lat = rng.uniform(-80, 80)
+        ring = _ring(lon, lat, 0.005, vertices, rng)
+        xs = [x for x, _ in ring]
+        ys = [y for _, y in ring]
+        bbox = [min(xs), min(ys), max(xs), max(ys)]
+        start = EPOCH + dt.timedelta(hours=i)
+        uploaded_at = start + dt.timedelta(days=1)
+
+        result.update(
+            {
+                "_id": f"{i:024x}",
+                "title": f"Synthetic image {i}",
+                "uuid": image_urls[i % len(image_urls)],
+                "bbox": bbox,
+                "footprint": "POLYGON((" + ",".join(f"{x} {y}" for x, y in ring) + "))",
+                "acquisition_start": start.isoformat(),
+                "acquisition_end": (start + dt.timedelta(minutes=30)).isoformat(),
+                "uploaded_at": uploaded_at.isoformat(),
+                "platform": rng.choice(["uav", "UAV", "aircraft", "satellite"]),
+                "geojson": {"bbox": bbox, "coordinates": [ring], "type": "Polygon"},
+            }
+        )
+        results.append(result)
+
+    results.sort(key=lambda result: result["uploaded_at"], reverse=True)
+    return results
+
+
+def _ring(
+    lon: float, lat: float, radius: float, vertices: int, rng: random.Random
+) -> list[list[float]]:
+    """Create a closed, star shaped polygon ring with full precision coordinates."""
+    ring = []
+    for i in range(vertices):
+        angle = 2 * pi * i / vertices
+        r = radius * rng.uniform(0.8, 1.0)
+        ring.append([lon + r * cos(angle), lat + r * sin(angle)])
+    ring.append(ring[0])
+    return ring
+
+
+class SyntheticOamSession(requests.Session):
+    """Session that serves OAM metadata API pages from memory."""
+
+    def __init__(self, api_root: str, results: list[dict]) -> None:
+        """Serve `results` as if they were returned by the API at `api_root`."""
+        super().__init__()
+        self.api_root = api_root
+        self.results = results
+        self._pages: dict[tuple[int, int], bytes] = {}
+
+    def warm(self, limit: int) -> None:
+        """Pre-encode all pages so that benchmarks don't time our fake server."""
+        for page in range(1, len(self.results) // limit + 2):
+            self._page(page, limit)
+
+    def _page(self, page: int, limit: int) -> bytes:
+        if (page, limit) not in self._pages:
+            start = (page - 1) * limit
+            body = {
+                "meta": {"page": page, "limit": limit, "found": len(self.results)},
+                "results": self.results[start : start + limit],
+            }
+            self._pages[(page, limit)] = json.dumps(body).encode()
+        return self._pages[(page, limit)]
+
+    def get(self, url: str | bytes, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        """Return a page of results."""
+        params = kwargs.get("params") or {}
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.url = str(url)
+        resp._content = self._page(int(params.get("page", 1)), int(params["limit"]))
+        return resp
+
+
+def write_cogs(directory: Path, count: int = 8) -> list[str]:
+    """Write small local COGs like those in the test fixtures."""
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(0)
+    hrefs = []
+    for i in range(count):
+        data = rng.integers(low=0, high=255, size=(3, 13, 42), dtype="uint8")
+        profile = {
+            "count": data.shape[0],
+            "height": data.shape[1],
+            "width": data.shape[2],
+            "dtype": "uint8",
+            "crs": CRS.from_epsg(4326),
+            "transform": from_bounds(-80.42, -0.98, -80.41, -0.97, *data.shape[1:]),
+        }
+        href = directory / f"image-{i}.tif"
+        with rasterio.open(href, "w", driver="COG", **profile) as dst:
+            dst.write(data)
+        hrefs.append(str(href))
+    return hrefs
+
+
+def write_maxar_catalog(
+    directory: Path, n: int, items_per_event: int = 1000
+) -> list[dict]:
+    """Write a local static catalog laid out like the Maxar open data bucket.
+
+    Each event is a Collection containing an acquisition Collection of Items.
+
+    Returns:
+        The "event_info.json" listing for the catalog.
+    """
+    template = pystac.Item.from_file(str(MAXAR_ITEM))
+    template.clear_links()
+
+    event_info = []
+    for event_number, start in enumerate(range(0, n, items_per_event)):
+        event_id = f"Synthetic-Event-{event_number}"
+        date = EPOCH + dt.timedelta(days=event_number)
+        event = pystac.Collection(
+            id=event_id,
+            title=f"Synthetic event {event_number}",
+            description="Synthetic Maxar event",
+            extent=pystac.Extent(
+                pystac.SpatialExtent([[-180.0, -90.0, 180.0, 90.0]]),
+                pystac.TemporalExtent([[date, None]]),
+            ),
+        )
+        acquisition = pystac.Collection(
+            id=f"{event_id}-acquisition",
+            description="Synthetic acquisition",
+            extent=event.extent.clone(),
+        )
+        event.add_child(acquisition)
+
+        for i in range(start, min(start + items_per_event, n)):
+            item = template.clone()
+            catalog_id = f"{i:016X}"
+            item.id = f"11/031311102001/{catalog_id}"
+            item.properties["catalog_id"] = catalog_id
+            if i % 2:
+                item.properties.pop("grid:code")
+            acquisition.add_item(item)
+
+        event.normalize_hrefs(str(directory / event_id))
+        event.make_all_asset_hrefs_relative()
+        event.save(pystac.CatalogType.SELF_CONTAINED)
+        event_info.append({"date": date.strftime("%Y-%m-%d"), "s3_directory": event_id})
+
+    return event_info
+
+
+class MaxarMirrorStacIO(pystac.stac_io.DefaultStacIO):
+    """StacIO that reads Maxar bucket HREFs from a local mirror."""
+
+    def __init__(self, directory: Path) -> None:
+        """Read HREFs below the Maxar bucket root from `directory`."""
+        super().__init__()
+        self.directory = directory
+
+    def read_text_from_href(self, href: str) -> str:
+        """Read text, redirecting Maxar bucket HREFs to the local mirror."""
+        if href.startswith(MAXAR_ROOT):
+            href = str(self.directory / href.removeprefix(MAXAR_ROOT))
+        return super().read_text_from_href(href)
+
+
+class MaxarMirrorSession(requests.Session):
+    """Session that serves the Maxar "event_info.json" from memory."""
+
+    def __init__(self, event_info: list[dict]) -> None:
+        """Serve `event_info` as the bucket's event listing."""
+        super().__init__()
+        self.event_info = json.dumps(event_info).encode()
+
+    def get(self, url: str | bytes, **_kwargs: Any) -> requests.Response:  # type: ignore[override]
+        """Return the event listing."""
+        assert url == MAXAR_EVENT_INFO
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.url = str(url)
+        resp._content = self.event_info
+        return resp
+
+
+def offline_validator() -> JsonSchemaSTACValidator:
+    """Create a STAC validator that never fetches schemas from the network.
+
+    Core STAC schemas are bundled with PySTAC and the OAM extension schema is read
+    from this repository. Other extension schemas are replaced by permissive
+    placeholders, so only their cost of dispatch is measured.
+    """
+    extension_uris = [
+        FileExtension.get_schema_uri(),
+        ProjectionExtension.get_schema_uri(),
+        RenderExtension.get_schema_uri(),
+        ALTERNATE_ASSETS_SCHEMA,
+        *json.loads(MAXAR_ITEM.read_text())["stac_extensions"],
+    ]
+    validator = JsonSchemaSTACValidator()
+    oam_schema = json.loads(OAM_EXTENSION_SCHEMA.read_text())
+    for uri in extension_uris:
+        validator.schema_cache.setdefault(
+            uri,
+            {
+                "$schema": "http://json-schema.org/draft-07/schema#",
+                "$id": uri,
+                "type": "object",
+            },
+        )
+    validator.schema_cache[oam_schema["$id"]] = oam_schema
+    return validator
@@ -0,0 +1,16 @@
+"""Smoke tests ensuring the benchmark suite keeps running."""
+
+from pathlib import Path
+
+import pytest
+
+from .suite import BENCHMARKS, run_benchmark
+
+
+@pytest.mark.parametrize("name", list(BENCHMARKS))
+def test_benchmark_runs(name: str, tmp_path: Path):
+    """Ensure each benchmark runs with a handful of items."""
+    result = run_benchmark(name, 3, tmp_path, repeat=1)
+    assert result["benchmark"] == name
+    assert result["n"] == 3
+    assert len(result["runs"]) == 1
@@ -3,9 +3,11 @@
 import datetime as dt
 import json
 from pathlib import Path
+from typing import Any, Callable
 
 import numpy as np
 import pyproj
+import pystac
 import pytest
 import rasterio
 import shapely
@@ -58,6 +60,37 @@ def example_oam_metadata() -> OamMetadata:
     )
 
 
+def _make_item(index: int, collection: str = "test", **fields: Any) -> dict:
+    item = pystac.Item(
+        id=f"item-{index}",
+        geometry={"type": "Point", "coordinates": [index, index]},
+        bbox=[index, index, index, index],
+        datetime=dt.datetime(2025, 1, 1, tzinfo=dt.UTC) + dt.timedelta(days=index),
+        properties={"gsd": 0.1 * (index + 1)},
+    )
+    if index % 2:
+        item.properties["platform"] = "uav"
+    item.add_asset("visual", pystac.Asset(href=f"https://example.com/{index}.tif"))
+    return item.to_dict() | {"collection": collection} | fields
+
+
+@pytest.fixture
+def make_item() -> Callable[..., dict]:
+    """Factory of STAC Item dictionaries, numbered by their first argument.
+
+    Items differ in their ID, geometry, datetime and GSD, and odd Items have a
+    `platform` property that even Items lack. Top level fields, e.g. `properties`
+    or `assets`, can be replaced with keyword arguments.
+    """
+    return _make_item
+
+
+@pytest.fixture
+def make_items() -> Callable[[int], list[dict]]:
+    """Factory of lists of STAC Item dictionaries (see `make_item`)."""
+    return lambda n: [_make_item(i) for i in range(n)]
+
+
 @pytest.fixture
 def example_oam_meta_api_response() -> dict:
     """Example OAM Metadata API response."""
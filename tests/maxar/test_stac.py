@@ -7,6 +7,7 @@ from pathlib import Path
 import pystac
 import pytest
 
+from stactools.hotosm.geometry import GeometryOptions
 from stactools.hotosm.maxar.stac import create_collection, create_item
 
 DATA = Path(__file__).parent.joinpath("data")
@@ -57,3 +58,15 @@ def test_create_item(item: pystac.Item):
 
     assert oam_item.properties["oam:producer_name"] == "Maxar"
     assert oam_item.properties["oam:platform_type"] == "satellite"
+
+
+def test_create_item_optimizes_geometry(item: pystac.Item):
+    """Test STAC Item creation with simplified geometry."""
+    oam_item = create_item(item, GeometryOptions(precision=4, simplify_tolerance=1e-4))
+
+    assert oam_item.geometry is not None
+    assert oam_item.bbox is not None
+    for x, y in oam_item.geometry["coordinates"][0]:
+        assert oam_item.bbox[0] <= x <= oam_item.bbox[2]
+        assert oam_item.bbox[1] <= y <= oam_item.bbox[3]
+    assert item.geometry != oam_item.geometry
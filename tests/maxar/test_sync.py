@@ -7,6 +7,7 @@ import pystac
 import requests
 import responses
 
+from stactools.hotosm.backfill import BackfillShard
 from stactools.hotosm.maxar.sync import MAXAR_EVENT_INFO, MAXAR_ROOT, new_stac_items
 
 
@@ -62,3 +63,52 @@ def test_new_stac_items_filtering():
     mock.assert_called_once_with(
         f"{MAXAR_ROOT.rstrip('/')}/foo/collection.json", stac_io=stac_io
     )
+
+
+@responses.activate
+def test_new_stac_items_backfill_shard():
+    """Ensure only the events of a slice of the catalog are read."""
+    session = requests.Session()
+    stac_io = pystac.stac_io.DefaultStacIO()
+    events = [{"date": "2025-05-01", "s3_directory": f"event-{n}"} for n in range(8)]
+    responses.get(url=MAXAR_EVENT_INFO, json=events)
+    collection = pystac.Collection(id="test", description="foo", extent=None)
+
+    read: list[str] = []
+    for index in range(2):
+        shard = BackfillShard(index, 2)
+        with patch("pystac.read_file", return_value=collection) as mock:
+            list(new_stac_items(stac_io, session, None, shard))
+        urls = [call.args[0] for call in mock.call_args_list]
+        assert all(shard.owns(url.split("/")[-2]) for url in urls)
+        read.extend(urls)
+
+    assert sorted(read) == sorted(
+        f"{MAXAR_ROOT.rstrip('/')}/{event['s3_directory']}/collection.json"
+        for event in events
+    )
+
+
+@responses.activate
+def test_new_stac_items_before():
+    """Ensure events dated after the end of the window are filtered out."""
+    session = requests.Session()
+    stac_io = pystac.stac_io.DefaultStacIO()
+    responses.get(
+        url=MAXAR_EVENT_INFO,
+        json=[
+            {"date": "2020-01-01", "s3_directory": "old"},
+            {"date": "2025-05-01", "s3_directory": "new"},
+        ],
+    )
+    collection = pystac.Collection(id="test", description="foo", extent=None)
+    with patch("pystac.read_file", return_value=collection) as mock:
+        list(
+            new_stac_items(
+                stac_io, session, None, before=dt.datetime(2025, 1, 1, tzinfo=dt.UTC)
+            )
+        )
+
+    mock.assert_called_once_with(
+        f"{MAXAR_ROOT.rstrip('/')}/old/collection.json", stac_io=stac_io
+    )
@@ -0,0 +1,89 @@
+"""Tests for `stactools.hotosm.asset_checks`."""
+
+from typing import Callable, Iterator
+
+import pytest
+import requests
+import responses
+
+from stactools.hotosm.asset_checks import AssetChecker
+
+HOST = "https://assets.test"
+
+
+@pytest.fixture
+def checker() -> Iterator[AssetChecker]:
+    """Asset checker with a few workers."""
+    checker = AssetChecker(workers=2, timeout=1)
+    yield checker
+    checker.close()
+
+
+@responses.activate
+def test_check(checker: AssetChecker):
+    """Ensure only statuses of missing objects make an asset missing."""
+    responses.head(f"{HOST}/ok.png")
+    responses.head(f"{HOST}/missing.png", status=404)
+    responses.head(f"{HOST}/forbidden.png", status=403)
+    responses.head(f"{HOST}/error.png", status=503)
+    responses.head(f"{HOST}/timeout.png", body=requests.Timeout("timed out"))
+
+    assert not checker.check(f"{HOST}/ok.png").missing
+    assert checker.check(f"{HOST}/missing.png").missing
+    assert checker.check(f"{HOST}/forbidden.png").missing
+    assert not checker.check(f"{HOST}/error.png").missing
+    result = checker.check(f"{HOST}/timeout.png")
+    assert not result.missing
+    assert result.error == "Timeout: timed out"
+
+
+@responses.activate
+def test_check_falls_back_to_get(checker: AssetChecker):
+    """Ensure servers that do not support HEAD are checked with GET."""
+    responses.head(f"{HOST}/metadata.json", status=405)
+    get = responses.get(f"{HOST}/metadata.json", status=404)
+
+    assert checker.check(f"{HOST}/metadata.json").missing
+    assert get.call_count == 1
+
+
+@responses.activate
+def test_submit_caches_by_href(checker: AssetChecker):
+    """Ensure each HREF is only requested once."""
+    head = responses.head(f"{HOST}/shared.png")
+
+    futures = [checker.submit(f"{HOST}/shared.png") for _ in range(3)]
+    assert all(not future.result().missing for future in futures)
+    assert head.call_count == 1
+
+
+@responses.activate
+def test_check_items(checker: AssetChecker, make_item: Callable[..., dict]):
+    """Ensure STAC Items are yielded in order with their missing assets."""
+    responses.head(f"{HOST}/a.png")
+    responses.head(f"{HOST}/b.png", status=404)
+    responses.head(f"{HOST}/b.json")
+
+    def assets(*hrefs: str) -> dict:
+        visual = {"visual": {"href": f"{HOST}/visual.tif"}}
+        return visual | {f"asset-{i}": {"href": href} for i, href in enumerate(hrefs)}
+
+    items = [
+        (
+            "record-a",
+            make_item(0, assets=assets(f"{HOST}/a.png", "s3://bucket/a.json")),
+        ),
+        ("record-b", make_item(1, assets=assets(f"{HOST}/b.png", f"{HOST}/b.json"))),
+        ("record-c", make_item(2)),
+    ] * 5
+
+    checked = list(checker.check_items(iter(items)))
+    assert [(tag, item) for tag, item, _ in checked] == items
+    for tag, _, missing in checked:
+        if tag == "record-b":
+            assert [check.href for check in missing] == [f"{HOST}/b.png"]
+        else:
+            assert missing == []
+    # Visual assets, which are read while creating STAC Items, and HREFs that are
+    # not HTTP URLs are not checked
+    assert len(responses.calls) == 3
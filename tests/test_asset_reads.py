@@ -0,0 +1,288 @@
+"""Tests for `stactools.hotosm.asset_reads`."""
+
+import logging
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from pathlib import Path
+from typing import Callable, Iterator
+from unittest.mock import patch
+
+import pytest
+from rasterio.errors import RasterioIOError
+
+from stactools.hotosm.asset_reads import (
+    AssetReadOptions,
+    GdalEnvOptions,
+    gdal_env,
+    read_asset,
+)
+from stactools.hotosm.exceptions import AssetTimeoutError
+from stactools.hotosm.metrics import ASSET_READS, GDAL_OPENS, GDAL_REQUESTS, METRICS
+from stactools.hotosm.oam_metadata import OamMetadata
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Start each test with empty metrics."""
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+def reads(outcome: str) -> float:
+    """Number of asset reads recorded with an outcome."""
+    return METRICS.counter_total(ASSET_READS, outcome=outcome)
+
+
+def test_read_asset(example_oam_image: OamMetadata):
+    """Ensure assets are read with and without a deadline."""
+    for options in (AssetReadOptions(), AssetReadOptions(deadline=10)):
+        count = read_asset(example_oam_image.image_url, lambda src: src.count, options)
+        assert count == 3
+    assert reads("ok") == 2
+
+
+def test_read_asset_not_found_is_not_retried(example_oam_metadata: OamMetadata):
+    """Ensure missing assets fail without retrying."""
+    with pytest.raises(RasterioIOError):
+        read_asset(
+            example_oam_metadata.image_url,
+            lambda src: src.count,
+            AssetReadOptions(retries=3, backoff=10),
+        )
+    assert reads("retry") == 0
+    assert reads("failed") == 1
+
+
+def test_read_asset_retries():
+    """Ensure failed reads are retried with backoff."""
+    calls = 0
+
+    def flaky_read(*_args):
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise RasterioIOError("HTTP response code: 503")
+        return "read"
+
+    with patch("stactools.hotosm.asset_reads._read", side_effect=flaky_read):
+        result = read_asset(
+            "https://example.com/image.tif",
+            lambda src: src,
+            AssetReadOptions(retries=2, backoff=0.001),
+        )
+    assert result == "read"
+    assert reads("retry") == 2
+
+    calls = 0
+    with (
+        patch("stactools.hotosm.asset_reads._read", side_effect=flaky_read),
+        pytest.raises(RasterioIOError, match="503"),
+    ):
+        read_asset(
+            "https://example.com/image.tif",
+            lambda src: src,
+            AssetReadOptions(retries=1, backoff=0.001),
+        )
+
+
+def test_read_asset_deadline():
+    """Ensure a hung read fails once its deadline passes."""
+    release = threading.Event()
+
+    def hung_read(*_args):
+        release.wait(5)
+        return "read"
+
+    start = time.monotonic()
+    with (
+        patch("stactools.hotosm.asset_reads._read", side_effect=hung_read),
+        pytest.raises(AssetTimeoutError, match="deadline of 0.05s"),
+    ):
+        read_asset(
+            "https://example.com/image.tif",
+            lambda src: src,
+            AssetReadOptions(deadline=0.05),
+        )
+    release.set()
+
+    assert time.monotonic() - start < 1
+    assert reads("timeout") == 1
+
+
+def test_read_asset_hedged():
+    """Ensure a slow read is hedged by a second read that completes first."""
+    release = threading.Event()
+    calls = 0
+    lock = threading.Lock()
+
+    def slow_first_read(*_args):
+        nonlocal calls
+        with lock:
+            calls += 1
+            call = calls
+        if call == 1:
+            release.wait(5)
+            return "slow"
+        return "hedged"
+
+    start = time.monotonic()
+    with patch("stactools.hotosm.asset_reads._read", side_effect=slow_first_read):
+        result = read_asset(
+            "https://example.com/image.tif",
+            lambda src: src,
+            AssetReadOptions(hedge_after=0.02),
+        )
+    release.set()
+
+    assert result == "hedged"
+    assert time.monotonic() - start < 1
+    assert reads("hedged") == 1
+    assert reads("hedge_won") == 1
+
+
+def test_gdal_config():
+    """Ensure timeouts are passed to GDAL in whole seconds."""
+    options = AssetReadOptions(connect_timeout=2.5, read_timeout=30)
+    assert options.gdal_config() == {
+        "GDAL_HTTP_CONNECTTIMEOUT": "3",
+        "GDAL_HTTP_TIMEOUT": "30",
+    }
+    assert AssetReadOptions().gdal_config() == {}
+
+
+def test_gdal_env_config():
+    """Ensure the tuned environment is added to the timeouts."""
+    options = AssetReadOptions(read_timeout=30, env=GdalEnvOptions())
+    assert options.gdal_config() == {
+        "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+        "CPL_VSIL_CURL_ALLOWED_EXTENSIONS": ".tif,.tiff",
+        "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+        "GDAL_HTTP_VERSION": "2TLS",
+        "GDAL_HTTP_MULTIPLEX": "YES",
+        "GDAL_HTTP_TCP_KEEPALIVE": "YES",
+        "VSI_CACHE": "TRUE",
+        "VSI_CACHE_SIZE": "5242880",
+        "GDAL_HTTP_TIMEOUT": "30",
+    }
+    assert GdalEnvOptions(count_requests=True).gdal_config()["CPL_DEBUG"] == "ON"
+    untuned = GdalEnvOptions(
+        disable_readdir=False,
+        allowed_extensions=(),
+        merge_consecutive_ranges=False,
+        http_multiplex=False,
+        vsi_cache_size=0,
+    )
+    assert untuned.gdal_config() == {}
+
+
+# Serves files with single byte ranges, like object stores. It runs in its own
+# process as rasterio holds the GIL while GDAL opens files.
+RANGE_SERVER = """
+import http.server, re, sys
+from pathlib import Path
+
+class Handler(http.server.SimpleHTTPRequestHandler):
+    def send_head(self):
+        path = Path(self.translate_path(self.path))
+        if not path.is_file():
+            self.send_error(404)
+            return None
+        data = path.read_bytes()
+        match = re.fullmatch(r"bytes=(\\d+)-(\\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match[1])
+            end = min(int(match[2] or len(data) - 1), len(data) - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+            data = data[start : end + 1]
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data if self.command == "GET" else b"")
+        return None
+
+    def log_message(self, *args):
+        pass
+
+server = http.server.ThreadingHTTPServer(
+    ("127.0.0.1", 0), lambda *args: Handler(*args, directory=sys.argv[1])
+)
+print(server.server_port, flush=True)
+server.serve_forever()
+"""
+
+
+@pytest.fixture
+def cog_url(
+    example_oam_image: OamMetadata, tmp_path: Path
+) -> Iterator[Callable[[], str]]:
+    """Serve the example COG over HTTP, returning the URL of a new copy per call.
+
+    GDAL caches remote files by URL, so each copy is read from the server.
+    """
+    root = tmp_path / "served"
+    root.mkdir()
+    server = subprocess.Popen(
+        [sys.executable, "-c", RANGE_SERVER, str(root)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert server.stdout is not None
+    port = int(server.stdout.readline())
+    copies = count()
+
+    def new_copy() -> str:
+        name = f"image-{next(copies)}.tif"
+        shutil.copy(example_oam_image.image_url, root / name)
+        return f"http://127.0.0.1:{port}/{name}"
+
+    yield new_copy
+    server.terminate()
+    server.wait()
+
+
+def test_gdal_env_reduces_requests_per_open(cog_url: Callable[[], str], caplog):
+    """Ensure the tuned environment opens COGs with fewer requests, per thread."""
+    untuned = AssetReadOptions(
+        env=GdalEnvOptions(
+            disable_readdir=False,
+            allowed_extensions=(),
+            merge_consecutive_ranges=False,
+            vsi_cache_size=0,
+            count_requests=True,
+        )
+    )
+    assert read_asset(cog_url(), lambda src: src.count, untuned) == 3
+    untuned_requests = METRICS.counter_total(GDAL_REQUESTS)
+    assert METRICS.counter_total(GDAL_OPENS) == 1
+    assert untuned_requests > 2
+
+    METRICS.reset()
+    tuned = AssetReadOptions(env=GdalEnvOptions(count_requests=True))
+    urls = [cog_url() for _ in range(4)]
+    with gdal_env(tuned), ThreadPoolExecutor(4) as executor:
+        counts = list(
+            executor.map(
+                lambda url: read_asset(url, lambda src: src.count, tuned), urls
+            )
+        )
+    assert counts == [3, 3, 3, 3]
+    assert METRICS.counter_total(GDAL_OPENS) == 4
+    assert 4 <= METRICS.counter_total(GDAL_REQUESTS) <= 8
+    assert METRICS.counter_total(GDAL_REQUESTS) < 4 * untuned_requests
+    # GDAL debug messages enabled for counting are not logged
+    assert not [r for r in caplog.records if r.levelno == logging.DEBUG]
+
+    # Requests are only counted on request
+    METRICS.reset()
+    default = AssetReadOptions(env=GdalEnvOptions())
+    assert read_asset(cog_url(), lambda src: src.count, default) == 3
+    assert METRICS.counter_total(GDAL_OPENS) == 1
+    assert METRICS.counter_total(GDAL_REQUESTS) == 0
@@ -0,0 +1,116 @@
+"""Tests for `stactools.hotosm.backfill`."""
+
+import datetime as dt
+from pathlib import Path
+
+import pytest
+
+from stactools.hotosm.backfill import (
+    BackfillRecord,
+    BackfillShard,
+    backfill_record_path,
+    check_records,
+    listed_before,
+    unique_items,
+    verify_backfill,
+)
+
+
+@pytest.mark.parametrize("value", ["1", "a/2", "2/2", "0/0", "-1/2"])
+def test_parse_invalid_shard(value: str):
+    """Ensure slices outside of the catalog are rejected."""
+    with pytest.raises(ValueError, match="Expected"):
+        BackfillShard.parse(value)
+
+
+@pytest.mark.parametrize("pages", [0, 1, 3, 10, 101])
+@pytest.mark.parametrize("count", [1, 2, 4])
+def test_page_ranges_cover_every_page_once(pages: int, count: int):
+    """Ensure the page ranges of all slices are contiguous and disjoint."""
+    covered: list[int] = []
+    for index in range(count):
+        first, last = BackfillShard(index, count).page_range(pages)
+        assert (last is None) == (index == count - 1)
+        covered.extend(range(first, (pages if last is None else last) + 1))
+    assert covered == list(range(1, pages + 1))
+
+
+def test_owns_splits_keys_between_slices():
+    """Ensure each key belongs to exactly one slice."""
+    shards = [BackfillShard.parse(f"{index}/3") for index in range(3)]
+    keys = [f"event-{n}" for n in range(100)]
+    owners = [[shard for shard in shards if shard.owns(key)] for key in keys]
+    assert all(len(owner) == 1 for owner in owners)
+    assert {owner[0] for owner in owners} == set(shards)
+
+
+def test_record_round_trip(tmp_path: Path):
+    """Ensure records are read back with their dump next to them."""
+    dump = tmp_path / "items-1.manifest.json"
+    record = BackfillRecord(
+        "Maxar",
+        BackfillShard(1, 4),
+        dt.datetime(2020, 1, 1, tzinfo=dt.UTC),
+        dt.datetime(2025, 1, 1, 12, 30, tzinfo=dt.UTC),
+        dump,
+        12,
+    )
+    path = backfill_record_path(tmp_path / "items-1.ndjson.gz")
+    assert path.name == "items-1.ndjson.gz.backfill.json"
+    record.write(path)
+    assert BackfillRecord.read(path) == record
+
+
+def make_records(indexes: list[int], count: int) -> list[BackfillRecord]:
+    """Records of the dumps of some slices of a backfill, listed an hour apart."""
+    return [
+        BackfillRecord(
+            "OAM",
+            BackfillShard(index, count),
+            dt.datetime(2020, 1, 1, tzinfo=dt.UTC),
+            dt.datetime(2025, 1, 1, tzinfo=dt.UTC) + dt.timedelta(hours=index),
+            Path(f"items-{index}.ndjson"),
+            0,
+        )
+        for index in indexes
+    ]
+
+
+def test_check_records():
+    """Ensure every slice must be dumped exactly once, in the same backfill."""
+    check_records(make_records([1, 0, 2], 3))
+    with pytest.raises(ValueError, match="missing 1/3, 2/3 and duplicated 0/3"):
+        check_records(make_records([0, 0], 3))
+    with pytest.raises(ValueError, match="different backfill"):
+        check_records(make_records([0], 2) + make_records([1], 3))
+    with pytest.raises(ValueError, match="No backfill records"):
+        check_records([])
+
+
+def test_listed_before():
+    """Ensure records are checked up to when the first slice was listed."""
+    records = make_records([2, 0, 1], 3)
+    assert listed_before(records) == dt.datetime(2025, 1, 1, tzinfo=dt.UTC)
+
+
+def test_verify_backfill(tmp_path: Path):
+    """Ensure missing, duplicated and unexpected IDs are found with spilled runs."""
+    missing = tmp_path / "missing.txt"
+    result = verify_backfill(
+        upstream=["e", "a", "d", "c", "b"],
+        dumped=["b", "a", "x", "b", "c", "a"],
+        missing_file=missing,
+        buffer_ids=2,
+    )
+    assert result.upstream == 5
+    assert result.dumped == 6
+    assert result.duplicates == {"a", "b"}
+    assert result.missing == 2
+    assert result.unexpected == 1
+    assert missing.read_text() == "d\ne\n"
+
+
+def test_unique_items():
+    """Ensure only the first copy of duplicated STAC Items is kept."""
+    items = [{"id": "a", "n": 0}, {"id": "b"}, {"id": "a", "n": 1}, {"id": "c"}]
+    assert list(unique_items(items, {"a"})) == items[:2] + items[3:]
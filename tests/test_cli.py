@@ -0,0 +1,1012 @@
+"""Tests for `stactools.hotosm.cli`."""
+
+import datetime as dt
+import json
+import os
+import subprocess
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any
+from unittest.mock import Mock, patch
+
+import pystac
+import pytest
+import responses
+from click.testing import CliRunner
+
+from stactools.hotosm.asset_checks import AssetChecker
+from stactools.hotosm.backfill import BackfillShard
+from stactools.hotosm.cli import get_oam_items_after, main, sync_handler
+from stactools.hotosm.events import SqliteQueue, run_consumer
+from stactools.hotosm.oam_metadata import OamMetadata
+from stactools.hotosm.oam_metadata_client import OamMetadataClient
+
+
+def fake_create_item(oam_metadata: OamMetadata, **_kwargs: Any) -> pystac.Item:
+    """Create a minimal STAC Item without reading any assets."""
+    if oam_metadata.id == "broken":
+        raise ValueError("broken upstream metadata")
+    item = pystac.Item(
+        id=oam_metadata.id,
+        geometry=oam_metadata.geojson,
+        bbox=oam_metadata.bbox,
+        datetime=oam_metadata.acquisition_start,
+        properties={},
+    )
+    item.add_asset("visual", pystac.Asset(href=oam_metadata.image_url))
+    return item
+
+
+@pytest.fixture
+def oam_metadata_records(example_oam_metadata: OamMetadata) -> list[OamMetadata]:
+    """Several OAM metadata records, one of which cannot be converted."""
+    records = []
+    for item_id in ("a", "broken", "b"):
+        record = OamMetadata(**vars(example_oam_metadata))
+        record.id = item_id
+        records.append(record)
+    return records
+
+
+def test_sync_handler_ignores_errors(oam_metadata_records: list[OamMetadata]):
+    """Ensure failed items are reported without duplicating other items."""
+    items, errors = sync_handler(
+        collection_id="test",
+        raw_metadata_creator=lambda _: iter(oam_metadata_records),
+        stac_item_creator=fake_create_item,
+        uploaded_after=dt.datetime.now(tz=dt.UTC),
+        handle_exceptions="IGNORE",
+    )
+
+    assert [item["id"] for item in items] == ["a", "b"]
+    assert all(item["collection"] == "test" for item in items)
+    assert len(errors) == 1
+
+
+def test_sync_handler_raises(oam_metadata_records: list[OamMetadata]):
+    """Ensure errors are raised by default."""
+    with pytest.raises(ValueError, match="broken"):
+        sync_handler(
+            collection_id="test",
+            raw_metadata_creator=lambda _: iter(oam_metadata_records),
+            stac_item_creator=fake_create_item,
+            uploaded_after=dt.datetime.now(tz=dt.UTC),
+            handle_exceptions="RAISE",
+        )
+
+
+@responses.activate
+def test_sync_handler_checks_assets(oam_metadata_records: list[OamMetadata]):
+    """Ensure STAC Items with missing assets fail like records that cannot be read."""
+    responses.head("https://assets.test/a.png")
+    responses.head("https://assets.test/b.png", status=404)
+
+    def create_item(oam_metadata: OamMetadata) -> pystac.Item:
+        item = fake_create_item(oam_metadata)
+        thumbnail = f"https://assets.test/{oam_metadata.id}.png"
+        item.add_asset("thumbnail", pystac.Asset(href=thumbnail))
+        return item
+
+    checker = AssetChecker(workers=2)
+    try:
+        items, errors = sync_handler(
+            collection_id="test",
+            raw_metadata_creator=lambda _: iter(oam_metadata_records),
+            stac_item_creator=create_item,
+            uploaded_after=dt.datetime.now(tz=dt.UTC),
+            handle_exceptions="IGNORE",
+            asset_checker=checker,
+        )
+    finally:
+        checker.close()
+
+    assert [item["id"] for item in items] == ["a"]
+    assert [(error.id, error.stage) for error in errors.reported] == [
+        ("broken", "create_item"),
+        ("b", "check_assets"),
+    ]
+    assert errors.reported[1].error == "AssetNotFoundError"
+    assert "https://assets.test/b.png (404)" in errors.reported[1].message
+
+
+def test_dump_oam_with_metrics_and_profile(
+    oam_metadata_records: list[OamMetadata], tmp_path: Path
+):
+    """Ensure the metrics and profile reports are written when the CLI exits."""
+    dump = tmp_path / "items.ndjson"
+    metrics = tmp_path / "metrics.json"
+    profile = tmp_path / "profile"
+
+    with (
+        patch(
+            "stactools.hotosm.cli.get_oam_items_after",
+            return_value=iter(oam_metadata_records),
+        ),
+        patch("stactools.hotosm.stac.create_item", side_effect=fake_create_item),
+    ):
+        result = CliRunner().invoke(
+            main,
+            [
+                "--metrics-json",
+                str(metrics),
+                "--profile",
+                str(profile),
+                "dump-oam",
+                "--file",
+                str(dump),
+                "--uploaded-since",
+                "3600",
+                "--handle-exceptions",
+                "IGNORE",
+            ],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert len(dump.read_text().splitlines()) == 2
+
+    summary = json.loads(metrics.read_text())
+    stages = {
+        hist["labels"]["stage"]
+        for hist in summary["histograms"]
+        if "stage" in hist["labels"]
+    }
+    assert {"fetch", "create_item", "serialize"} <= stages
+
+    slow_items = json.loads((profile / "slow-items.json").read_text())
+    assert {entry["id"] for entry in slow_items} >= {"a", "broken", "b"}
+    assert (profile / "hotosm.prof").exists()
+
+
+def test_dump_oam_geoparquet(oam_metadata_records: list[OamMetadata], tmp_path: Path):
+    """Ensure STAC Items can be dumped to STAC-GeoParquet."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    pytest.importorskip("stac_geoparquet")
+    dump = tmp_path / "items.parquet"
+
+    with (
+        patch(
+            "stactools.hotosm.cli.get_oam_items_after",
+            return_value=iter(oam_metadata_records),
+        ),
+        patch("stactools.hotosm.stac.create_item", side_effect=fake_create_item),
+    ):
+        result = CliRunner().invoke(
+            main,
+            [
+                "dump-oam",
+                "--file",
+                str(dump),
+                "--format",
+                "geoparquet",
+                "--row-group-size",
+                "1",
+                "--uploaded-since",
+                "3600",
+                "--handle-exceptions",
+                "IGNORE",
+            ],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert "Completed dumping 2 STAC Items" in result.output
+    parquet = pq.ParquetFile(dump)
+    assert parquet.metadata.num_row_groups == 2
+    assert parquet.read().column("collection").to_pylist() == ["openaerialmap"] * 2
+
+
+def test_dump_collection_extent(
+    oam_metadata_records: list[OamMetadata], tmp_path: Path
+):
+    """Ensure the Collection extent can be aggregated while dumping STAC Items."""
+    extent_file = tmp_path / "extent.json"
+    collection_file = tmp_path / "collection.json"
+
+    with (
+        patch(
+            "stactools.hotosm.cli.get_oam_items_after",
+            return_value=iter(oam_metadata_records),
+        ),
+        patch("stactools.hotosm.stac.create_item", side_effect=fake_create_item),
+    ):
+        result = CliRunner().invoke(
+            main,
+            [
+                "dump-oam",
+                "--file",
+                str(tmp_path / "items.ndjson"),
+                "--uploaded-since",
+                "3600",
+                "--handle-exceptions",
+                "IGNORE",
+                "--extent-file",
+                str(extent_file),
+            ],
+        )
+    assert result.exit_code == 0, result.output
+
+    # Validating the Collection requires fetching extension schemas
+    with patch("pystac.Collection.validate"):
+        result = CliRunner().invoke(
+            main,
+            [
+                "dump-collection",
+                "--catalog",
+                "OAM",
+                "--file",
+                str(collection_file),
+                "--extent-file",
+                str(extent_file),
+            ],
+        )
+    assert result.exit_code == 0, result.output
+    assert "Using the extent of 2 STAC Items" in result.output
+
+    collection = pystac.Collection.from_file(str(collection_file))
+    record = oam_metadata_records[0]
+    assert collection.extent.spatial.bboxes == [record.bbox]
+    assert collection.extent.temporal.intervals == [
+        [record.acquisition_start, record.acquisition_start]
+    ]
+
+
+def test_dump_oam_dead_letter_and_retry(
+    oam_metadata_records: list[OamMetadata], tmp_path: Path
+):
+    """Ensure failed records are written to a dead-letter file and retried."""
+    dead_letter = tmp_path / "dead-letter.ndjson"
+
+    with (
+        patch(
+            "stactools.hotosm.cli.get_oam_items_after",
+            return_value=iter(oam_metadata_records),
+        ),
+        patch("stactools.hotosm.stac.create_item", side_effect=fake_create_item),
+    ):
+        result = CliRunner().invoke(
+            main,
+            [
+                "dump-oam",
+                "--file",
+                str(tmp_path / "items.ndjson"),
+                "--uploaded-since",
+                "3600",
+                "--handle-exceptions",
+                "IGNORE",
+                "--dead-letter",
+                str(dead_letter),
+            ],
+        )
+    assert result.exit_code == 0, result.output
+    assert "broken (create_item) ValueError: broken upstream metadata" in (
+        result.output
+    )
+    assert f"hotosm retry --dead-letter {dead_letter}" in result.output
+    assert [json.loads(line)["id"] for line in dead_letter.open()] == ["broken"]
+
+    def retry(record: OamMetadata) -> tuple[Any, list[dict]]:
+        loaded: list[dict] = []
+        with (
+            patch(
+                "stactools.hotosm.cli.new_dead_letter_fetchers",
+                return_value={"openaerialmap": lambda _: record},
+            ),
+            patch("stactools.hotosm.stac.create_item", side_effect=fake_create_item),
+            patch("pypgstac.load.Loader") as loader,
+        ):
+            loader.return_value.load_items.side_effect = lambda items, **_: (
+                loaded.extend(items)
+            )
+            result = CliRunner().invoke(
+                main, ["retry", "--dead-letter", str(dead_letter), *PGSTAC_OPTIONS]
+            )
+        assert result.exit_code == 0, result.output
+        return result, loaded
+
+    # Records failing again are reported in the original dead-letter file
+    result, loaded = retry(oam_metadata_records[1])
+    assert loaded == []
+    assert f"hotosm retry --dead-letter {dead_letter}`" in result.output
+    assert [json.loads(line)["id"] for line in dead_letter.open()] == ["broken"]
+
+    # The upstream record has since been fixed
+    fixed = OamMetadata(**vars(oam_metadata_records[1]))
+    fixed.id = "fixed"
+    result, loaded = retry(fixed)
+    assert "Completed ingesting 1 STAC Items" in result.output
+    assert [item["id"] for item in loaded] == ["fixed"]
+    assert dead_letter.read_bytes() == b""
+
+
+def test_dump_oam_index_and_lookup(
+    oam_metadata_records: list[OamMetadata], tmp_path: Path
+):
+    """Ensure dumps can be indexed and STAC Items looked up by ID."""
+    file = tmp_path / "items.ndjson"
+    with (
+        patch(
+            "stactools.hotosm.cli.get_oam_items_after",
+            return_value=iter(oam_metadata_records),
+        ),
+        patch("stactools.hotosm.stac.create_item", side_effect=fake_create_item),
+    ):
+        result = CliRunner().invoke(
+            main,
+            [
+                "dump-oam",
+                "--file",
+                str(file),
+                "--uploaded-since",
+                "3600",
+                "--handle-exceptions",
+                "IGNORE",
+                "--index",
+            ],
+        )
+    assert result.exit_code == 0, result.output
+    result = CliRunner().invoke(main, ["lookup", str(file), "b"])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["id"] == "b"
+
+    result = CliRunner().invoke(main, ["lookup", str(file), "a", "missing"])
+    assert result.exit_code != 0
+    assert "STAC Items not found" in result.output
+    assert "missing" in result.output
+
+    file.with_name("items.ndjson.idx").unlink()
+    result = CliRunner().invoke(main, ["index", str(file)])
+    assert result.exit_code == 0, result.output
+    assert "Indexed 2 STAC Items" in result.output
+
+
+def test_validate(tmp_path: Path):
+    """Ensure invalid STAC Items are reported and fail validation."""
+    example = Path(__file__).parents[1] / "stac-extension" / "examples" / "item.json"
+    item = json.loads(example.read_text())
+    item["collection"] = "openaerialmap"
+    item["assets"]["visual"] = item["assets"].pop("image")
+    invalid = json.loads(json.dumps(item))
+    invalid["id"] = "invalid"
+    invalid["properties"]["gsd"] = "high"
+    file = tmp_path / "items.ndjson"
+    report = tmp_path / "report.ndjson"
+
+    file.write_text(json.dumps(item) + "\n")
+    result = CliRunner().invoke(main, ["validate", str(file), "--workers", "1"])
+    assert result.exit_code == 0, result.output
+    assert "Validated 1 STAC Items" in result.output
+    assert "Schema not available offline for 1 STAC Items" in result.output
+
+    result = CliRunner().invoke(
+        main, ["validate", str(file), "--workers", "1", "--strict"]
+    )
+    assert result.exit_code != 0
+
+    with file.open("a") as dst:
+        dst.write(json.dumps(invalid) + "\n")
+    result = CliRunner().invoke(
+        main, ["validate", str(file), "--workers", "1", "--report", str(report)]
+    )
+    assert result.exit_code != 0
+    assert "invalid: [core] properties/gsd: 'high' is not of type 'number'" in (
+        result.output
+    )
+    assert "1 STAC Items failed validation" in result.output
+    assert [json.loads(line)["id"] for line in report.open()] == ["invalid"]
+
+
+def test_enqueue_and_consume(oam_metadata_records: list[OamMetadata], tmp_path: Path):
+    """Ensure queued upload events are fetched, loaded and acknowledged."""
+    queue = tmp_path / "events.sqlite"
+    dead_letter = tmp_path / "dead-letter.ndjson"
+    result = CliRunner().invoke(
+        main, ["enqueue", "--queue", str(queue), "a", "missing", "b", "a"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Queued 4 upload events" in result.output
+
+    records = {record.id: record for record in oam_metadata_records}
+
+    def get_item(item_id: str) -> OamMetadata:
+        if item_id not in records:
+            raise KeyError(item_id)
+        return records[item_id]
+
+    loaded: list[dict] = []
+    with (
+        patch(
+            "stactools.hotosm.oam_metadata_client.OamMetadataClient.new"
+        ) as new_client,
+        patch("stactools.hotosm.stac.create_item", side_effect=fake_create_item),
+        patch("pypgstac.load.Loader") as loader,
+        patch(
+            "stactools.hotosm.cli.run_consumer",
+            side_effect=partial(run_consumer, max_batches=1),
+        ),
+        patch("stactools.hotosm.cli.install_signal_handlers"),
+    ):
+        new_client.return_value.get_item.side_effect = get_item
+        loader.return_value.load_items.side_effect = lambda items, **_: loaded.extend(
+            items
+        )
+        result = CliRunner().invoke(
+            main,
+            [
+                "consume",
+                "--queue",
+                str(queue),
+                "--batch-seconds",
+                "0",
+                "--handle-exceptions",
+                "IGNORE",
+                "--dead-letter",
+                str(dead_letter),
+                "--pguser",
+                "user",
+                "--pgpassword",
+                "password",
+                "--pghost",
+                "localhost",
+                "--pgport",
+                "5432",
+                "--pgdatabase",
+                "postgis",
+            ],
+        )
+    assert result.exit_code == 0, result.output
+    assert "Ingested 2 STAC Items from 3 upload events" in result.output
+    assert [item["id"] for item in loaded] == ["a", "b"]
+    assert [json.loads(line)["stage"] for line in dead_letter.open()] == ["fetch"]
+    assert SqliteQueue(queue).depth() == 0
+
+
+def test_consume_requires_a_source():
+    """Ensure either a queue or a webhook is required."""
+    result = CliRunner().invoke(
+        main,
+        [
+            "consume",
+            "--pguser",
+            "user",
+            "--pgpassword",
+            "password",
+            "--pghost",
+            "localhost",
+            "--pgport",
+            "5432",
+            "--pgdatabase",
+            "postgis",
+        ],
+    )
+    assert result.exit_code != 0
+    assert "Provide --queue, --webhook or both" in result.output
+
+
+PGSTAC_OPTIONS = [
+    "--pguser",
+    "user",
+    "--pgpassword",
+    "password",
+    "--pghost",
+    "localhost",
+    "--pgport",
+    "5432",
+    "--pgdatabase",
+    "postgis",
+]
+
+
+@pytest.mark.parametrize(
+    ("max_delete_fraction", "deletes"), [("0.5", True), ("0.1", False)]
+)
+def test_reconcile(max_delete_fraction: str, deletes: bool, tmp_path: Path):
+    """Ensure orphans are reported, and only deleted below the safety limit."""
+    orphans = tmp_path / "orphans.txt"
+    missing = tmp_path / "missing.txt"
+    with (
+        patch(
+            "stactools.hotosm.oam_metadata_client.OamMetadataClient.new"
+        ) as new_client,
+        patch(
+            "stactools.hotosm.cli.iter_pgstac_ids", return_value=iter(["a", "b", "c"])
+        ),
+        patch("stactools.hotosm.cli.delete_items", return_value=1) as delete_items,
+    ):
+        new_client.return_value.get_all_ids.return_value = iter(["d", "a", "c"])
+        result = CliRunner().invoke(
+            main,
+            [
+                "reconcile",
+                "--catalog",
+                "OAM",
+                "--orphans",
+                str(orphans),
+                "--missing",
+                str(missing),
+                "--delete",
+                "--max-delete-fraction",
+                max_delete_fraction,
+                *PGSTAC_OPTIONS,
+            ],
+        )
+    assert "1 removed upstream, 1 missing from PgSTAC" in result.output
+    assert orphans.read_text() == "b\n"
+    assert missing.read_text() == "d\n"
+    if deletes:
+        assert result.exit_code == 0, result.output
+        assert list(delete_items.call_args.args[2]) == ["b"]
+    else:
+        assert result.exit_code != 0
+        assert "Refusing to delete 1 of 3 STAC Items" in result.output
+        delete_items.assert_not_called()
+
+
+def test_get_oam_items_after_backfill_shard(oam_metadata_records: list[OamMetadata]):
+    """Ensure a slice of OAM is listed oldest first from its range of pages."""
+    client = Mock()
+    client.get_count.return_value = 2_600
+    client.get_all_items.return_value = iter(oam_metadata_records)
+    uploaded_after = dt.datetime(2020, 1, 1, tzinfo=dt.UTC)
+
+    items = list(
+        get_oam_items_after(client, uploaded_after, BackfillShard.parse("1/3"))
+    )
+    assert len(items) == 3
+    client.get_all_items.assert_called_once_with(
+        uploaded_after, limit=500, first_page=3, last_page=4, sort="asc"
+    )
+
+
+@responses.activate
+def test_get_oam_items_after_backfill_shards_uploaded_after(
+    example_oam_meta_api_response: dict,
+):
+    """Ensure slices list the records uploaded after a datetime within their pages.
+
+    The first pages of a slice, oldest first, may only hold older records.
+    """
+    start = dt.datetime(2020, 1, 1, tzinfo=dt.UTC)
+    results = [
+        example_oam_meta_api_response["results"][0]
+        | {
+            "_id": f"image-{i:02d}",
+            "uploaded_at": (start + dt.timedelta(days=i)).isoformat(),
+        }
+        for i in range(20)
+    ]
+
+    def list_page(request: Any) -> tuple[int, dict, str]:
+        ordered = results if request.params.get("sort") == "asc" else results[::-1]
+        limit = int(request.params["limit"])
+        page = int(request.params.get("page", 1))
+        return (
+            200,
+            {},
+            json.dumps(
+                {
+                    "meta": {"found": len(results)},
+                    "results": ordered[(page - 1) * limit : page * limit],
+                }
+            ),
+        )
+
+    client = OamMetadataClient.new(api_root="http://test.test/meta")
+    responses.add_callback(responses.GET, client.api_root, callback=list_page)
+    uploaded_after = start + dt.timedelta(days=8)
+
+    with patch("stactools.hotosm.cli.OAM_PAGE_SIZE", 2):
+        ids = [
+            item.id
+            for index in range(4)
+            for item in get_oam_items_after(
+                client, uploaded_after, BackfillShard(index, 4)
+            )
+        ]
+    assert ids == [f"image-{i:02d}" for i in range(8, 20)]
+
+
+def test_dump_oam_backfill_slices_and_merge(
+    example_oam_metadata: OamMetadata, tmp_path: Path
+):
+    """Ensure slices of a backfill are dumped with records, checked and merged."""
+    slices = {0: ["a", "b"], 1: ["b", "c"]}
+
+    def get_oam_items_after(
+        _client: Any, _uploaded_after: dt.datetime, shard: Any
+    ) -> list[OamMetadata]:
+        records = []
+        for item_id in slices[shard.index]:
+            record = OamMetadata(**vars(example_oam_metadata))
+            record.id = item_id
+            records.append(record)
+        return records
+
+    records = []
+    for index in slices:
+        file = tmp_path / f"items-{index}.ndjson"
+        with (
+            patch(
+                "stactools.hotosm.cli.get_oam_items_after",
+                side_effect=get_oam_items_after,
+            ),
+            patch("stactools.hotosm.stac.create_item", side_effect=fake_create_item),
+        ):
+            result = CliRunner().invoke(
+                main,
+                [
+                    "dump-oam",
+                    "--file",
+                    str(file),
+                    "--uploaded-after",
+                    "2020-01-01",
+                    "--shard",
+                    f"{index}/2",
+                ],
+            )
+        assert result.exit_code == 0, result.output
+        records.append(str(file.with_name(f"{file.name}.backfill.json")))
+
+    result = CliRunner().invoke(main, ["merge-backfill", records[0]])
+    assert result.exit_code != 0
+    assert "Incomplete backfill: missing 1/2" in result.output
+
+    # "e" was uploaded after the slices were listed, so it is not checked
+    upstream = []
+    for item_id, uploaded_at in [
+        ("e", dt.datetime(2100, 1, 1, tzinfo=dt.UTC)),
+        ("d", dt.datetime(2021, 1, 4, tzinfo=dt.UTC)),
+        ("c", dt.datetime(2021, 1, 3, tzinfo=dt.UTC)),
+        ("b", dt.datetime(2021, 1, 2, tzinfo=dt.UTC)),
+        ("a", dt.datetime(2021, 1, 1, tzinfo=dt.UTC)),
+    ]:
+        record = OamMetadata(**vars(example_oam_metadata))
+        record.id = item_id
+        record.uploaded_at = uploaded_at
+        upstream.append(record)
+
+    output = tmp_path / "merged.ndjson"
+    missing = tmp_path / "missing.txt"
+    with patch(
+        "stactools.hotosm.oam_metadata_client.OamMetadataClient.new"
+    ) as new_client:
+        new_client.return_value.get_all_items.return_value = iter(upstream)
+        result = CliRunner().invoke(
+            main,
+            [
+                "merge-backfill",
+                *records,
+                "--output",
+                str(output),
+                "--missing",
+                str(missing),
+                "--strict",
+            ],
+        )
+    assert result.exit_code != 0
+    assert "Found 4 upstream records" in result.output
+    assert "1 missing, 1 duplicated and 0 not upstream" in result.output
+    new_client.return_value.get_all_items.assert_called_once_with(
+        dt.datetime(2020, 1, 1, tzinfo=dt.UTC)
+    )
+    assert missing.read_text() == "d\n"
+    assert [json.loads(line)["id"] for line in output.read_text().splitlines()] == [
+        "a",
+        "b",
+        "c",
+    ]
+
+
+def test_dump_oam_backfill_slice_requires_ndjson(tmp_path: Path):
+    """Ensure slices of a backfill are not dumped to formats that cannot be merged."""
+    result = CliRunner().invoke(
+        main,
+        [
+            "dump-oam",
+            "--file",
+            str(tmp_path / "items.parquet"),
+            "--format",
+            "geoparquet",
+            "--uploaded-since",
+            "3600",
+            "--shard",
+            "0/2",
+        ],
+    )
+    assert result.exit_code != 0
+    assert "--shard is only supported for NDJSON dumps" in result.output
+
+    result = CliRunner().invoke(
+        main, ["dump-oam", "--file", "items.ndjson", "--shard", "2/2"]
+    )
+    assert result.exit_code != 0
+    assert "Expected 0 <= I < N in I/N" in result.output
+
+
+def test_sync_oam_skip_existing(
+    oam_metadata_records: list[OamMetadata], tmp_path: Path
+):
+    """Ensure STAC Items already in PgSTAC are only created with --force."""
+    existing_ids_file = tmp_path / "existing-ids.bin"
+
+    def sync(*args: str) -> tuple[Any, list[str]]:
+        loaded: list[dict] = []
+        with (
+            patch(
+                "stactools.hotosm.cli.get_oam_items_after",
+                return_value=iter(oam_metadata_records),
+            ),
+            patch("stactools.hotosm.stac.create_item", side_effect=fake_create_item),
+            patch("pypgstac.load.Loader") as loader,
+            patch(
+                "stactools.hotosm.reconcile.iter_pgstac_ids", return_value=iter(["a"])
+            ) as iter_pgstac_ids,
+        ):
+            loader.return_value.load_items.side_effect = lambda items, **_: (
+                loaded.extend(items)
+            )
+            result = CliRunner().invoke(
+                main,
+                [
+                    "sync-oam",
+                    "--uploaded-since",
+                    "3600",
+                    "--handle-exceptions",
+                    "IGNORE",
+                    "--skip-existing",
+                    "--existing-ids-file",
+                    str(existing_ids_file),
+                    *args,
+                    *PGSTAC_OPTIONS,
+                ],
+            )
+        assert result.exit_code == 0, result.output
+        assert iter_pgstac_ids.call_count <= 1
+        return result, [item["id"] for item in loaded]
+
+    result, loaded = sync()
+    assert "Skipped 1 STAC Items already in PgSTAC" in result.output
+    assert loaded == ["b"]
+
+    # STAC Items loaded by the previous run are added to the cache
+    result, loaded = sync()
+    assert "Skipped 2 STAC Items already in PgSTAC" in result.output
+    assert loaded == []
+
+    result, loaded = sync("--force")
+    assert loaded == ["a", "b"]
+
+
+def test_sync_oam_plan(oam_metadata_records: list[OamMetadata]):
+    """Ensure --plan only lists records, without creating or loading STAC Items."""
+    for record in oam_metadata_records:
+        record.image_file_size = 1_500_000_000
+    with (
+        patch(
+            "stactools.hotosm.cli.get_oam_items_after",
+            return_value=iter(oam_metadata_records),
+        ),
+        patch("stactools.hotosm.stac.create_item") as create_item,
+        patch("pypgstac.load.Loader") as loader,
+        patch("stactools.hotosm.reconcile.iter_pgstac_ids", return_value=iter(["a"])),
+    ):
+        result = CliRunner().invoke(
+            main,
+            [
+                "--check-assets",
+                "sync-oam",
+                "--uploaded-since",
+                "3600",
+                "--plan",
+                *PGSTAC_OPTIONS,
+            ],
+        )
+    assert result.exit_code == 0, result.output
+    assert "OAM: 3 upstream records, 1 in PgSTAC, 2 STAC Items to create" in (
+        result.output
+    )
+    assert "Imagery of the STAC Items to create: 3.0 GB" in result.output
+    assert "2 imagery opens, 4 asset checks" in result.output
+    create_item.assert_not_called()
+    loader.return_value.load_items.assert_not_called()
+
+
+def test_sync_catalogs_concurrently(oam_metadata_records: list[OamMetadata]):
+    """Ensure several catalogs are synced with one loader."""
+    maxar_items = [
+        pystac.Item(
+            id=f"event/{i}",
+            geometry=None,
+            bbox=None,
+            datetime=dt.datetime(2024, 1, 1, tzinfo=dt.UTC),
+            properties={},
+        )
+        for i in range(3)
+    ]
+    loaded: list[dict] = []
+    with (
+        patch(
+            "stactools.hotosm.cli.get_oam_items_after",
+            return_value=iter(oam_metadata_records),
+        ),
+        patch(
+            "stactools.hotosm.cli.get_maxar_items_after",
+            return_value=iter(maxar_items),
+        ),
+        patch("stactools.hotosm.stac.create_item", side_effect=fake_create_item),
+        patch(
+            "stactools.hotosm.maxar.stac.create_item",
+            side_effect=lambda item, **_: item,
+        ),
+        patch("pypgstac.load.Loader") as loader,
+    ):
+        loader.return_value.load_items.side_effect = lambda items, **_: loaded.extend(
+            items
+        )
+        result = CliRunner().invoke(
+            main,
+            [
+                "sync",
+                "--catalog",
+                "OAM",
+                "--catalog",
+                "Maxar",
+                "--uploaded-since",
+                "3600",
+                "--handle-exceptions",
+                "IGNORE",
+                *PGSTAC_OPTIONS,
+            ],
+        )
+    assert result.exit_code == 0, result.output
+    assert "Completed ingesting 5 STAC Items" in result.output
+    assert loader.call_count == 1
+    assert sorted((item["collection"], item["id"]) for item in loaded) == [
+        ("maxar-opendata", "event/0"),
+        ("maxar-opendata", "event/1"),
+        ("maxar-opendata", "event/2"),
+        ("openaerialmap", "a"),
+        ("openaerialmap", "b"),
+    ]
+
+
+def test_sync_catalogs_skip_existing(
+    oam_metadata_records: list[OamMetadata], tmp_path: Path
+):
+    """Ensure each catalog keeps its own extent and cache of existing IDs."""
+    # IDs are already those of the created STAC Items, which create_item keeps
+    maxar_items = [
+        pystac.Item(
+            id=f"event-{i}",
+            geometry=None,
+            bbox=[0, 0, 1, 1],
+            datetime=dt.datetime(2024, 1, 1, tzinfo=dt.UTC),
+            properties={},
+        )
+        for i in range(2)
+    ]
+    in_pgstac = {"openaerialmap": ["a"], "maxar-opendata": ["event-0"]}
+
+    def sync() -> tuple[Any, list[str]]:
+        loaded: list[dict] = []
+        with (
+            patch(
+                "stactools.hotosm.cli.get_oam_items_after",
+                return_value=iter(oam_metadata_records),
+            ),
+            patch(
+                "stactools.hotosm.cli.get_maxar_items_after",
+                return_value=iter(maxar_items),
+            ),
+            patch("stactools.hotosm.stac.create_item", side_effect=fake_create_item),
+            patch(
+                "stactools.hotosm.maxar.stac.create_item",
+                side_effect=lambda item, **_: item,
+            ),
+            patch("pypgstac.load.Loader") as loader,
+            patch(
+                "stactools.hotosm.reconcile.iter_pgstac_ids",
+                side_effect=lambda _db, collection_id: iter(in_pgstac[collection_id]),
+            ) as iter_pgstac_ids,
+        ):
+            loader.return_value.load_items.side_effect = lambda items, **_: (
+                loaded.extend(items)
+            )
+            result = CliRunner().invoke(
+                main,
+                [
+                    "sync",
+                    "--catalog",
+                    "OAM",
+                    "--catalog",
+                    "Maxar",
+                    "--uploaded-since",
+                    "3600",
+                    "--handle-exceptions",
+                    "IGNORE",
+                    "--skip-existing",
+                    "--existing-ids-file",
+                    str(tmp_path / "existing-ids.bin"),
+                    "--extent-file",
+                    str(tmp_path / "extent.json"),
+                    *PGSTAC_OPTIONS,
+                ],
+            )
+        assert result.exit_code == 0, result.output
+        return iter_pgstac_ids.call_count, sorted(item["id"] for item in loaded)
+
+    assert sync() == (2, ["b", "event-1"])
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "existing-ids-maxar.bin",
+        "existing-ids-oam.bin",
+        "extent-maxar.json",
+        "extent-oam.json",
+    ]
+
+    # STAC Items loaded by the previous run are added to the caches
+    assert sync() == (0, [])
+
+
+def test_sync_stops_when_a_catalog_fails(oam_metadata_records: list[OamMetadata]):
+    """Ensure errors raised by one catalog fail the sync."""
+    with (
+        patch(
+            "stactools.hotosm.cli.get_oam_items_after",
+            return_value=iter(oam_metadata_records),
+        ),
+        patch("stactools.hotosm.stac.create_item", side_effect=fake_create_item),
+        patch("pypgstac.load.Loader") as loader,
+    ):
+        loader.return_value.load_items.side_effect = lambda items, **_: list(items)
+        result = CliRunner().invoke(
+            main,
+            ["sync", "--catalog", "OAM", "--uploaded-since", "3600", *PGSTAC_OPTIONS],
+        )
+    assert result.exit_code == 1
+    assert "OAM failed: ValueError: broken upstream metadata" in result.output
+
+
+# Time budget for importing the CLI and rendering its help text, including starting
+# the interpreter. This is generous to avoid flakiness on slow CI machines; the
+# assertion on which modules were imported is the sharper regression check.
+CLI_STARTUP_BUDGET_SECONDS = 2.0
+HEAVY_MODULES = ["pypgstac", "psycopg", "pystac", "rasterio", "requests", "rio_stac"]
+
+
+def test_cli_startup_is_lightweight():
+    """Ensure `hotosm --help` does not import heavy dependencies."""
+    script = f"""
+import json, sys
+from stactools.hotosm.cli import main
+try:
+    main(["--help"])
+except SystemExit:
+    pass
+print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))
+"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    )
+    elapsed = time.perf_counter() - start
+
+    assert json.loads(proc.stdout.splitlines()[-1]) == []
+    assert elapsed < CLI_STARTUP_BUDGET_SECONDS
+
+
+def test_unknown_json_serializer_env():
+    """Ensure an unknown serializer in the environment is reported as a usage error."""
+    script = """
+from stactools.hotosm.cli import main
+main(["dump-collection", "--help"])
+"""
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "HOTOSM_JSON_SERIALIZER": "bogus"},
+    )
+
+    assert proc.returncode == 2
+    assert "Traceback" not in proc.stderr
+    assert "Invalid value for '--json-serializer'" in proc.stderr
@@ -0,0 +1,104 @@
+"""Tests for `stactools.hotosm.concurrency`."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from stactools.hotosm.concurrency import AimdLimiter, AimdOptions, ConcurrencyController
+from stactools.hotosm.metrics import CONCURRENCY_DECREASES, CONCURRENCY_LIMIT, METRICS
+
+
+def test_limit_increases_additively():
+    """Ensure the limit grows by about one per limit's worth of successes."""
+    limiter = AimdLimiter("example.com", AimdOptions(initial_limit=4))
+    for _ in range(4):
+        with limiter.request() as request:
+            request.record_status(200)
+
+    assert limiter.limit == pytest.approx(5, abs=0.1)
+    assert METRICS.gauges[CONCURRENCY_LIMIT][(("host", "example.com"),)] == (
+        limiter.limit
+    )
+
+
+def test_limit_decreases_multiplicatively():
+    """Ensure overload signals cut the limit, once per round trip."""
+    limiter = AimdLimiter("overloaded.example.com", AimdOptions(initial_limit=8))
+    with limiter.request() as request:
+        time.sleep(0.05)
+        request.record_status(429)
+    assert limiter.limit == 4
+
+    # A failure from the same round trip does not cut the limit again
+    with limiter.request() as request:
+        request.record_status(503)
+    assert limiter.limit == 4
+
+    time.sleep(0.05)
+    with pytest.raises(ConnectionError), limiter.request():
+        raise ConnectionError("reset by peer")
+    assert limiter.limit == 2
+    assert (
+        METRICS.counter_total(CONCURRENCY_DECREASES, host="overloaded.example.com") == 2
+    )
+
+
+def test_limit_bounds():
+    """Ensure the limit stays within its bounds."""
+    options = AimdOptions(initial_limit=2, min_limit=1, max_limit=3)
+    limiter = AimdLimiter("example.com", options)
+    for _ in range(20):
+        with limiter.request():
+            pass
+    assert limiter.limit == 3
+
+    for _ in range(5):
+        limiter._last_decrease = 0.0
+        with limiter.request() as request:
+            request.record_status(500)
+    assert limiter.limit == 1
+
+
+def test_limit_in_flight_requests():
+    """Ensure no more requests than the limit are in flight."""
+    limiter = AimdLimiter("example.com", AimdOptions(initial_limit=2, max_limit=2))
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def request(_: int) -> None:
+        nonlocal in_flight, max_in_flight
+        with limiter.request():
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.005)
+            with lock:
+                in_flight -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(request, range(40)))
+
+    assert max_in_flight == 2
+    assert limiter.in_flight == 0
+
+
+def test_controller_limits_per_host():
+    """Ensure each host has its own limiter and local files are not limited."""
+    controller = ConcurrencyController()
+    with controller.request("https://api.openaerialmap.org/meta?page=1") as request:
+        request.record_status(429)
+    with controller.request("https://oin-hotosm.s3.amazonaws.com/image.tif"):
+        pass
+    with controller.request("/data/image.tif"):
+        pass
+
+    assert set(controller.limiters) == {
+        "api.openaerialmap.org",
+        "oin-hotosm.s3.amazonaws.com",
+    }
+    assert controller.limiters["api.openaerialmap.org"].limit < (
+        controller.limiters["oin-hotosm.s3.amazonaws.com"].limit
+    )
@@ -0,0 +1,158 @@
+"""Tests for `stactools.hotosm.deadletter`."""
+
+import dataclasses
+import datetime as dt
+import threading
+import time
+from pathlib import Path
+
+import pystac
+import pytest
+
+from stactools.hotosm.deadletter import (
+    DeadLetter,
+    DeadLetters,
+    group_by_collection,
+    read_dead_letters,
+    retry_dead_letters,
+)
+
+
+def make_dead_letter(item_id: str, collection: str = "test") -> DeadLetter:
+    """Dead letter for a record that failed to be created."""
+    return DeadLetter(
+        collection=collection,
+        id=item_id,
+        stage="create_item",
+        error="ValueError",
+        message="broken upstream metadata",
+    )
+
+
+def test_from_exception():
+    """Ensure the ID and location of failed records are recorded."""
+    item = pystac.Item(
+        id="maxar-item",
+        geometry=None,
+        bbox=None,
+        datetime=dt.datetime(2024, 1, 1, tzinfo=dt.UTC),
+        properties={},
+        href="https://example.com/maxar-item.json",
+    )
+    dead_letter = DeadLetter.from_exception(
+        "test", item, "create_item", KeyError("proj:epsg")
+    )
+
+    assert dead_letter.id == "maxar-item"
+    assert dead_letter.href == "https://example.com/maxar-item.json"
+    assert dead_letter.error == "KeyError"
+    assert str(dead_letter) == "maxar-item (create_item) KeyError: 'proj:epsg'"
+
+
+def test_dead_letters_stream_to_file(tmp_path: Path):
+    """Ensure failures are appended to the file and only a few are kept."""
+    path = tmp_path / "dead-letter.ndjson"
+    with DeadLetters(path, max_reported=2) as dead_letters:
+        for i in range(5):
+            dead_letters.add(make_dead_letter(f"item-{i}"))
+    with DeadLetters(path) as dead_letters:
+        dead_letters.add(make_dead_letter("item-5"))
+
+    assert len(dead_letters) == 1
+    assert [dead_letter.id for dead_letter in read_dead_letters(path)] == [
+        f"item-{i}" for i in range(6)
+    ]
+
+
+def test_dead_letters_without_file():
+    """Ensure failures are counted without a dead-letter file."""
+    dead_letters = DeadLetters(max_reported=2)
+    for i in range(5):
+        dead_letters.add(make_dead_letter(f"item-{i}"))
+
+    assert dead_letters.count == 5
+    assert [dead_letter.id for dead_letter in dead_letters.reported] == [
+        "item-0",
+        "item-1",
+    ]
+
+
+def test_retry_dead_letters():
+    """Ensure records are retried concurrently and repeated failures recorded."""
+    dead_letters = [make_dead_letter(f"item-{i}") for i in range(50)]
+    threads: set[int] = set()
+    lock = threading.Lock()
+
+    def fetch(dead_letter: DeadLetter) -> str:
+        with lock:
+            threads.add(threading.get_ident())
+        time.sleep(0.001)
+        if dead_letter.id == "item-3":
+            raise ConnectionError("upstream unavailable")
+        return dead_letter.id
+
+    def create(record: str) -> pystac.Item:
+        if record == "item-7":
+            raise ValueError("still broken")
+        return pystac.Item(
+            id=record,
+            geometry=None,
+            bbox=None,
+            datetime=dt.datetime(2024, 1, 1, tzinfo=dt.UTC),
+            properties={},
+        )
+
+    failures = DeadLetters()
+    items = list(retry_dead_letters(dead_letters, fetch, create, 4, failures))
+
+    assert len(items) == 48
+    assert all(item["collection"] == "test" for item in items)
+    assert {item["id"] for item in items} == {
+        f"item-{i}" for i in range(50) if i not in {3, 7}
+    }
+    assert sorted((f.id, f.stage, f.error) for f in failures.reported) == [
+        ("item-3", "fetch", "ConnectionError"),
+        ("item-7", "create_item", "ValueError"),
+    ]
+    assert 1 < len(threads) <= 4
+
+
+def test_group_by_collection():
+    """Ensure failures are grouped by Collection, preserving their order."""
+    groups = group_by_collection(
+        [
+            make_dead_letter("a", "openaerialmap"),
+            make_dead_letter("b", "maxar"),
+            make_dead_letter("c", "openaerialmap"),
+        ]
+    )
+
+    assert {
+        collection: [dead_letter.id for dead_letter in dead_letters]
+        for collection, dead_letters in groups.items()
+    } == {"openaerialmap": ["a", "c"], "maxar": ["b"]}
+
+
+def test_group_by_collection_deduplicates(tmp_path: Path):
+    """Ensure records that failed in several runs are only retried once."""
+    path = tmp_path / "dead-letters.ndjson"
+    for stage in ("fetch", "create_item"):
+        with DeadLetters(path) as dead_letters:
+            dead_letters.add(make_dead_letter("a"))
+            dead_letters.add(dataclasses.replace(make_dead_letter("b"), stage=stage))
+    with DeadLetters(path) as dead_letters:
+        dead_letters.add(make_dead_letter("b", "maxar"))
+
+    groups = group_by_collection(read_dead_letters(path))
+
+    assert [dead_letter.id for dead_letter in groups["test"]] == ["a", "b"]
+    assert groups["test"][1].stage == "create_item"
+    assert [dead_letter.id for dead_letter in groups["maxar"]] == ["b"]
+
+
+def test_dead_letter_round_trip():
+    """Ensure dead letters survive serialization."""
+    dead_letter = make_dead_letter("item")
+    assert DeadLetter.from_dict(dead_letter.to_dict()) == dead_letter
+    with pytest.raises(TypeError):
+        DeadLetter.from_dict({"id": "item"})
@@ -0,0 +1,154 @@
+"""Tests for `stactools.hotosm.dump`."""
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from stactools.hotosm.dump import (
+    Manifest,
+    dump_items,
+    dump_to_geoparquet,
+    dump_to_ndjson,
+    manifest_path,
+    shard_path,
+)
+from stactools.hotosm.serialize import dumps
+
+
+def test_dump_to_ndjson(tmp_path: Path, make_items: Callable[[int], list[dict]]):
+    """Ensure each STAC Item is written as a line of JSON."""
+    items = make_items(3)
+    path = tmp_path / "items.ndjson"
+
+    assert dump_to_ndjson(path, iter(items)) == 3
+    assert [json.loads(line) for line in path.read_text().splitlines()] == items
+
+
+def test_dump_to_ndjson_gzip(tmp_path: Path, make_items: Callable[[int], list[dict]]):
+    """Ensure NDJSON is compressed based on the file suffix."""
+    items = make_items(3)
+    path = tmp_path / "items.ndjson.gz"
+
+    assert dump_to_ndjson(path, iter(items)) == 3
+    with gzip.open(path, "rt") as src:
+        assert [json.loads(line) for line in src] == items
+
+
+def test_dump_to_ndjson_zstd(tmp_path: Path, make_items: Callable[[int], list[dict]]):
+    """Ensure NDJSON can be compressed with zstd."""
+    zstandard = pytest.importorskip("zstandard")
+    items = make_items(3)
+    path = tmp_path / "items.ndjson.zst"
+
+    assert dump_to_ndjson(path, iter(items)) == 3
+    with zstandard.open(path, "rt") as src:
+        assert [json.loads(line) for line in src] == items
+
+
+def test_shard_and_manifest_paths():
+    """Ensure shards are numbered before all suffixes."""
+    path = Path("dumps/items.ndjson.gz")
+    assert shard_path(path, 12) == Path("dumps/items-00012.ndjson.gz")
+    assert manifest_path(path) == Path("dumps/items.manifest.json")
+
+
+def test_dump_to_ndjson_sharded_by_items(
+    tmp_path: Path, make_items: Callable[[int], list[dict]]
+):
+    """Ensure STAC Items are split into shards listed in a manifest."""
+    items = make_items(5)
+    path = tmp_path / "items.ndjson.gz"
+
+    assert dump_to_ndjson(path, iter(items), shard_items=2) == 5
+    assert not path.exists()
+
+    manifest = Manifest.read(manifest_path(path))
+    assert manifest.compression == "gzip"
+    assert manifest.count == 5
+    assert [shard.count for shard in manifest.shards] == [2, 2, 1]
+
+    loaded: list[dict] = []
+    for i, shard in enumerate(manifest.shards):
+        shard_file = tmp_path / shard.path
+        assert shard_file == shard_path(path, i)
+        assert shard.bytes == shard_file.stat().st_size
+        assert shard.sha256 == hashlib.sha256(shard_file.read_bytes()).hexdigest()
+        with gzip.open(shard_file, "rt") as src:
+            loaded.extend(json.loads(line) for line in src)
+    assert loaded == items
+
+
+def test_dump_to_ndjson_sharded_by_bytes(
+    tmp_path: Path, make_items: Callable[[int], list[dict]]
+):
+    """Ensure a new shard is started once a shard exceeds the byte limit."""
+    items = make_items(4)
+    path = tmp_path / "items.ndjson"
+    line_bytes = len(dumps(items[0])) + 1
+
+    dump_to_ndjson(path, iter(items), shard_bytes=line_bytes * 2)
+
+    manifest = Manifest.read(manifest_path(path))
+    assert manifest.compression is None
+    assert [shard.count for shard in manifest.shards] == [2, 2]
+
+
+def test_dump_to_ndjson_sharded_failure(
+    tmp_path: Path, make_items: Callable[[int], list[dict]]
+):
+    """Ensure a sharded dump that fails part way through has no manifest."""
+    path = tmp_path / "items.ndjson"
+    dump_to_ndjson(path, iter(make_items(2)), shard_items=2)
+    assert manifest_path(path).exists()
+
+    def failing_items():
+        yield from make_items(3)
+        raise RuntimeError("upstream failed")
+
+    with pytest.raises(RuntimeError, match="upstream failed"):
+        dump_to_ndjson(path, failing_items(), shard_items=2)
+
+    assert not manifest_path(path).exists()
+    # The open shard is still closed, so the STAC Items written to it are readable
+    assert len(shard_path(path, 1).read_text().splitlines()) == 1
+
+
+def test_dump_to_geoparquet(tmp_path: Path, make_items: Callable[[int], list[dict]]):
+    """Ensure STAC Items are written in row groups with typed columns."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    pytest.importorskip("stac_geoparquet")
+
+    items = make_items(5)
+    path = tmp_path / "items.parquet"
+
+    assert dump_to_geoparquet(path, iter(items), row_group_size=2) == 5
+
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 3
+    geo = json.loads(parquet.schema_arrow.metadata[b"geo"])
+    assert geo["columns"]["geometry"]["encoding"] == "WKB"
+
+    table = parquet.read()
+    assert str(table.schema.field("geometry").type) == "binary"
+    assert str(table.schema.field("gsd").type) == "double"
+    assert table.column("id").to_pylist() == [item["id"] for item in items]
+    assert table.column("platform").to_pylist() == [None, "uav", None, "uav", None]
+
+
+def test_dump_to_geoparquet_without_items(tmp_path: Path):
+    """Ensure no file is written without any STAC Items."""
+    pytest.importorskip("stac_geoparquet")
+
+    path = tmp_path / "items.parquet"
+    assert dump_to_geoparquet(path, iter([])) == 0
+    assert not path.exists()
+
+
+def test_dump_items_unknown_format(tmp_path: Path):
+    """Ensure unknown formats are rejected."""
+    with pytest.raises(ValueError, match="Unknown dump format"):
+        dump_items(tmp_path / "items", [], format="csv")  # type: ignore[arg-type]
@@ -0,0 +1,103 @@
+"""Tests for `stactools.hotosm.dump_index`."""
+
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from stactools.hotosm.dump import dump_to_ndjson, shard_path
+from stactools.hotosm.dump_index import IndexedDump, build_index, index_path
+
+
+def test_dump_with_index(tmp_path: Path, make_items: Callable[[int], list[dict]]):
+    """Ensure STAC Items can be read by position and ID from an indexed dump."""
+    items = make_items(50)
+    path = tmp_path / "items.ndjson"
+    dump_to_ndjson(path, items, index=True)
+
+    with IndexedDump(path) as dump:
+        assert len(dump) == 50
+        assert dump.item(7) == items[7]
+        assert list(dump) == items
+        assert dump.get("item-42") == items[42]
+        assert dump.get("missing") is None
+        assert "item-0" in dump
+        with pytest.raises(IndexError):
+            dump.line(50)
+
+
+def test_build_index_matches_dump_index(
+    tmp_path: Path, make_items: Callable[[int], list[dict]]
+):
+    """Ensure indexing an existing dump gives the same index as while dumping."""
+    path = tmp_path / "items.ndjson"
+    dump_to_ndjson(path, make_items(20), index=True)
+    written = index_path(path).read_bytes()
+
+    assert build_index(path) == 20
+    assert index_path(path).read_bytes() == written
+
+
+def test_index_sharded_dump(tmp_path: Path, make_items: Callable[[int], list[dict]]):
+    """Ensure each shard of a dump is indexed."""
+    items = make_items(10)
+    path = tmp_path / "items.ndjson"
+    dump_to_ndjson(path, items, shard_items=4, index=True)
+
+    with IndexedDump(shard_path(path, 2)) as dump:
+        assert list(dump) == items[8:]
+        assert dump.get("item-9") == items[9]
+
+
+def test_index_empty_dump(tmp_path: Path):
+    """Ensure dumps without STAC Items can be indexed."""
+    path = tmp_path / "items.ndjson"
+    dump_to_ndjson(path, [], index=True)
+
+    with IndexedDump(path) as dump:
+        assert len(dump) == 0
+        assert dump.get("item-0") is None
+        assert dump.split(4) == []
+
+
+@pytest.mark.parametrize("chunks", [1, 3, 8, 100])
+def test_split_is_balanced_on_record_boundaries(
+    tmp_path: Path, chunks: int, make_items: Callable[[int], list[dict]]
+):
+    """Ensure splits cover the dump with ranges starting on record boundaries."""
+    path = tmp_path / "items.ndjson"
+    dump_to_ndjson(path, make_items(40), index=True)
+    data = path.read_bytes()
+
+    with IndexedDump(path) as dump:
+        ranges = dump.split(chunks)
+        assert 1 <= len(ranges) <= min(chunks, len(dump))
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == len(data)
+        for (_, end), (start, _) in zip(ranges, ranges[1:], strict=False):
+            assert end == start
+            assert data[start - 1 : start] == b"\n"
+        if chunks <= 8:
+            # Ranges are within a line of the ideal size
+            longest_line = max(len(line) for line in data.splitlines(keepends=True))
+            for start, end in ranges:
+                assert abs((end - start) - len(data) / chunks) <= longest_line
+
+
+def test_out_of_date_index(tmp_path: Path, make_items: Callable[[int], list[dict]]):
+    """Ensure an index is not used once its dump has changed."""
+    path = tmp_path / "items.ndjson"
+    dump_to_ndjson(path, make_items(3), index=True)
+    with path.open("ab") as dst:
+        dst.write(b'{"id": "appended"}\n')
+
+    with pytest.raises(ValueError, match="out of date"):
+        IndexedDump(path)
+
+
+def test_compressed_dumps_cannot_be_indexed(
+    tmp_path: Path, make_items: Callable[[int], list[dict]]
+):
+    """Ensure indexes are only written for uncompressed dumps."""
+    with pytest.raises(ValueError, match="uncompressed"):
+        dump_to_ndjson(tmp_path / "items.ndjson.gz", make_items(1), index=True)
@@ -0,0 +1,175 @@
+"""Tests for `stactools.hotosm.events`."""
+
+import http.client
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from stactools.hotosm.events import (
+    EventQueue,
+    MemoryQueue,
+    SqliteQueue,
+    WebhookReceiver,
+    next_batch,
+    parse_event_ids,
+    run_consumer,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def queue(request: pytest.FixtureRequest, tmp_path: Path) -> EventQueue:
+    """Each queue backend."""
+    if request.param == "memory":
+        return MemoryQueue()
+    return SqliteQueue(tmp_path / "events.sqlite")
+
+
+def test_queue_leases_events(queue: EventQueue):
+    """Ensure leased events are hidden until acknowledged or their lease expires."""
+    assert queue.put(["a", "b", "c"]) == 3
+    first = queue.get(2, lease_seconds=60)
+    assert [event.id for event in first] == ["a", "b"]
+    assert [event.id for event in queue.get(2, lease_seconds=0)] == ["c"]
+
+    # "c" was leased for no time at all, so it is delivered again
+    assert [event.id for event in queue.get(10, lease_seconds=60)] == ["c"]
+    assert queue.depth() == 3
+
+    queue.ack(first)
+    assert queue.depth() == 1
+    assert queue.get(10, lease_seconds=60) == []
+
+
+def test_sqlite_queue_is_shared(tmp_path: Path):
+    """Ensure events put by one process can be consumed by another."""
+    path = tmp_path / "events.sqlite"
+    producer = SqliteQueue(path)
+    producer.put(["a"])
+    producer.close()
+
+    consumer = SqliteQueue(path)
+    events = consumer.get(10, lease_seconds=60)
+    assert [event.id for event in events] == ["a"]
+    consumer.ack(events)
+    assert consumer.depth() == 0
+
+
+@pytest.mark.parametrize(
+    "body,ids",
+    [
+        ({"id": "a"}, ["a"]),
+        ({"ids": ["a", "b"]}, ["a", "b"]),
+        (["a", "b"], ["a", "b"]),
+    ],
+)
+def test_parse_event_ids(body: object, ids: list[str]):
+    """Ensure each notification format is accepted."""
+    assert parse_event_ids(body) == ids
+
+
+@pytest.mark.parametrize("body", [{}, {"ids": [1]}, [""], "a", None])
+def test_parse_event_ids_invalid(body: object):
+    """Ensure malformed notifications are rejected."""
+    with pytest.raises(ValueError):
+        parse_event_ids(body)
+
+
+def post(url: str, body: object, token: str | None = None) -> tuple[int, dict]:
+    """POST JSON and return the status and JSON response."""
+    request = urllib.request.Request(url, data=json.dumps(body).encode())
+    if token is not None:
+        request.add_header("Authorization", f"Bearer {token}")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_webhook_receiver():
+    """Ensure notifications POSTed to the webhook are queued."""
+    queue = MemoryQueue()
+    receiver = WebhookReceiver(queue, port=0, token="secret").start()
+    host, port = receiver.address
+    url = f"http://{host}:{port}/"
+    try:
+        assert post(url, {"ids": ["a", "b"]}, token="secret") == (202, {"queued": 2})
+        assert post(url, {"id": "a"})[0] == 401
+        assert post(url, {"name": "a"}, token="secret")[0] == 400
+        with urllib.request.urlopen(f"{url}healthz") as response:
+            assert json.load(response) == {"depth": 2}
+    finally:
+        receiver.stop()
+
+    assert [event.id for event in queue.get(10, lease_seconds=60)] == ["a", "b"]
+
+
+@pytest.mark.parametrize(
+    "content_length, status",
+    [(None, 411), ("abc", 400), ("-1", 400), ("1000000000", 413)],
+)
+def test_webhook_receiver_rejects_bad_content_length(
+    content_length: str | None, status: int
+):
+    """Ensure bodies of invalid or missing length are rejected without reading."""
+    queue = MemoryQueue()
+    receiver = WebhookReceiver(queue, port=0).start()
+    connection = http.client.HTTPConnection(*receiver.address, timeout=5)
+    try:
+        connection.putrequest("POST", "/")
+        if content_length is not None:
+            connection.putheader("Content-Length", content_length)
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == status
+        assert "error" in json.load(response)
+    finally:
+        connection.close()
+        receiver.stop()
+
+    assert queue.depth() == 0
+
+
+def test_next_batch_waits_for_batch_to_fill():
+    """Ensure a batch is filled up to its size or for a limited time."""
+    queue = MemoryQueue()
+    queue.put(["a", "b", "c"])
+    stop = threading.Event()
+    batch = next_batch(queue, batch_size=2, batch_seconds=60, stop=stop)
+    assert [event.id for event in batch] == ["a", "b"]
+
+    batch = next_batch(queue, batch_size=2, batch_seconds=0.01, stop=stop)
+    assert [event.id for event in batch] == ["c"]
+
+    stop.set()
+    assert next_batch(queue, batch_size=2, batch_seconds=0, stop=stop) == []
+
+
+def test_run_consumer_acks_ingested_batches():
+    """Ensure events are only removed once their batch has been ingested."""
+    queue = MemoryQueue()
+    queue.put(["a", "a", "b"])
+    batches: list[list[str]] = []
+
+    def ingest(ids: list[str]) -> None:
+        batches.append(ids)
+        if len(batches) == 1:
+            raise RuntimeError("database unavailable")
+
+    # A failed batch is delivered again once its lease has expired
+    count = run_consumer(
+        queue,
+        ingest,
+        batch_size=10,
+        batch_seconds=0,
+        stop=threading.Event(),
+        lease_seconds=0.01,
+        max_batches=2,
+    )
+    assert count == 2
+    assert batches == [["a", "b"], ["a", "b"]]
+    assert queue.depth() == 0
@@ -0,0 +1,88 @@
+"""Tests for `stactools.hotosm.existing`."""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from stactools.hotosm.existing import ExistingIds
+
+
+def test_membership():
+    """Ensure IDs are found whatever the order they were added in."""
+    existing = ExistingIds.from_ids(f"id-{i}" for i in range(1000, 0, -1))
+    assert len(existing) == 1000
+    assert "id-1" in existing
+    assert "id-1000" in existing
+    assert "id-0" not in existing
+    assert "id-1001" not in existing
+    assert 1 not in existing
+
+    existing.update(["id-0", "new"])
+    assert len(existing) == 1002
+    assert "id-0" in existing
+    assert "new" in existing
+    assert list(existing.hashes) == sorted(existing.hashes)
+
+
+def test_empty():
+    """Ensure an empty set holds nothing."""
+    existing = ExistingIds()
+    assert len(existing) == 0
+    assert "a" not in existing
+
+
+def test_save_and_read(tmp_path: Path):
+    """Ensure the set round-trips through its cache file."""
+    path = tmp_path / "ids.bin"
+    existing = ExistingIds.from_ids(["a", "b", "c"], path)
+    existing.save()
+    assert path.stat().st_size == 16 + 3 * 8
+
+    read = ExistingIds.read(path)
+    assert read.path == path
+    assert list(read.hashes) == list(existing.hashes)
+    assert "b" in read
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"",
+        b"NOTIDS01" + (0).to_bytes(8, "little"),
+        # Truncated after the header
+        b"HOTIDS01" + (5).to_bytes(8, "little") + bytes(8),
+    ],
+)
+def test_read_invalid(content: bytes, tmp_path: Path):
+    """Ensure files that are not caches of IDs are rejected."""
+    path = tmp_path / "ids.bin"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        ExistingIds.read(path)
+
+
+def test_load_uses_fresh_cache(tmp_path: Path):
+    """Ensure PgSTAC is only read when the cache is missing or stale."""
+    path = tmp_path / "ids.bin"
+    with patch(
+        "stactools.hotosm.reconcile.iter_pgstac_ids", return_value=iter(["a", "b"])
+    ) as iter_pgstac_ids:
+        existing = ExistingIds.load(MagicMock(), "collection", path)
+        assert "a" in existing
+        assert iter_pgstac_ids.call_count == 1
+        assert path.exists()
+
+        iter_pgstac_ids.return_value = iter(["c"])
+        existing = ExistingIds.load(MagicMock(), "collection", path)
+        assert "a" in existing
+        assert iter_pgstac_ids.call_count == 1
+
+        stale = time.time() - 2 * 24 * 60 * 60
+        os.utime(path, (stale, stale))
+        existing = ExistingIds.load(MagicMock(), "collection", path)
+        assert "a" not in existing
+        assert "c" in existing
+        assert iter_pgstac_ids.call_count == 2
@@ -0,0 +1,101 @@
+"""Tests for `stactools.hotosm.extent`."""
+
+import datetime as dt
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from stactools.hotosm.extent import ExtentAggregator
+
+
+def test_add_items(make_item: Callable[..., dict]):
+    """Ensure the extent covers the bbox and datetimes of all STAC Items."""
+    extent = ExtentAggregator()
+    extent.add(
+        make_item(0, bbox=[0, 0, 1, 1], properties={"datetime": "2024-05-01T00:00:00Z"})
+    )
+    extent.add(
+        make_item(
+            1,
+            bbox=[-10, 5, 0, -5, 20, 100],
+            properties={
+                "start_datetime": "2020-01-01T00:00:00Z",
+                "end_datetime": "2020-02-01T00:00:00+00:00",
+            },
+        )
+    )
+    extent.add(
+        make_item(0, bbox=[2, -3, 4, 0], properties={"datetime": "2022-01-01T00:00:00"})
+    )
+
+    assert extent.count == 3
+    assert extent.bbox == [-10, -3, 4, 20]
+    assert extent.start == dt.datetime(2020, 1, 1, tzinfo=dt.UTC)
+    assert extent.end == dt.datetime(2024, 5, 1, tzinfo=dt.UTC)
+
+    stac_extent = extent.to_extent()
+    assert stac_extent.spatial.bboxes == [[-10, -3, 4, 20]]
+    assert stac_extent.temporal.intervals == [[extent.start, extent.end]]
+
+
+def test_merge(make_item: Callable[..., dict]):
+    """Ensure aggregated extents can be combined."""
+    first = ExtentAggregator()
+    first.add(
+        make_item(0, bbox=[0, 0, 1, 1], properties={"datetime": "2024-05-01T00:00:00Z"})
+    )
+    second = ExtentAggregator()
+    second.add(
+        make_item(0, bbox=[5, 5, 6, 6], properties={"datetime": "2023-05-01T00:00:00Z"})
+    )
+
+    first.merge(second)
+    first.merge(ExtentAggregator())
+
+    assert first.count == 2
+    assert first.bbox == [0, 0, 6, 6]
+    assert first.start == dt.datetime(2023, 5, 1, tzinfo=dt.UTC)
+    assert first.end == dt.datetime(2024, 5, 1, tzinfo=dt.UTC)
+
+
+def test_antimeridian(make_item: Callable[..., dict]):
+    """Ensure bboxes crossing the antimeridian extend the extent to both sides."""
+    extent = ExtentAggregator()
+    extent.add(make_item(0, bbox=[0, 0, 10, 10]))
+    extent.add(make_item(0, bbox=[170, -5, -170, 5]))
+
+    assert extent.bbox == [-180, -5, 180, 10]
+
+    crossing = ExtentAggregator(bbox=[170, -5, -170, 5])
+    other = ExtentAggregator()
+    other.merge(crossing)
+    assert other.bbox == [-180, -5, 180, 5]
+
+
+def test_save_and_load(tmp_path: Path, make_item: Callable[..., dict]):
+    """Ensure the extent accumulates across runs through its file."""
+    path = tmp_path / "extent.json"
+    extent = ExtentAggregator.load(path)
+    assert extent.count == 0
+    extent.add(
+        make_item(0, bbox=[0, 0, 1, 1], properties={"datetime": "2024-05-01T00:00:00Z"})
+    )
+    extent.save()
+
+    extent = ExtentAggregator.load(path)
+    extent.add(
+        make_item(0, bbox=[1, 1, 2, 2], properties={"datetime": "2024-06-01T00:00:00Z"})
+    )
+    extent.save()
+
+    loaded = ExtentAggregator.load(path)
+    assert loaded.count == 2
+    assert loaded.bbox == [0, 0, 2, 2]
+    assert loaded.end == dt.datetime(2024, 6, 1, tzinfo=dt.UTC)
+
+
+def test_empty_extent():
+    """Ensure an extent is not created without any STAC Items."""
+    with pytest.raises(ValueError, match="without any STAC Items"):
+        ExtentAggregator().to_extent()
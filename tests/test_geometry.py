@@ -0,0 +1,88 @@
+"""Tests for `stactools.hotosm.geometry`."""
+
+import pytest
+
+from stactools.hotosm.geometry import (
+    GeometryOptions,
+    geometry_savings,
+    optimize_geometry,
+)
+from stactools.hotosm.metrics import GEOMETRY_VERTICES, METRICS
+from stactools.hotosm.serialize import dumps
+
+# A square with a noisy edge of many nearly collinear vertices
+NOISY_SQUARE = {
+    "type": "Polygon",
+    "coordinates": [
+        [
+            [-80.4248105123, -0.980146199999],
+            *(
+                [-80.4248105123 + i * 0.0001, -0.980146199999 + 1e-9 * (i % 2)]
+                for i in range(1, 60)
+            ),
+            [-80.418725308, -0.980146199999],
+            [-80.418725308, -0.9748217],
+            [-80.4248105123, -0.9748217],
+            [-80.4248105123, -0.980146199999],
+        ]
+    ],
+}
+
+
+def test_options_enabled():
+    """Ensure geometries are only optimized if an option is set."""
+    assert not GeometryOptions().enabled
+    assert GeometryOptions(precision=6).enabled
+    assert GeometryOptions(simplify_tolerance=0.0).enabled
+
+
+def test_optimize_geometry_precision():
+    """Ensure coordinates are rounded and the bbox is recomputed."""
+    geometry, bbox = optimize_geometry(NOISY_SQUARE, GeometryOptions(precision=5))
+
+    for x, y in geometry["coordinates"][0]:
+        assert round(x, 5) == x
+        assert round(y, 5) == y
+    assert bbox == [-80.42481, -0.98015, -80.41873, -0.97482]
+
+
+def test_optimize_geometry_simplify():
+    """Ensure simplification removes redundant vertices, preserving the shape."""
+    geometry, bbox = optimize_geometry(
+        NOISY_SQUARE, GeometryOptions(simplify_tolerance=1e-6)
+    )
+
+    assert len(geometry["coordinates"][0]) == 5
+    assert bbox == pytest.approx(
+        [-80.4248105123, -0.980146199999, -80.418725308, -0.9748217]
+    )
+
+
+def test_optimize_geometry_keeps_collapsed_geometry():
+    """Ensure a geometry that would collapse at the precision is kept as-is."""
+    tiny = {
+        "type": "Polygon",
+        "coordinates": [[[0.1, 0.1], [0.1001, 0.1], [0.1001, 0.1001], [0.1, 0.1]]],
+    }
+    geometry, bbox = optimize_geometry(tiny, GeometryOptions(precision=2))
+
+    assert geometry == tiny
+    assert bbox == [0.1, 0.1, 0.1001, 0.1001]
+
+
+def test_geometry_savings():
+    """Ensure the size of geometries before and after is recorded."""
+    METRICS.reset()
+    geometry, _ = optimize_geometry(
+        NOISY_SQUARE,
+        GeometryOptions(precision=6, simplify_tolerance=1e-6),
+        collection="test",
+    )
+
+    before, after = geometry_savings()
+    assert before == len(dumps(NOISY_SQUARE))
+    assert after == len(dumps(geometry))
+    assert after < before
+    assert METRICS.counter_total(GEOMETRY_VERTICES, stage="output") == 5
+    assert METRICS.counter_total(GEOMETRY_VERTICES, stage="input") == 64
+    METRICS.reset()
@@ -0,0 +1,143 @@
+"""Tests for `stactools.hotosm.load`."""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pytest
+
+from stactools.hotosm.dump import dump_to_ndjson, manifest_path
+from stactools.hotosm.load import LoadState, LoadTask, load_tasks, plan_tasks
+from stactools.hotosm.serialize import dumps
+
+
+class FakeDB:
+    """Stand-in for `PgstacDB` tracking whether it was disconnected."""
+
+    def __init__(self) -> None:
+        """Create a connected fake database."""
+        self.connected = True
+
+    def disconnect(self) -> None:
+        """Disconnect from the fake database."""
+        self.connected = False
+
+
+class FakeLoader:
+    """Stand-in for a PgSTAC `Loader` recording loaded STAC Items."""
+
+    def __init__(
+        self, loaded: list[dict], lock: threading.Lock, fail_ids: set[str]
+    ) -> None:
+        """Record STAC Items into a shared list."""
+        self.db = FakeDB()
+        self.loaded = loaded
+        self.lock = lock
+        self.fail_ids = fail_ids
+
+    def load_items(self, items: Iterator[dict], **_kwargs: Any) -> None:
+        """Record STAC Items, failing for some STAC Item IDs."""
+        for item in items:
+            if item["id"] in self.fail_ids:
+                raise ValueError("could not load")
+            with self.lock:
+                self.loaded.append(item)
+
+
+def run(
+    tasks: list[LoadTask],
+    state: LoadState | None = None,
+    fail_ids: frozenset[str] = frozenset(),
+) -> tuple[list[dict], Any]:
+    """Load tasks with fake loaders failing to load some STAC Items."""
+    loaded: list[dict] = []
+    lock = threading.Lock()
+    loaders: list[FakeLoader] = []
+
+    def new_loader() -> FakeLoader:
+        loader = FakeLoader(loaded, lock, set(fail_ids))
+        loaders.append(loader)
+        return loader
+
+    result = load_tasks(tasks, new_loader, workers=3, state=state)  # type: ignore[arg-type]
+    assert not any(loader.db.connected for loader in loaders)
+    return loaded, result
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 7, 50, 10_000])
+def test_byte_ranges_load_each_item_once(
+    tmp_path: Path, chunk_bytes: int, make_items: Callable[[int], list[dict]]
+):
+    """Ensure byte ranges split an NDJSON file without losing or repeating lines."""
+    items = make_items(20)
+    path = tmp_path / "items.ndjson"
+    dump_to_ndjson(path, items)
+
+    tasks = plan_tasks([path], chunk_bytes=chunk_bytes)
+    assert len(tasks) == -(-path.stat().st_size // chunk_bytes)
+
+    loaded, result = run(tasks)
+    assert sorted(item["id"] for item in loaded) == sorted(item["id"] for item in items)
+    assert result.count == 20
+    assert result.bytes == path.stat().st_size
+
+
+def test_indexed_files_are_split_on_item_boundaries(
+    tmp_path: Path, make_items: Callable[[int], list[dict]]
+):
+    """Ensure the index of a dump aligns byte ranges with STAC Items."""
+    items = make_items(20)
+    path = tmp_path / "items.ndjson"
+    dump_to_ndjson(path, items, index=True)
+    data = path.read_bytes()
+
+    tasks = plan_tasks([path], chunk_bytes=100)
+    assert len(tasks) > 1
+    assert all(
+        task.start == 0 or data[task.start - 1 : task.start] == b"\n" for task in tasks
+    )
+
+    loaded, result = run(tasks)
+    assert sorted(item["id"] for item in loaded) == sorted(item["id"] for item in items)
+    assert result.bytes == len(data)
+
+
+def test_manifest_shards_are_verified(
+    tmp_path: Path, make_items: Callable[[int], list[dict]]
+):
+    """Ensure shards are loaded whole and checked against the manifest."""
+    path = tmp_path / "items.ndjson.gz"
+    dump_to_ndjson(path, make_items(5), shard_items=2)
+
+    tasks = plan_tasks([manifest_path(path)])
+    assert [task.end for task in tasks] == [None, None, None]
+
+    corrupted = (
+        tmp_path / json.loads(manifest_path(path).read_text())["shards"][0]["path"]
+    )
+    corrupted.write_bytes(corrupted.read_bytes()[:-1])
+
+    loaded, result = run(tasks)
+    assert len(loaded) == 3
+    assert list(result.failed) == [str(corrupted)]
+    assert "does not match" in result.failed[str(corrupted)]
+
+
+def test_resume_skips_completed_tasks(
+    tmp_path: Path, make_items: Callable[[int], list[dict]]
+):
+    """Ensure completed tasks are recorded and skipped when resuming."""
+    items = make_items(6)
+    path = tmp_path / "items.ndjson"
+    dump_to_ndjson(path, items)
+    tasks = plan_tasks([path], chunk_bytes=len(dumps(items[0])) + 1)
+    state_file = tmp_path / "state.ndjson"
+
+    _, result = run(tasks, LoadState(state_file), fail_ids=frozenset({"item-4"}))
+    assert len(result.failed) == 1
+
+    loaded, result = run(tasks, LoadState(state_file))
+    assert [item["id"] for item in loaded] == ["item-4"]
+    assert len(result.skipped) == len(tasks) - 1
+    assert not result.failed
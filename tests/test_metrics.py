@@ -0,0 +1,99 @@
+"""Tests for `stactools.hotosm.metrics`."""
+
+import json
+from pathlib import Path
+
+import pytest
+import responses
+
+from stactools.hotosm.metrics import (
+    HTTP_REQUESTS,
+    HTTP_RESPONSE_BYTES,
+    METRICS,
+    PEAK_RSS,
+    STAGE_DURATION,
+    STAGE_ERRORS,
+    Histogram,
+    MetricsRegistry,
+)
+from stactools.hotosm.oam_metadata_client import OamMetadataClient
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    """Empty metrics registry."""
+    return MetricsRegistry()
+
+
+def test_histogram_cumulative():
+    """Ensure histogram buckets are cumulative and end with +Inf."""
+    hist = Histogram(buckets=(1.0, 10.0))
+    for value in (0.5, 1.0, 5.0, 50.0):
+        hist.observe(value)
+
+    assert hist.cumulative() == [("1", 2), ("10", 3), ("+Inf", 4)]
+    assert hist.sum == 56.5
+
+
+def test_timer_counts_errors_by_class(registry: MetricsRegistry):
+    """Ensure timed stages record durations and errors."""
+    with registry.timer("projection"):
+        pass
+    with pytest.raises(ValueError), registry.timer("projection"):
+        raise ValueError("boom")
+
+    hist = registry.histograms[STAGE_DURATION][(("stage", "projection"),)]
+    assert hist.count == 2
+    assert registry.counters[STAGE_ERRORS] == {
+        (("error", "ValueError"), ("stage", "projection")): 1
+    }
+
+
+def test_to_prometheus(registry: MetricsRegistry):
+    """Ensure metrics render in the Prometheus text format."""
+    registry.inc(HTTP_REQUESTS, client="oam", status="200")
+    registry.inc(HTTP_REQUESTS, client="oam", status="200")
+    registry.observe(STAGE_DURATION, 0.2, stage="fetch")
+
+    text = registry.to_prometheus()
+    assert "# TYPE hotosm_http_requests_total counter" in text
+    assert 'hotosm_http_requests_total{client="oam",status="200"} 2' in text
+    assert "# TYPE hotosm_stage_duration_seconds histogram" in text
+    assert 'hotosm_stage_duration_seconds_bucket{stage="fetch",le="0.25"} 1' in text
+    assert 'hotosm_stage_duration_seconds_bucket{stage="fetch",le="+Inf"} 1' in text
+    assert 'hotosm_stage_duration_seconds_count{stage="fetch"} 1' in text
+    assert f"{PEAK_RSS} " in text
+
+
+def test_export(registry: MetricsRegistry, tmp_path: Path):
+    """Ensure metrics are written to both export formats."""
+    registry.inc(HTTP_REQUESTS, client="oam", status="200")
+    prom = tmp_path / "hotosm.prom"
+    summary = tmp_path / "metrics.json"
+
+    registry.export(prometheus_path=prom, json_path=summary)
+
+    assert "hotosm_http_requests_total" in prom.read_text()
+    data = json.loads(summary.read_text())
+    assert data["counters"] == [
+        {
+            "name": HTTP_REQUESTS,
+            "labels": {"client": "oam", "status": "200"},
+            "value": 1,
+        }
+    ]
+    assert data["gauges"][0]["name"] == PEAK_RSS
+
+
+@responses.activate
+def test_oam_client_records_requests(example_oam_meta_api_response: dict):
+    """Ensure the OAM metadata client records request metrics."""
+    METRICS.reset()
+    client = OamMetadataClient.new(api_root="http://test.test/test")
+    responses.get(url=client.api_root, json=example_oam_meta_api_response)
+
+    client.get_count()
+
+    labels = (("client", "oam"), ("status", "200"))
+    assert METRICS.counters[HTTP_REQUESTS][labels] == 1
+    assert METRICS.counters[HTTP_RESPONSE_BYTES][(("client", "oam"),)] > 0
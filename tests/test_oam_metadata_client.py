@@ -144,6 +144,55 @@ class TestOamMetadataClient:
         for resp in resps:
             assert resp.call_count == 1
 
+    @responses.activate
+    def test_get_all_items_page_range(
+        self,
+        test_client: OamMetadataClient,
+        example_oam_meta_api_response: dict,
+    ):
+        """Ensure only a range of pages is listed, in the requested order."""
+        results = example_oam_meta_api_response["results"]
+        resps = [
+            responses.get(
+                url=test_client.api_root,
+                json={
+                    "meta": example_oam_meta_api_response["meta"],
+                    "results": results[2 * (page - 1) : 2 * page],
+                },
+                match=[
+                    query_param_matcher(
+                        {"page": page, "sort": "asc"}, strict_match=False
+                    )
+                ],
+            )
+            for page in range(1, 6)
+        ]
+
+        items = list(
+            test_client.get_all_items(limit=2, first_page=2, last_page=3, sort="asc")
+        )
+        assert [item.id for item in items] == [result["_id"] for result in results[2:6]]
+        assert [resp.call_count for resp in resps] == [0, 1, 1, 0, 0]
+
+    @responses.activate
+    def test_get_all_ids(
+        self,
+        test_client: OamMetadataClient,
+        example_oam_meta_api_response: dict,
+    ):
+        """Ensure the IDs of all images are listed, including unparseable ones."""
+        example_oam_meta_api_response["results"][0]["acquisition_start"] = None
+        self.make_response_pages(
+            api_root=test_client.api_root,
+            api_responses=example_oam_meta_api_response,
+            n_per_page=3,
+        )
+
+        ids = list(test_client.get_all_ids(limit=3))
+        assert ids == [
+            result["_id"] for result in example_oam_meta_api_response["results"]
+        ]
+
     @responses.activate
     def test_get_items_uploaded_after(
         self,
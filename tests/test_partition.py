@@ -0,0 +1,56 @@
+"""Tests for `stactools.hotosm.partition`."""
+
+import random
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from stactools.hotosm.partition import order_by_partition, partition_key
+
+
+def test_partition_key(make_item: Callable[..., dict]):
+    """Ensure STAC Items are keyed by Collection and month."""
+    item = make_item(0, "oam", properties={"datetime": "2025-03-04T05:06:07Z"})
+    assert partition_key(item) == ("oam", "2025-03")
+
+    item["properties"] = {
+        "datetime": None,
+        "start_datetime": "2024-12-31T00:00:00Z",
+        "end_datetime": "2025-01-01T00:00:00Z",
+    }
+    assert partition_key(item) == ("oam", "2024-12")
+
+
+@pytest.mark.parametrize("buffer_items", [1, 7, 1000])
+def test_order_by_partition(
+    tmp_path: Path, buffer_items: int, make_item: Callable[..., dict]
+):
+    """Ensure STAC Items are grouped by partition, spilling to disk if needed."""
+    rng = random.Random(0)
+    items = [
+        make_item(
+            i,
+            rng.choice(["oam", "maxar"]),
+            properties={
+                "datetime": (
+                    f"20{rng.randint(20, 25)}-{rng.randint(1, 12):02d}-01T00:00:00Z"
+                )
+            },
+        )
+        for i in range(100)
+    ]
+
+    ordered = list(order_by_partition(iter(items), buffer_items, spill_dir=tmp_path))
+
+    assert sorted(item["id"] for item in ordered) == sorted(
+        item["id"] for item in items
+    )
+    keys = [partition_key(item) for item in ordered]
+    assert keys == sorted(keys)
+    # The original order is kept within each partition
+    for key in set(keys):
+        ids = [items.index(item) for item in ordered if partition_key(item) == key]
+        assert ids == sorted(ids)
+    # Spilled runs are cleaned up
+    assert list(tmp_path.iterdir()) == []
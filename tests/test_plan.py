@@ -0,0 +1,69 @@
+"""Tests for `stactools.hotosm.plan`."""
+
+import datetime as dt
+
+import pystac
+
+from stactools.hotosm.existing import ExistingIds
+from stactools.hotosm.oam_metadata import OamMetadata
+from stactools.hotosm.plan import Plan, plan_maxar, plan_oam
+
+
+def test_plan_oam(example_oam_metadata: OamMetadata):
+    """Ensure existing STAC Items are neither opened, checked nor counted in size."""
+    records = []
+    for item_id, size in (("a", 10), ("b", 20), ("c", 30)):
+        record = OamMetadata(**vars(example_oam_metadata))
+        record.id = item_id
+        record.image_file_size = size
+        records.append(record)
+
+    plan = plan_oam(records, ExistingIds.from_ids(["b", "z"]), check_assets=True)
+    assert plan.records == 3
+    assert plan.existing == 1
+    assert plan.to_create == 2
+    assert plan.asset_bytes == 40
+    assert plan.asset_opens == 2
+    assert plan.asset_checks == 4
+
+    plan = plan_oam(records)
+    assert plan.existing is None
+    assert plan.asset_bytes == 60
+    assert plan.asset_checks == 0
+
+
+def test_plan_maxar():
+    """Ensure Maxar STAC Items are counted from links, recursively."""
+
+    def item(item_id: str) -> pystac.Item:
+        return pystac.Item(
+            id=item_id,
+            geometry=None,
+            bbox=None,
+            datetime=dt.datetime(2023, 1, 1, tzinfo=dt.UTC),
+            properties={},
+        )
+
+    event = pystac.Catalog(id="event", description="event")
+    event.add_item(item("a"))
+    acquisition = pystac.Catalog(id="acquisition", description="acquisition")
+    acquisition.add_items([item("b"), item("c")])
+    event.add_child(acquisition)
+    other = pystac.Catalog(id="other", description="other")
+
+    plan = plan_maxar([event, other], check_assets=True)
+    assert plan.records == 3
+    assert plan.listing_requests == 4
+    assert plan.record_reads == 3
+    assert plan.asset_opens == 0
+    assert plan.existing is None
+    assert plan.asset_checks is None
+
+
+def test_plan_summary():
+    """Ensure unknown estimates are reported as such."""
+    summary = Plan("Maxar", records=1200, listing_requests=3).summary()
+    assert "Maxar: 1,200 upstream records, unknown, 1,200 STAC Items to create" in (
+        summary
+    )
+    assert "Imagery of the STAC Items to create: unknown" in summary
@@ -0,0 +1,88 @@
+"""Tests for `stactools.hotosm.profiling`."""
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from stactools.hotosm.metrics import MetricsRegistry
+from stactools.hotosm.oam_metadata import OamMetadata
+from stactools.hotosm.profiling import (
+    ItemTiming,
+    RunProfiler,
+    SlowItemLog,
+    timed_iter,
+    trace_item,
+)
+
+
+def test_slow_item_log_keeps_slowest():
+    """Ensure only the N slowest items are kept, slowest first."""
+    log = SlowItemLog(top_n=2)
+    for total in (1.0, 5.0, 3.0, 0.5):
+        log.record(ItemTiming(total=total, item_id=str(total)))
+
+    assert [timing.item_id for timing in log.slowest()] == ["5.0", "3.0"]
+
+
+def test_trace_item_records_steps(example_oam_metadata: OamMetadata):
+    """Ensure stages timed within a traced item are attributed to it."""
+    log = SlowItemLog()
+    registry = MetricsRegistry()
+
+    with trace_item(log, example_oam_metadata, fetch_seconds=0.5):
+        with registry.timer("projection"):
+            pass
+        with registry.timer("validation"):
+            pass
+
+    (timing,) = log.slowest()
+    assert timing.item_id == example_oam_metadata.id
+    assert timing.hrefs == [
+        example_oam_metadata.image_url,
+        example_oam_metadata.thumbnail_url,
+        example_oam_metadata.metadata_url,
+    ]
+    assert set(timing.steps) == {"fetch", "projection", "validation"}
+    assert timing.total >= 0.5
+
+
+def test_trace_item_records_failures(example_oam_metadata: OamMetadata):
+    """Ensure failed items are recorded along with their error."""
+    log = SlowItemLog()
+    with pytest.raises(ValueError), trace_item(log, example_oam_metadata):
+        raise ValueError("boom")
+
+    (timing,) = log.slowest()
+    assert timing.error == "ValueError: boom"
+
+
+def test_timed_iter():
+    """Ensure each value is yielded with the time spent producing it."""
+
+    def slow():
+        time.sleep(0.01)
+        yield "a"
+        yield "b"
+
+    (a, a_seconds), (b, _) = timed_iter(slow())
+    assert (a, b) == ("a", "b")
+    assert a_seconds >= 0.01
+
+
+def test_run_profiler_writes_reports(tmp_path: Path):
+    """Ensure the profiler writes the cProfile output and reports."""
+    log = SlowItemLog()
+    log.record(ItemTiming(total=1.0, item_id="foo", hrefs=["foo.tif"]))
+    profiler = RunProfiler(tmp_path / "profile", log)
+
+    profiler.start()
+    sum(range(1000))
+    profiler.stop()
+
+    assert (tmp_path / "profile" / "hotosm.prof").exists()
+    assert "cumulative" in (tmp_path / "profile" / "hotosm-stats.txt").read_text()
+    report = json.loads((tmp_path / "profile" / "slow-items.json").read_text())
+    assert report[0]["id"] == "foo"
+    assert report[0]["hrefs"] == ["foo.tif"]
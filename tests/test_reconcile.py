@@ -0,0 +1,94 @@
+"""Tests for `stactools.hotosm.reconcile`."""
+
+import random
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from stactools.hotosm.reconcile import (
+    delete_items,
+    diff_sorted,
+    read_ids,
+    reconcile,
+    sorted_ids,
+)
+
+
+@pytest.mark.parametrize("buffer_ids", [1, 7, 1000])
+def test_sorted_ids(buffer_ids: int, tmp_path: Path):
+    """Ensure IDs are sorted and deduplicated, whether or not runs are spilled."""
+    ids = [f"id-{i}" for i in range(100)] * 2
+    random.Random(0).shuffle(ids)
+
+    result = list(sorted_ids(ids, buffer_ids=buffer_ids, spill_dir=tmp_path))
+    assert result == sorted(set(ids))
+    # Spilled runs are removed once merged
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("buffer_ids", [1, 1000])
+def test_sorted_ids_rejects_line_breaks(buffer_ids: int):
+    """Ensure IDs that cannot be spilled one per line are rejected, spilled or not."""
+    with pytest.raises(ValueError, match="line breaks"):
+        list(sorted_ids(["a", "b\nc"], buffer_ids=buffer_ids))
+
+
+def test_sorted_ids_spills_any_characters(tmp_path: Path):
+    """Ensure IDs with carriage returns and non-ASCII characters are spilled whole."""
+    ids = ["b\rc", "ñandú-🛰️", "a\r", "d\u2028e"]
+
+    assert list(sorted_ids(ids, buffer_ids=1, spill_dir=tmp_path)) == sorted(ids)
+
+
+def test_diff_sorted():
+    """Ensure IDs only on one side are reported in order."""
+    upstream = ["a", "b", "b", "d", "f"]
+    catalog = ["b", "c", "d", "e", "g"]
+    assert list(diff_sorted(upstream, catalog)) == [
+        ("missing", "a"),
+        ("orphan", "c"),
+        ("orphan", "e"),
+        ("missing", "f"),
+        ("orphan", "g"),
+    ]
+
+
+def test_diff_sorted_requires_sorted_ids():
+    """Ensure an unsorted stream raises rather than reporting wrong orphans."""
+    with pytest.raises(ValueError, match="catalog IDs are not sorted"):
+        list(diff_sorted(["a", "b"], ["b", "a"]))
+
+
+def test_reconcile(tmp_path: Path):
+    """Ensure orphans and missing IDs are written and counted."""
+    orphans = tmp_path / "orphans.txt"
+    missing = tmp_path / "missing.txt"
+    upstream = [f"{i:04d}" for i in range(0, 1000, 2)]
+    random.Random(0).shuffle(upstream)
+    catalog = [f"{i:04d}" for i in range(0, 1000, 3)]
+
+    result = reconcile(
+        upstream, catalog, orphans, missing, buffer_ids=64, spill_dir=tmp_path
+    )
+    expected_orphans = [f"{i:04d}" for i in range(0, 1000, 3) if i % 2]
+    expected_missing = [f"{i:04d}" for i in range(0, 1000, 2) if i % 3]
+    assert result.upstream == 500
+    assert result.catalog == 334
+    assert result.orphans == len(expected_orphans)
+    assert result.missing == len(expected_missing)
+    assert list(read_ids(orphans)) == expected_orphans
+    assert list(read_ids(missing)) == expected_missing
+
+
+def test_delete_items():
+    """Ensure IDs are deleted in batches, one transaction each."""
+    db = MagicMock()
+    conn = db.connect.return_value
+    conn.execute.return_value.rowcount = 2
+
+    deleted = delete_items(db, "collection", iter(["a", "b", "c"]), batch_size=2)
+    assert deleted == 4
+    batches = [call.args[1][1] for call in conn.execute.call_args_list]
+    assert batches == [["a", "b"], ["c"]]
+    assert conn.transaction.call_count == 2
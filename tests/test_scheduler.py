@@ -0,0 +1,72 @@
+"""Tests for `stactools.hotosm.scheduler`."""
+
+import itertools
+import threading
+from typing import Iterator
+
+import pytest
+
+from stactools.hotosm.scheduler import ProducerError, merge_producers
+
+
+def running(*names: str) -> list[threading.Thread]:
+    """Threads with any of these names that are still running."""
+    return [thread for thread in threading.enumerate() if thread.name in names]
+
+
+def test_merge_producers():
+    """Ensure all values are yielded, in order for each producer."""
+    values = list(
+        merge_producers(
+            {
+                "a": lambda: (("a", i) for i in range(100)),
+                "b": lambda: (("b", i) for i in range(50)),
+                "empty": lambda: [],
+            },
+            buffer_per_producer=3,
+        )
+    )
+    assert len(values) == 150
+    for name in ("a", "b"):
+        assert [i for n, i in values if n == name] == sorted(
+            i for n, i in values if n == name
+        )
+
+
+def test_producers_run_concurrently():
+    """Ensure producers do not wait on each other."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def producer(name: str) -> Iterator[str]:
+        # Deadlocks unless both producers run at the same time
+        barrier.wait()
+        yield name
+
+    values = merge_producers({"a": lambda: producer("a"), "b": lambda: producer("b")})
+    assert sorted(values) == ["a", "b"]
+
+
+def test_failed_producer_stops_the_others():
+    """Ensure a failure is raised and stops endless producers."""
+
+    def failing() -> Iterator[int]:
+        yield 1
+        raise ValueError("upstream is down")
+
+    with pytest.raises(ProducerError, match="failing failed: ValueError") as info:
+        list(
+            merge_producers(
+                {"endless": lambda: itertools.count(), "failing": failing},
+                buffer_per_producer=2,
+            )
+        )
+    assert isinstance(info.value.error, ValueError)
+    assert not running("hotosm-endless", "hotosm-failing")
+
+
+def test_consumer_stopping_early_stops_producers():
+    """Ensure producers stop when the consumer closes the iterator."""
+    values = merge_producers({"endless": lambda: itertools.count()})
+    assert next(values) == 0
+    values.close()
+    assert not running("hotosm-endless", "hotosm-failing")
@@ -0,0 +1,101 @@
+"""Tests for `stactools.hotosm.serialize`."""
+
+import json
+import math
+import random
+from typing import Any
+
+import pytest
+
+from stactools.hotosm.serialize import (
+    STDLIB_SERIALIZER,
+    current_serializer,
+    get_serializer,
+    use_serializer,
+)
+
+EXAMPLE: dict[str, Any] = {
+    "type": "Feature",
+    "id": "ñandú-🛰️",
+    "bbox": [-80.4248105, -0.980146199999, 1e-05, 1.857e-7],
+    "properties": {
+        "gsd": 1.5e-05,
+        "big": 1e16,
+        "negative": -2.5e-12,
+        "zero": -0.0,
+        "nan": math.nan,
+        "count": 2**62,
+        "escapes": 'quote " backslash \\ newline \n tab \t bell \x07',
+        "nested": [True, False, None, {"a": []}],
+    },
+}
+FINITE_EXAMPLE: dict[str, Any] = {
+    **EXAMPLE,
+    "properties": {
+        key: value for key, value in EXAMPLE["properties"].items() if key != "nan"
+    },
+}
+
+
+def test_stdlib_serializer_is_compact_json():
+    """Ensure the standard library serializer writes valid, compact JSON."""
+    data = STDLIB_SERIALIZER.dumps(FINITE_EXAMPLE)
+
+    assert json.loads(data) == FINITE_EXAMPLE
+    assert STDLIB_SERIALIZER.dumps(EXAMPLE["properties"]["nested"]) == (
+        b'[true,false,null,{"a":[]}]'
+    )
+    assert "ñandú-🛰️".encode() in data
+    with pytest.raises(ValueError):
+        STDLIB_SERIALIZER.dumps(EXAMPLE)
+
+
+def test_serializers_are_byte_compatible():
+    """Ensure orjson and the standard library only differ in float formatting."""
+    pytest.importorskip("orjson")
+    orjson = get_serializer("orjson")
+    rng = random.Random(0)
+    floats = [rng.random() * 10 ** rng.randint(-25, 25) for _ in range(10_000)]
+    floats += [10.0**exponent for exponent in range(-30, 30)]
+    # Floats that `repr` writes without an exponent
+    decimal_floats = [value for value in floats if 1e-4 <= value < 1e16]
+    assert decimal_floats
+
+    no_exponents = {
+        **FINITE_EXAMPLE,
+        "bbox": FINITE_EXAMPLE["bbox"][:2],
+        "properties": {
+            key: value
+            for key, value in FINITE_EXAMPLE["properties"].items()
+            if key not in ("gsd", "big", "negative")
+        },
+    }
+    assert orjson.dumps(no_exponents) == STDLIB_SERIALIZER.dumps(no_exponents)
+    assert orjson.dumps(decimal_floats) == STDLIB_SERIALIZER.dumps(decimal_floats)
+
+    # Floats in scientific notation are formatted differently, to the same values
+    assert orjson.dumps([1e-7, 1e-5]) == b"[1e-7,0.00001]"
+    assert STDLIB_SERIALIZER.dumps([1e-7, 1e-5]) == b"[1e-07,1e-05]"
+    assert orjson.loads(STDLIB_SERIALIZER.dumps(floats)) == floats
+    assert json.loads(orjson.dumps(floats)) == floats
+    assert json.loads(orjson.dumps(FINITE_EXAMPLE)) == json.loads(
+        STDLIB_SERIALIZER.dumps(FINITE_EXAMPLE)
+    )
+
+    # NaN is not valid JSON: orjson writes null where the standard library raises
+    assert json.loads(orjson.dumps(EXAMPLE))["properties"]["nan"] is None
+    with pytest.raises(ValueError):
+        STDLIB_SERIALIZER.dumps(EXAMPLE)
+
+
+def test_use_serializer():
+    """Ensure the current serializer can be changed."""
+    previous = current_serializer()
+    try:
+        assert use_serializer("json") is STDLIB_SERIALIZER
+        assert current_serializer() is STDLIB_SERIALIZER
+    finally:
+        use_serializer(previous.name)
+
+    with pytest.raises(ValueError, match="not available"):
+        get_serializer("simdjson")
@@ -1,12 +1,15 @@
 """Tests for `stactools.hotosm.stac` module."""
 
 import datetime as dt
+import threading
 from unittest.mock import patch
 
 import pytest
 from pystac.utils import str_to_datetime
 
-from stactools.hotosm.exceptions import AssetNotFoundError
+from stactools.hotosm.asset_reads import AssetReadOptions
+from stactools.hotosm.exceptions import AssetNotFoundError, AssetTimeoutError
+from stactools.hotosm.geometry import GeometryOptions
 from stactools.hotosm.oam_metadata import OamMetadata
 from stactools.hotosm.stac import create_collection, create_item
 
@@ -34,12 +37,37 @@ def test_create_item(example_oam_image: OamMetadata):
     assert "alternate" not in item.assets["visual"].extra_fields
 
 
+def test_create_item_optimizes_geometry(example_oam_image: OamMetadata):
+    """Test Item creation with quantized coordinates."""
+    item = create_item(example_oam_image, GeometryOptions(precision=3))
+
+    assert item.geometry is not None
+    for x, y in item.geometry["coordinates"][0]:
+        assert round(x, 3) == x
+        assert round(y, 3) == y
+    assert item.bbox == [round(value, 3) for value in example_oam_image.bbox]
+
+
 def test_create_item_raises_asset_not_found(example_oam_metadata: OamMetadata):
     """Test that create_item() raises AssetNotFoundError."""
     with pytest.raises(AssetNotFoundError, match=r"Asset does not exist.*"):
         create_item(example_oam_metadata)
 
 
+def test_create_item_raises_asset_timeout(example_oam_metadata: OamMetadata):
+    """Test that create_item() fails if reading an asset exceeds its deadline."""
+    release = threading.Event()
+    with (
+        patch(
+            "stactools.hotosm.asset_reads._read",
+            side_effect=lambda *_: release.wait(5),
+        ),
+        pytest.raises(AssetTimeoutError),
+    ):
+        create_item(example_oam_metadata, read_options=AssetReadOptions(deadline=0.05))
+    release.set()
+
+
 @patch("stactools.hotosm.stac._add_projection_extension")
 def test_create_item_creates_s3_alternate_assets(
     patch_add_proj_ext, example_oam_metadata: OamMetadata
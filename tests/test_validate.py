@@ -0,0 +1,114 @@
+"""Tests for `stactools.hotosm.validate`."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from stactools.hotosm.dump import dump_to_ndjson
+from stactools.hotosm.load import plan_tasks
+from stactools.hotosm.validate import (
+    BUNDLED_SCHEMAS,
+    OAM_EXTENSION_SCHEMA_URI,
+    ItemValidator,
+    validate_tasks,
+)
+
+ROOT = Path(__file__).parents[1]
+PROJECTION_SCHEMA_URI = (
+    "https://stac-extensions.github.io/projection/v2.0.0/schema.json"
+)
+
+
+@pytest.fixture
+def valid_item() -> dict:
+    """A valid STAC Item, as dumped for loading into PgSTAC."""
+    item = json.loads((ROOT / "stac-extension" / "examples" / "item.json").read_text())
+    item["collection"] = "openaerialmap"
+    item["assets"]["visual"] = item["assets"].pop("image")
+    return item
+
+
+@pytest.fixture(scope="module")
+def validator() -> ItemValidator:
+    """Validator with the schemas available offline."""
+    return ItemValidator()
+
+
+def test_bundled_oam_schema_matches_extension():
+    """Ensure the bundled OAM extension schema is a copy of the published one."""
+    published = ROOT / "stac-extension" / "json-schema" / "schema.json"
+    bundled = BUNDLED_SCHEMAS[OAM_EXTENSION_SCHEMA_URI]
+    assert json.loads(bundled.read_text()) == json.loads(published.read_text())
+
+
+def test_valid_item(validator: ItemValidator, valid_item: dict):
+    """Ensure a valid STAC Item passes, listing extensions that were not checked."""
+    errors, unchecked = validator.validate(valid_item)
+    assert errors == []
+    assert PROJECTION_SCHEMA_URI in unchecked
+    assert OAM_EXTENSION_SCHEMA_URI not in unchecked
+
+
+def test_oam_schema_and_invariants(validator: ItemValidator, valid_item: dict):
+    """Ensure OAM extension fields and invariants are checked."""
+    del valid_item["properties"]["oam:producer_name"]
+    valid_item["properties"]["gsd"] = -1
+    del valid_item["collection"]
+
+    errors, _ = validator.validate(valid_item)
+    assert (
+        f"[{OAM_EXTENSION_SCHEMA_URI}] properties: "
+        "'oam:producer_name' is a required property"
+    ) in errors
+    assert "collection: required to load into PgSTAC" in errors
+    assert "properties/gsd: expected a positive number, got -1" in errors
+    assert "properties/oam:producer_name: required" in errors
+
+
+def test_core_schema(validator: ItemValidator, valid_item: dict):
+    """Ensure STAC Items are checked against the core STAC Item schema."""
+    valid_item["properties"]["title"] = 5
+
+    errors, _ = validator.validate(valid_item)
+    assert len(errors) == 1
+    assert errors[0].startswith("[core] properties/title: 5 is not of type 'string'")
+
+
+def test_schema_dir(tmp_path: Path, valid_item: dict):
+    """Ensure schemas in a directory are used by their ID."""
+    schema = {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "$id": PROJECTION_SCHEMA_URI,
+        "required": ["proj:missing"],
+    }
+    (tmp_path / "projection.json").write_text(json.dumps(schema))
+
+    errors, unchecked = ItemValidator(tmp_path).validate(valid_item)
+    assert errors == [
+        f"[{PROJECTION_SCHEMA_URI}] $: 'proj:missing' is a required property"
+    ]
+    assert PROJECTION_SCHEMA_URI not in unchecked
+
+
+def test_validate_tasks(tmp_path: Path, valid_item: dict):
+    """Ensure dumps are validated in parallel, reporting failures by ID."""
+    items = []
+    for i in range(10):
+        item = json.loads(json.dumps(valid_item))
+        item["id"] = f"item-{i}"
+        if i in (3, 7):
+            item["properties"]["gsd"] = 0
+        items.append(item)
+    path = tmp_path / "items.ndjson"
+    dump_to_ndjson(path, items)
+    broken = tmp_path / "broken.ndjson"
+    broken.write_text("not json\n")
+
+    tasks = plan_tasks([path, broken], chunk_bytes=path.stat().st_size // 3)
+    report = validate_tasks(tasks, workers=2)
+    assert report.count == 10
+    assert sorted(failure.id for failure in report.failures) == ["item-3", "item-7"]
+    assert list(report.errors) == [task.key for task in tasks if task.path == broken]
+    assert report.unchecked[PROJECTION_SCHEMA_URI] == 10
+    assert not report.ok
@@ -0,0 +1,107 @@
+"""Tests for `stactools.hotosm.watch`."""
+
+import datetime as dt
+import random
+import threading
+from pathlib import Path
+
+from stactools.hotosm.watch import Watermark, jittered, run_watch
+
+
+def test_watermark_load_default(tmp_path: Path):
+    """Ensure the default is used when no watermark was persisted."""
+    default = dt.datetime(2025, 1, 1, tzinfo=dt.UTC)
+    watermark = Watermark.load(default, tmp_path / "watermark")
+    assert watermark.value == default
+
+
+def test_watermark_advance_persists(tmp_path: Path):
+    """Ensure an advanced watermark is persisted and reloaded."""
+    path = tmp_path / "watermark"
+    watermark = Watermark.load(dt.datetime(2025, 1, 1, tzinfo=dt.UTC), path)
+
+    polled_at = dt.datetime(2025, 2, 1, tzinfo=dt.UTC)
+    watermark.advance(polled_at, dt.timedelta(minutes=1))
+    assert watermark.value == polled_at - dt.timedelta(minutes=1)
+
+    reloaded = Watermark.load(dt.datetime(2000, 1, 1, tzinfo=dt.UTC), path)
+    assert reloaded.value == watermark.value
+
+
+def test_watermark_never_moves_backwards():
+    """Ensure a large overlap does not rewind the watermark."""
+    start = dt.datetime(2025, 1, 1, tzinfo=dt.UTC)
+    watermark = Watermark(value=start)
+    watermark.advance(start + dt.timedelta(seconds=10), dt.timedelta(hours=1))
+    assert watermark.value == start
+
+
+def test_jittered_bounds():
+    """Ensure jitter stays within the requested fraction."""
+    rng = random.Random(42)
+    values = [jittered(100, 0.1, rng) for _ in range(1000)]
+    assert all(90 <= value <= 110 for value in values)
+    assert jittered(100, 0) == 100
+
+
+def test_run_watch_advances_after_success():
+    """Ensure each poll starts from where the last successful poll began."""
+    start = dt.datetime(2025, 1, 1, tzinfo=dt.UTC)
+    watermark = Watermark(value=start)
+    seen = []
+
+    polls = run_watch(
+        seen.append,
+        watermark,
+        interval=0.001,
+        jitter=0,
+        overlap=dt.timedelta(0),
+        stop=threading.Event(),
+        max_polls=3,
+    )
+
+    assert polls == 3
+    assert seen[0] == start
+    assert seen[0] < seen[1] <= seen[2]
+
+
+def test_run_watch_retries_window_after_failure():
+    """Ensure a failed poll does not advance the watermark."""
+    start = dt.datetime(2025, 1, 1, tzinfo=dt.UTC)
+    watermark = Watermark(value=start)
+    seen = []
+
+    def poll(after: dt.datetime):
+        seen.append(after)
+        raise RuntimeError("upstream is down")
+
+    run_watch(
+        poll,
+        watermark,
+        interval=0.001,
+        jitter=0,
+        overlap=dt.timedelta(0),
+        stop=threading.Event(),
+        max_polls=2,
+    )
+
+    assert seen == [start, start]
+    assert watermark.value == start
+
+
+def test_run_watch_stops_when_requested():
+    """Ensure setting the stop event ends the loop after the current poll."""
+    stop = threading.Event()
+
+    def poll(_: dt.datetime):
+        stop.set()
+
+    polls = run_watch(
+        poll,
+        Watermark(value=dt.datetime.now(tz=dt.UTC)),
+        interval=3600,
+        jitter=0,
+        overlap=dt.timedelta(0),
+        stop=stop,
+    )
+    assert polls == 1